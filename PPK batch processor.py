@@ -1,4 +1,3 @@
-import subprocess
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from pathlib import Path
@@ -11,7 +10,17 @@ import json
 import os
 import csv
 import ctypes
+import multiprocessing
 from tools import GNSSViewer, PosToExcelConverter, DMSConverter, R27Converter, dms_to_dd
+from async_log import AsyncLogWriter
+from ppk_config import PPKConfig
+from pos_stats import QUALITY_LABELS, flatten_statistics
+from ppk_batch import (
+    RoverObservation, BaseObservation, NavigationFile, BatchProcessor, ObservationIndex,
+    HEADER_CACHE_NAME, extract_date_from_filename, format_eta, load_observations
+)
+from rinex_header import HeaderCache
+from sum_file import read_sum_file
 import sys
 
 # Importation des modules requis
@@ -33,132 +42,9 @@ except ImportError as e:
     raise SystemExit(1)
 
 
-class RoverObservation:
-    def __init__(self, filepath):
-        self.filepath = Path(filepath)
-        self.name = self.filepath.stem
-        self.date, self.time = self.extract_date_time()
-
-    def extract_date_time(self):
-        try:
-            with open(self.filepath, 'r') as f:
-                lines = f.readlines()
-                
-                # Chercher d'abord dans l'en-tête RINEX (format EMLID)
-                for i, line in enumerate(lines):
-                    if "TIME OF FIRST OBS" in line:
-                        try:
-                            parts = line.split()
-                            if len(parts) >= 6:
-                                year = parts[0].strip()
-                                month = parts[1].strip().zfill(2)
-                                day = parts[2].strip().zfill(2)
-                                hour = parts[3].strip().zfill(2)
-                                minute = parts[4].strip().zfill(2)
-                                second = parts[5].strip().split('.')[0].zfill(2)
-                                
-                                date_str = f"{year}{month}{day}"
-                                time_str = f"{hour}{minute}{second}"
-                                return date_str, time_str
-                        except Exception as e:
-                            print(f"Erreur lors de l'extraction de la date (en-tête): {str(e)}")
-                            continue
-
-                # Si pas trouvé dans l'en-tête, chercher dans les lignes de données
-                for line in lines:
-                    if line.startswith('>'):
-                        # Format EMLID et FOIF A30
-                        match = re.search(
-                            r'>\s*(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})',
-                            line
-                        )
-                        if match:
-                            year = match.group(1)
-                            month = match.group(2).zfill(2)
-                            day = match.group(3).zfill(2)
-                            hour = match.group(4).zfill(2)
-                            minute = match.group(5).zfill(2)
-                            second = match.group(6).zfill(2)
-                            
-                            date_str = f"{year}{month}{day}"
-                            time_str = f"{hour}{minute}{second}"
-                            return date_str, time_str
-
-            return None, None
-        except Exception as e:
-            print(f"Error reading file {self.filepath}: {e}")
-            return None, None
-
-
-class BaseObservation:
-    def __init__(self, filepath):
-        self.filepath = Path(filepath)
-        self.name = self.filepath.stem
-        self.date, self.time = self.extract_date_time()
-
-    def extract_date_time(self):
-        try:
-            with open(self.filepath, 'r') as f:
-                lines = f.readlines()
-
-                # Première méthode : chercher dans l'en-tête RINEX (format EMLID)
-                for i, line in enumerate(lines):
-                    if "TIME OF FIRST OBS" in line:
-                        try:
-                            parts = line.split()
-                            if len(parts) >= 6:
-                                year = parts[0].strip()
-                                month = parts[1].strip().zfill(2)
-                                day = parts[2].strip().zfill(2)
-                                hour = parts[3].strip().zfill(2)
-                                minute = parts[4].strip().zfill(2)
-                                second = parts[5].strip().split('.')[0].zfill(2)
-                                
-                                date_str = f"{year}{month}{day}"
-                                time_str = f"{hour}{minute}{second}"
-                                return date_str, time_str
-                        except Exception as e:
-                            print(f"Erreur lors de l'extraction de la date (en-tête): {str(e)}")
-                            continue
-
-                # Deuxième méthode : format FOIF A30 (ligne 2)
-                if len(lines) >= 2:
-                    line_2 = lines[1].strip()
-                    match = re.search(r'(\d{8})\s+(\d{6})', line_2)
-                    if match:
-                        return match.group(1), match.group(2)
-
-                # Troisième méthode : chercher dans les lignes de données
-                for line in lines:
-                    if line.startswith('>'):
-                        match = re.search(
-                            r'>\s*(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})',
-                            line
-                        )
-                        if match:
-                            year = match.group(1)
-                            month = match.group(2).zfill(2)
-                            day = match.group(3).zfill(2)
-                            hour = match.group(4).zfill(2)
-                            minute = match.group(5).zfill(2)
-                            second = match.group(6).zfill(2)
-                            
-                            date_str = f"{year}{month}{day}"
-                            time_str = f"{hour}{minute}{second}"
-                            return date_str, time_str
-
-            return None, None
-        except Exception as e:
-            print(f"Error reading file {self.filepath}: {e}")
-            return None, None
-
-
-class NavigationFile(BaseObservation):
-    pass  # Hérite de BaseObservation
-
-
 class PPKProcessorGUI:
     CONFIG_FILE = 'config.json'
+    LOG_POLL_MS = 100
 
     def __init__(self, master):
         self.master = master
@@ -170,11 +56,21 @@ class PPKProcessorGUI:
         self.app_data_dir = os.path.join(os.getenv('APPDATA'), 'PPK_Batch_Processor')
         os.makedirs(self.app_data_dir, exist_ok=True)
 
+        # Cache des en-têtes RINEX (chemin, taille, mtime) : réouverture instantanée des projets
+        self.header_cache = HeaderCache(os.path.join(self.app_data_dir, HEADER_CACHE_NAME))
+        # Fichiers en cours de lecture et génération de chargement (ignore les lots d'un projet précédent)
+        self.pending_files = set()
+        self.ingest_generation = 0
+
         # Initialize log file path dans AppData
         self.log_file = os.path.join(self.app_data_dir, 'log.txt')
+        # Écriture du journal en arrière-plan (rotation au-delà de 5 Mo)
+        self.log_writer = AsyncLogWriter(self.log_file)
         # Ajouter une nouvelle session au fichier log existant
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*50}\n=== Nouvelle session démarrée le {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n{'='*50}\n")
+        self.log_writer.write(
+            f"\n{'='*50}\n=== Nouvelle session démarrée le {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n{'='*50}\n",
+            display=False
+        )
 
         # Initialize exec_path_var before other initializations
         self.exec_path_var = tk.StringVar()  # Ajout de cette ligne
@@ -190,6 +86,10 @@ class PPKProcessorGUI:
             'pos2-antheight': tk.StringVar(value="0.0"),
             'ant1-antdelu': tk.StringVar(value="0.0")
         }
+        # Réglages lus dans le .conf ou modifiés : seuls ceux-ci remplacent les valeurs du .conf
+        self.config_modified = set()
+        for key, var in self.config_settings.items():
+            var.trace_add('write', lambda *args, key=key: self.config_modified.add(key))
 
         # Indicateur de modifications non sauvegardées
         self.unsaved_changes = False
@@ -227,6 +127,7 @@ class PPKProcessorGUI:
         self.create_menu()
         self.create_left_frame()
         self.create_right_frame()
+        self.poll_log()
 
         # Add after other initializations
         self.stats_file = Path("ppk_statistics.json")
@@ -334,13 +235,13 @@ class PPKProcessorGUI:
 - **Load Configuration File:** Under "Config File (ppk.conf)", click **Browse** to select your `ppk.conf` file. Click **Edit Config** to view or modify its contents.
 
 **2. Base Coordinates Setup**  
-- **Manual Mode:** Select "Mode Manuel" and enter base Latitude, Longitude, and Height. Click **Appliquer** to update the config with these coordinates.  
+- **Manual Mode:** Select "Mode Manuel" and enter base Latitude, Longitude, and Height. Click **Appliquer** to validate these coordinates. They are written to the configuration generated for each job; your `ppk.conf` is never modified.  
 - **Automatic Mode (.sum Files):** Select "Mode Automatique (fichiers .sum)" and click **Importer .sum** to add `.sum` files. The software will automatically apply coordinates from these files during processing.
 
 **3. Antenna Configuration**  
 - Choose your antenna type from the dropdown (e.g., "EMLID RS2").  
 - Enter any manual offset needed.  
-- Click **Appliquer Configuration Antenne** to update the configuration file with these antenna parameters.
+- The total offset is applied as `ant1-antdelu` in the configuration generated for each job.
 
 **4. Adding Files**  
 - **Rover Files (e.g., *.24o):** Click **Add Rover Files**, select your rover observation files, and confirm.  
@@ -355,7 +256,9 @@ Use the **Delete Selected** button in each section to remove unwanted files.
 **6. Running Batch Processing**  
 - Ensure all required files are loaded, coordinates are set, and the configuration is correct.  
 - Click **Run Batch PPK Processing** to start.  
-- A progress bar shows processing status, and logs will appear in the "Status and Logs" tab.
+- **Parallel jobs** sets how many rnx2rtkp processes run at the same time (defaults to the number of CPU cores).  
+- **Skip unchanged** only reprocesses rovers whose input files, generated configuration or RTKLIB executable changed since the last run; results keep their `<rover>.pos` name instead of getting `_1`, `_2` suffixes.  
+- A progress bar shows processing status with an estimated time remaining (ETA), the "Jobs" tab shows the progress and throughput of each rnx2rtkp run, and logs will appear in the "Status and Logs" tab.
 
 **7. Viewing Results & Statistics**  
 - Processed results are saved as `.pos` files in the chosen output directory.  
@@ -458,10 +361,13 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         self.rover_obs_list.clear()
         self.base_obs_list.clear()
         self.nav_obs_list.clear()
+        self.ingest_generation += 1
+        self.pending_files.clear()
         
         # Clear config settings
         for var in self.config_settings.values():
             var.set("")
+        self.config_modified.clear()
             
         # Update UI
         self.update_file_lists()
@@ -522,9 +428,15 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
                 'base_files': [str(base.filepath) for base in self.base_obs_list],
                 'nav_files': [str(nav.filepath) for nav in self.nav_obs_list],
                 'sum_files': self.sum_files,
-                'config_settings': {k: str(v.get()) for k, v in self.config_settings.items()},
+                'config_settings': {
+                    k: str(v.get()) for k, v in self.config_settings.items() if k in self.config_modified
+                },
                 'base_coordinates': base_coords,
                 'antenna_settings': antenna_settings,
+                'max_workers': self.get_max_workers(),
+                'incremental': self.incremental_var.get(),
+                'coord_mode': self.coord_mode.get(),
+                'output_directory': self.output_path_var.get(),
                 'logs': self.log_text.get(1.0, tk.END).strip(),
                 'statistics': [
                     {
@@ -565,6 +477,22 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             # Load basic settings
             self.exec_path_var.set(project_data['executable_path'])
             self.config_path_var.set(project_data['config_path'])
+            if 'max_workers' in project_data:
+                self.max_workers_var.set(project_data['max_workers'])
+            self.incremental_var.set(project_data.get('incremental', False))
+            if project_data.get('output_directory'):
+                self.output_path_var.set(project_data['output_directory'])
+            if project_data.get('coord_mode'):
+                self.coord_mode.set(project_data['coord_mode'])
+                self.update_coord_mode()
+
+            # Réglages : valeurs du .conf du projet, puis celles enregistrées dans le projet
+            self.config_modified.clear()
+            if os.path.exists(project_data['config_path']):
+                self.load_config_settings(project_data['config_path'])
+            for key, value in project_data.get('config_settings', {}).items():
+                if key in self.config_settings:
+                    self.config_settings[key].set(value)
 
             # Clear existing lists
             self.rover_obs_list.clear()
@@ -573,37 +501,28 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             self.rover_listbox.delete(0, tk.END)
             self.base_listbox.delete(0, tk.END)
             self.nav_listbox.delete(0, tk.END)
-
-            # Load rover files
-            for rover_path in project_data['rover_files']:
-                if os.path.exists(rover_path):
-                    rover = RoverObservation(Path(rover_path))
-                    self.rover_obs_list.append(rover)
-                    date_display = rover.date if rover.date else "Unknown"
-                    time_display = rover.time if rover.time else "Unknown"
-                    display_name = f"{rover.filepath.name} (Date: {date_display}, Time: {time_display})"
-                    
-                    self.rover_listbox.insert(tk.END, display_name)
-                    self.rover_listbox.see(tk.END)
-                    self.master.update_idletasks()
-                    
-                    self.append_log(f"Successfully added rover file: {display_name}\n")
-                else:
-                    self.append_log(f"Warning: Rover file not found: {rover_path}\n")
-
-            # Load base files
-            for base_path in project_data['base_files']:
-                if os.path.exists(base_path):
-                    base = BaseObservation(Path(base_path))
-                    self.base_obs_list.append(base)
-                    date_display = base.date if base.date else "Unknown"
-                    time_display = base.time if base.time else "Unknown"
-                    display_name = f"{base.filepath.name} (Date: {date_display}, Time: {time_display})"
-                    self.base_listbox.insert(tk.END, display_name)
-                    self.append_log(f"Fichier de base ajouté: {base.filepath.name}\n")
-        
-            # Mettre à jour les correspondances des fichiers .sum
-            self.update_sum_files_display()
+            self.ingest_generation += 1
+            self.pending_files.clear()
+
+            def existing(paths, kind):
+                found = []
+                for path in paths:
+                    if os.path.exists(path):
+                        found.append(path)
+                    else:
+                        self.append_log(f"Warning: {kind} file not found: {path}\n")
+                return found
+
+            # Les en-têtes sont lus en arrière-plan (ou repris du cache) et
+            # les listes se remplissent par lots
+            self.ingest_files(existing(project_data['rover_files'], "Rover"), RoverObservation,
+                              self.rover_obs_list, self.rover_listbox, "rover",
+                              on_done=self.refresh_sum_files_display)
+            self.ingest_files(existing(project_data['base_files'], "Base"), BaseObservation,
+                              self.base_obs_list, self.base_listbox, "base",
+                              on_done=self.refresh_sum_files_display)
+            self.ingest_files(existing(project_data.get('nav_files', []), "Navigation"), NavigationFile,
+                              self.nav_obs_list, self.nav_listbox, "navigation")
 
             self.unsaved_changes = True
 
@@ -611,6 +530,70 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             messagebox.showerror("Error", f"Failed to load project: {str(e)}")
             self.append_log(f"Error loading project: {str(e)}\n")
 
+    def observation_display_name(self, observation):
+        if isinstance(observation, NavigationFile):
+            # Afficher uniquement le nom du fichier
+            return observation.filepath.name
+        date_display = observation.date if observation.date else "Unknown"
+        time_display = observation.time if observation.time else "Unknown"
+        return f"{observation.filepath.name} (Date: {date_display}, Time: {time_display})"
+
+    def ingest_files(self, paths, cls, obs_list, listbox, kind, on_done=None):
+        """Lit les en-têtes dans un pool de threads et remplit la liste par lots"""
+        known = {obs.filepath for obs in obs_list} | self.pending_files
+        new_paths = []
+        for path in paths:
+            path = Path(path)
+            if path in known:
+                self.append_log(f"File already exists: {path}\n")
+                continue
+            known.add(path)
+            new_paths.append(path)
+        if not new_paths:
+            if on_done:
+                on_done()
+            return
+
+        self.pending_files.update(new_paths)
+        generation = self.ingest_generation
+        self.append_log(f"Reading {len(new_paths)} {kind} file(s)...\n")
+
+        def worker():
+            try:
+                load_observations(
+                    new_paths, cls, self.header_cache,
+                    on_batch=lambda batch: self.master.after(
+                        0, self.insert_observations, batch, obs_list, listbox, kind, generation)
+                )
+                self.header_cache.save()
+            except Exception as e:
+                self.append_log(f"Error reading {kind} files: {str(e)}\n")
+            finally:
+                self.master.after(0, self.finish_ingest, new_paths, generation, on_done)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def insert_observations(self, batch, obs_list, listbox, kind, generation):
+        if generation != self.ingest_generation:
+            return  # lot d'un projet fermé entre-temps
+        lines = []
+        for observation in batch:
+            self.pending_files.discard(observation.filepath)
+            obs_list.append(observation)
+            display_name = self.observation_display_name(observation)
+            listbox.insert(tk.END, display_name)
+            lines.append(f"Successfully added {kind} file: {display_name}\n")
+        listbox.see(tk.END)
+        self.append_log(''.join(lines))
+
+    def finish_ingest(self, paths, generation, on_done=None):
+        self.pending_files.difference_update(paths)
+        if generation != self.ingest_generation:
+            return
+        self.unsaved_changes = True
+        if on_done:
+            on_done()
+
     def add_file_to_list(self, filepath, file_list):
         # Helper method to add files to appropriate lists
         if filepath.suffix.lower() in ['.obs', '.OBS', '.nav', '.NAV']:
@@ -836,10 +819,24 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         self.run_button = ttk.Button(run_frame, text="Run Batch PPK Processing", command=self.start_batch_processing)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        # Nombre de processus rnx2rtkp simultanés (par défaut : nombre de coeurs)
+        ttk.Label(run_frame, text="Parallel jobs:").pack(side=tk.LEFT, padx=(5, 0), pady=5)
+        self.max_workers_var = tk.IntVar(value=os.cpu_count() or 1)
+        ttk.Spinbox(run_frame, from_=1, to=max(64, os.cpu_count() or 1),
+                    textvariable=self.max_workers_var, width=4).pack(side=tk.LEFT, padx=5, pady=5)
+
+        # Mode incrémental : ne retraiter que les rovers nouveaux ou modifiés
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="Skip unchanged", variable=self.incremental_var).pack(side=tk.LEFT, padx=5, pady=5)
+
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(run_frame, orient='horizontal', mode='determinate', variable=self.progress_var)
         self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
 
+        # Temps restant estimé pour l'ensemble du lot
+        self.eta_var = tk.StringVar(value="")
+        ttk.Label(run_frame, textvariable=self.eta_var, width=14).pack(side=tk.LEFT, padx=5, pady=5)
+
     def create_antenna_section(self, antenna_frame):
         """Crée la section de configuration d'antenne"""
         # Modifier le titre du LabelFrame
@@ -889,38 +886,20 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         total_offset_entry.grid(row=3, column=1, padx=5, pady=2, sticky='w')
 
     def apply_base_coordinates(self, show_messages=True):
-        """Apply base coordinates to the config file"""
+        """Valide les coordonnées de base (appliquées à la configuration de chaque traitement)"""
         try:
             # Validate inputs
             lat = float(self.base_lat_var.get())
             lon = float(self.base_lon_var.get())
             height = float(self.base_height_var.get())
 
-            # Read current config file
-            config_path = self.config_path_var.get()
-            if not config_path:
+            if not self.config_path_var.get():
                 if show_messages:
                     messagebox.showerror("Erreur", "Veuillez d'abord sélectionner un fichier de configuration.")
                 return
 
-            with open(config_path, 'r') as f:
-                config_lines = f.readlines()
-
-            # Update coordinates in config
-            for i, line in enumerate(config_lines):
-                if line.startswith('ant2-postype'):
-                    config_lines[i] = 'ant2-postype       =llh        # (0:llh,1:xyz,2:single,3:posfile,4:rinexhead,5:rtcm)\n'
-                elif line.startswith('ant2-pos1'):
-                    config_lines[i] = f'ant2-pos1          ={lat}  # (deg|m)\n'
-                elif line.startswith('ant2-pos2'):
-                    config_lines[i] = f'ant2-pos2          ={lon}  # (deg|m)\n'
-                elif line.startswith('ant2-pos3'):
-                    config_lines[i] = f'ant2-pos3          ={height}  # (m|m)\n'
-
-            # Write updated config
-            with open(config_path, 'w') as f:
-                f.writelines(config_lines)
-
+            # Le fichier ppk.conf n'est plus modifié : les coordonnées sont injectées
+            # dans la configuration générée pour chaque traitement
             self.append_log(f"Coordonnées de base mises à jour: Lat={lat}, Lon={lon}, H={height}\n")
             if show_messages:
                 messagebox.showinfo("Succès", "Coordonnées de base mises à jour avec succès.")
@@ -963,6 +942,23 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         self.log_text = scrolledtext.ScrolledText(log_container, state='disabled')
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        # Jobs Tab : état de chaque traitement rnx2rtkp pendant le lot
+        jobs_tab = ttk.Frame(notebook)
+        notebook.add(jobs_tab, text='Jobs')
+
+        job_columns = ('Rover', 'Status', 'Progress (%)', 'Epochs/s', 'Elapsed (s)')
+        self.jobs_tree = ttk.Treeview(jobs_tab, columns=job_columns, show='headings')
+        for col in job_columns:
+            self.jobs_tree.heading(col, text=col)
+            width = 200 if col == 'Rover' else 90
+            self.jobs_tree.column(col, width=width, anchor='center')
+        jobs_scrollbar = ttk.Scrollbar(jobs_tab, orient="vertical", command=self.jobs_tree.yview)
+        self.jobs_tree.configure(yscrollcommand=jobs_scrollbar.set)
+        self.jobs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0), pady=5)
+        jobs_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
+        # {nom du .pos: élément du tableau}
+        self.job_rows = {}
+
         # Statistics Tab
         stats_tab = ttk.Frame(notebook)
         notebook.add(stats_tab, text='Quality Statistics')
@@ -992,8 +988,11 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         export_stats_btn.pack(side=tk.LEFT, padx=5)
 
         # Create Treeview with quality columns
-        columns = ('File', 'fix (%)', 'float (%)', 'sbas (%)', 'dgps (%)', 'single (%)')
+        columns = ('File', 'fix (%)', 'float (%)', 'sbas (%)', 'dgps (%)', 'single (%)',
+                   'Epochs', 'Span (h)', 'Gaps', 'sdu p95 (m)', 'Ratio mean', 'ns mean')
         self.stats_tree = ttk.Treeview(stats_frame, columns=columns, show='headings')
+        # Statistiques complètes de chaque ligne (export CSV)
+        self.row_statistics = {}
         
         # Configure columns
         for col in columns:
@@ -1025,6 +1024,7 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         if messagebox.askyesno("Confirm Delete", "Delete selected statistics entries?"):
             for item in selected_items:
                 self.stats_tree.delete(item)
+                self.row_statistics.pop(item, None)
 
     def delete_selected_row(self):
         """Delete selected row from statistics tree"""
@@ -1036,6 +1036,7 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         if messagebox.askyesno("Confirm", "Delete selected statistics row?"):
             for item in selection:
                 self.stats_tree.delete(item)
+                self.row_statistics.pop(item, None)
             self.append_log("Deleted selected statistics row(s)\n")
 
     def view_selected_file(self):
@@ -1087,12 +1088,10 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
 
     def load_config_settings(self, config_path):
         try:
-            with open(config_path, 'r') as f:
-                for line in f:
-                    for key in self.config_settings:
-                        if line.startswith(key):
-                            value = line.split('=')[1].strip()
-                            self.config_settings[key].set(value)
+            config = PPKConfig.load(config_path)
+            for key in self.config_settings:
+                if key in config:
+                    self.config_settings[key].set(config.get(key))
         except Exception as e:
             self.append_log(f"Error loading config settings: {e}\n")
 
@@ -1195,38 +1194,19 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             self.append_log("No files selected\n")
             return
             
+        accepted = []
         for path in paths:
-            try:
-                # Vérifier si le fichier suit le format attendu (YYo ou YYO)
-                if not re.match(r'.*\.\d{2}[oO]$', path):
-                    self.append_log(f"Warning: {path} n'est peut-être pas un fichier rover valide\n")
-                    if not messagebox.askyesno(
-                        "Format non standard", 
-                        f"Le fichier {Path(path).name} ne semble pas être un fichier rover standard.\nVoulez-vous quand même l'ajouter?"
-                    ):
-                        continue
-
-                self.append_log(f"Processing file: {path}\n")
-                if path not in [rover.filepath for rover in self.rover_obs_list]:
-                    rover = RoverObservation(path)
-                    self.rover_obs_list.append(rover)
-                    date_display = rover.date if rover.date else "Unknown"
-                    time_display = rover.time if rover.time else "Unknown"
-                    display_name = f"{rover.filepath.name} (Date: {date_display}, Time: {time_display})"
-                    
-                    self.rover_listbox.insert(tk.END, display_name)
-                    self.rover_listbox.see(tk.END)
-                    self.master.update_idletasks()
-                    
-                    self.append_log(f"Successfully added rover file: {display_name}\n")
-                else:
-                    self.append_log(f"File already exists: {path}\n")
-                    
-            except Exception as e:
-                self.append_log(f"Error processing file {path}: {str(e)}\n")
-                messagebox.showerror("Error", f"Failed to add file: {path}\n{str(e)}")
+            # Vérifier si le fichier suit le format attendu (YYo ou YYO)
+            if not re.match(r'.*\.\d{2}[oO]$', path):
+                self.append_log(f"Warning: {path} n'est peut-être pas un fichier rover valide\n")
+                if not messagebox.askyesno(
+                    "Format non standard", 
+                    f"Le fichier {Path(path).name} ne semble pas être un fichier rover standard.\nVoulez-vous quand même l'ajouter?"
+                ):
+                    continue
+            accepted.append(path)
 
-        self.unsaved_changes = True
+        self.ingest_files(accepted, RoverObservation, self.rover_obs_list, self.rover_listbox, "rover")
 
     def delete_rover_files(self):
         selected_indices = list(self.rover_listbox.curselection())
@@ -1255,6 +1235,7 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             ]
         )
         
+        accepted = []
         for path in paths:
             # Vérifier si le fichier suit le format attendu (YYO ou YYo)
             if not re.match(r'.*\.\d{2}[oO]$', path):
@@ -1264,20 +1245,11 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
                     f"Le fichier {Path(path).name} ne semble pas être un fichier de base standard.\nVoulez-vous quand même l'ajouter?"
                 ):
                     continue
+            accepted.append(path)
 
-            if path not in [base.filepath for base in self.base_obs_list]:
-                base = BaseObservation(path)
-                self.base_obs_list.append(base)
-                date_display = base.date if base.date else "Unknown"
-                time_display = base.time if base.time else "Unknown"
-                display_name = f"{base.filepath.name} (Date: {date_display}, Time: {time_display})"
-                self.base_listbox.insert(tk.END, display_name)
-                self.append_log(f"Fichier de base ajouté: {base.filepath.name}\n")
-        
-        # Mettre à jour les correspondances des fichiers .sum
-        self.update_sum_files_display()
-
-        self.unsaved_changes = True
+        # Mettre à jour les correspondances des fichiers .sum une fois les en-têtes lus
+        self.ingest_files(accepted, BaseObservation, self.base_obs_list, self.base_listbox, "base",
+                          on_done=self.refresh_sum_files_display)
 
     def delete_base_files(self):
         """Supprime les fichiers de base sélectionnés."""
@@ -1295,7 +1267,7 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             del self.base_obs_list[index]
             
         # Mettre à jour les correspondances des fichiers .sum
-        self.update_sum_files_display()
+        self.refresh_sum_files_display()
 
         self.unsaved_changes = True
 
@@ -1311,6 +1283,7 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             ]
         )
         
+        accepted = []
         for path in paths:
             # V��rifier si le fichier suit le format attendu (YYP, YYp, YYn, YYN)
             if not re.match(r'.*\.\d{2}[PpNn]$', path):
@@ -1320,16 +1293,9 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
                     f"Le fichier {Path(path).name} ne semble pas être un fichier de navigation standard.\nVoulez-vous quand même l'ajouter?"
                 ):
                     continue
+            accepted.append(path)
 
-            if path not in [nav.filepath for nav in self.nav_obs_list]:
-                nav = NavigationFile(path)
-                self.nav_obs_list.append(nav)
-                # Afficher uniquement le nom du fichier
-                display_name = nav.filepath.name
-                self.nav_listbox.insert(tk.END, display_name)
-                self.append_log(f"Fichier de navigation ajouté: {nav.filepath.name}\n")
-
-        self.unsaved_changes = True
+        self.ingest_files(accepted, NavigationFile, self.nav_obs_list, self.nav_listbox, "navigation")
 
     def delete_nav_files(self):
         selected_indices = list(self.nav_listbox.curselection())
@@ -1373,6 +1339,9 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         if not self.output_path_var.get():
             messagebox.showerror("Erreur", "Veuillez sélectionner le répertoire de sortie.")
             return
+        if self.pending_files:
+            messagebox.showwarning("Patientez", f"Lecture de {len(self.pending_files)} fichier(s) en cours, réessayez dans un instant.")
+            return
 
         # Nouvelle vérification pour les coordonnées de base
         if self.coord_mode.get() == "manual":
@@ -1404,216 +1373,132 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
 
         # Reset progress bar
         self.progress_var.set(0)
+        self.eta_var.set("")
+        self.jobs_tree.delete(*self.jobs_tree.get_children())
+        self.job_rows.clear()
+
+        # Les valeurs Tk sont lues ici, dans le thread de l'interface
+        processor = BatchProcessor(
+            rtk_exe=self.exec_path_var.get(),
+            config_file=self.config_path_var.get(),
+            output_dir=self.output_path_var.get(),
+            rover_obs_list=self.rover_obs_list,
+            base_obs_list=self.base_obs_list,
+            nav_obs_list=self.nav_obs_list,
+            coord_mode=self.coord_mode.get(),
+            base_coordinates=(self.base_lat_var.get(), self.base_lon_var.get(), self.base_height_var.get()),
+            sum_files=self.sum_files,
+            config_settings={
+                key: var.get() for key, var in self.config_settings.items() if key in self.config_modified
+            },
+            max_workers=self.get_max_workers(),
+            incremental=self.incremental_var.get(),
+            log=self.append_log
+        )
 
         # Start processing in a separate thread
-        thread = threading.Thread(target=self.run_batch_processing)
+        thread = threading.Thread(target=self.run_batch_processing, args=(processor,))
         thread.start()
 
-    def run_batch_processing(self):
-        rtk_exe = Path(self.exec_path_var.get())
-        original_config_file = Path(self.config_path_var.get())
-        output_dir = Path(self.output_path_var.get())
-
-        total_rovers = len(self.rover_obs_list)
-        processed_rovers = 0
-
-        # Si mode manuel, appliquer les coordonnées une seule fois au début
-        if self.coord_mode.get() == "manual":
-            try:
-                self.update_config_with_base_coordinates(
-                    self.base_lat_var.get(),
-                    self.base_lon_var.get(),
-                    self.base_height_var.get(),
-                    original_config_file
-                )
-                self.append_log("Mode manuel : utilisation des coordonnées fixes pour tous les fichiers\n")
-            except Exception as e:
-                self.append_log(f"Erreur lors de la mise à jour des coordonnées manuelles : {str(e)}\n")
-                return
-
-        # Définir CREATE_NO_WINDOW pour Windows
-        CREATE_NO_WINDOW = 0x08000000
-
-        for rover in self.rover_obs_list:
-            if not rover.date:
-                self.append_log(f"No date found for rover file '{rover.filepath.name}'. Skipping.\n")
-                processed_rovers += 1
-                self.update_progress(processed_rovers, total_rovers)
-                continue
-
-            # Match based on date
-            matching_bases = [
-                base for base in self.base_obs_list
-                if base.date == rover.date
-            ]
-
-            if not matching_bases:
-                self.append_log(f"No matching base file found for rover file '{rover.filepath.name}' with date '{rover.date}'. Skipping.\n")
-                processed_rovers += 1
-                self.update_progress(processed_rovers, total_rovers)
-                continue
-
-            base_file = matching_bases[0]
-
-            # Nouvelle logique simplifiée pour trouver le fichier de navigation correspondant
-            matching_nav = None
-            base_name_pattern = re.search(r'\d{6}|\d{8}', base_file.filepath.stem)
-            
-            if base_name_pattern:
-                base_number = base_name_pattern.group()
-                for nav in self.nav_obs_list:
-                    if base_number in nav.filepath.stem:
-                        matching_nav = nav
-                        break
-
-            if not matching_nav:
-                self.append_log(f"No matching navigation file found for base file '{base_file.filepath.name}'. Skipping rover file '{rover.filepath.name}'.\n")
-                processed_rovers += 1
-                self.update_progress(processed_rovers, total_rovers)
-                continue
-
-            # En mode auto seulement, mettre à jour les coordonnées depuis le fichier .sum
-            if self.coord_mode.get() == "auto":
-                matching_sum = None
-                for sum_file in self.sum_files:
-                    sum_filename = Path(sum_file).stem
-                    sum_date = self.extract_date_from_filename(sum_filename)
-                    if sum_date == rover.date:
-                        matching_sum = sum_file
-                        break
-
-                if matching_sum:
-                    try:
-                        sum_data = self.parse_sum_file(matching_sum)
-                        self.append_log(f"Mise à jour des coordonnées depuis {Path(matching_sum).name} pour le traitement de {rover.filepath.name}\n")
-                        
-                        # Mettre à jour les coordonnées dans l'interface
-                        self.base_lat_var.set(sum_data.get("Latitude (DD)", ""))
-                        self.base_lon_var.set(sum_data.get("Longitude (DD)", ""))
-                        self.base_height_var.set(sum_data.get("Elevation (m)", ""))
-                        
-                        # Mettre à jour le fichier de configuration
-                        self.update_config_with_base_coordinates(
-                            sum_data.get("Latitude (DD)", ""),
-                            sum_data.get("Longitude (DD)", ""),
-                            sum_data.get("Elevation (m)", ""),
-                            original_config_file
-                        )
-                    except Exception as e:
-                        self.append_log(f"Erreur lors de la mise à jour des coordonnées depuis {matching_sum}: {str(e)}\n")
-
-            # Simple file naming - just use rover name
-            base_filename = f"{rover.name}.pos"
-            output_pos = output_dir / base_filename
-
-            # If file exists, add simple numeric suffix
-            if output_pos.exists():
-                counter = 1
-                while (output_dir / f"{rover.name}_{counter}.pos").exists():
-                    counter += 1
-                output_pos = output_dir / f"{rover.name}_{counter}.pos"
-                self.append_log(f"File '{base_filename}' exists, saving as '{output_pos.name}'\n")
-
-            command = [
-                str(rtk_exe),
-                "-k", str(original_config_file),
-                "-o", str(output_pos),
-                str(rover.filepath),
-                str(base_file.filepath),
-                str(matching_nav.filepath),  # Correction ici : nav_file -> matching_nav
-            ]
-            self.append_log(f"Executing: {' '.join(command)}\n")
-
-            try:
-                # Utiliser CREATE_NO_WINDOW pour masquer la fenêtre de commande
-                process = subprocess.run(
-                    command, 
-                    capture_output=True, 
-                    text=True,
-                    creationflags=CREATE_NO_WINDOW if os.name == 'nt' else 0
-                )
-                
-                if process.returncode == 0:
-                    self.append_log(f"Processing completed for Rover: {rover.filepath.name}\n")
-                    # Compute statistics and update treeview immediately
-                    stats = self.compute_quality_statistics(output_pos)
-                    if stats:
-                        stats_values = {f'q{q} (%)': f"{stats.get(q, 0):.2f}" for q in range(1, 6)}
-                        row_values = (output_pos.name,) + tuple(stats_values.values())
-                        self.master.after(0, lambda: self.stats_tree.insert('', 0, values=row_values))
-                        self.latest_pos_file = str(output_pos)
-                else:
-                    self.append_log(f"Error for Rover: {rover.filepath.name}. Error Message: {process.stderr}\n")
-            except Exception as e:
-                self.append_log(f"Error during processing: {str(e)}\n")
+    def get_max_workers(self):
+        """Retourne le nombre de processus rnx2rtkp simultanés demandé"""
+        try:
+            return max(1, int(self.max_workers_var.get()))
+        except (tk.TclError, ValueError):
+            return os.cpu_count() or 1
+
+    def run_batch_processing(self, processor):
+        def on_planned(jobs):
+            rows = [(job.output_pos.name, job.rover.filepath.name) for job in jobs]
+            self.master.after(0, self.show_planned_jobs, rows)
+
+        def on_job_progress(job):
+            # Valeurs lues dans le thread de traitement, affichées dans le thread Tk
+            fraction, eta = processor.campaign_progress()
+            progress = job.progress
+            row = (
+                job.rover.filepath.name,
+                job.status,
+                f"{progress.fraction * 100:.0f}",
+                f"{progress.rate:.0f}",
+                f"{progress.elapsed:.0f}",
+            )
+            self.master.after(0, self.update_job_row, job.output_pos.name, row, fraction, eta)
 
-            processed_rovers += 1
-            self.update_progress(processed_rovers, total_rovers)
+        try:
+            processor.run(
+                on_result=self.on_job_completed,
+                on_progress=lambda done, total: self.master.after(
+                    0, self.update_progress, done, total, *processor.campaign_progress()),
+                on_job_progress=on_job_progress,
+                on_planned=on_planned
+            )
+        except Exception as e:
+            self.append_log(f"Erreur lors du traitement par lots : {str(e)}\n")
 
         # Re-enable widgets
-        self.enable_widgets()
+        self.master.after(0, self.enable_widgets)
         self.append_log("Batch PPK Processing Completed.\n")
         messagebox.showinfo("Batch Processing", "Batch PPK Processing Completed.")
 
-    def compute_quality_statistics(self, pos_file):
-        try:
-            with open(pos_file, 'r') as f:
-                lines = f.readlines()
-            data_start = next((i for i, line in enumerate(lines) if not line.startswith('%') and line.strip()), None)
-            if data_start is None:
-                self.append_log(f"Failed to find data in {pos_file}\n")
-                return None
-            data = [line.split() for line in lines[data_start:] if line.strip()]
-            qualities = [int(row[5]) for row in data if len(row) > 5 and row[5].isdigit()]
-            quality_counts = {}
-            for q in qualities:
-                quality_counts[q] = quality_counts.get(q, 0) + 1
-            total = sum(quality_counts.values())
-            if total == 0:
-                self.append_log(f"No valid quality data found in {pos_file}\n")
-                return None
-            percentages = {q: (count / total) * 100 for q, count in quality_counts.items()}
-            return percentages
-        except Exception as e:
-            self.append_log(f"Error computing quality statistics for {pos_file}: {e}\n")
-            return None
+    def statistics_row(self, filename, stats):
+        """Valeurs d'une ligne du tableau des statistiques"""
+        quality = tuple(f"{stats['quality'].get(QUALITY_LABELS[q], 0):.2f}" for q in range(1, 6))
+        # Écart-type vertical : sdu (llh/enu) ou sdz (xyz)
+        sdu_p95 = list(stats['sigma'].values())[2]['p95']
+        return (filename,) + quality + (
+            stats['epochs'],
+            f"{stats['span_s'] / 3600:.2f}",
+            stats['gaps'],
+            f"{sdu_p95:.4f}" if sdu_p95 is not None else "",
+            f"{stats['ratio']['mean']:.1f}",
+            f"{stats['ns']['mean']:.1f}",
+        )
+
+    def insert_statistics_row(self, filename, stats, index=tk.END):
+        item = self.stats_tree.insert('', index, values=self.statistics_row(filename, stats))
+        self.row_statistics[item] = stats
+
+    def on_job_completed(self, job):
+        """Ajoute les statistiques d'un traitement terminé (ordre de fin des traitements)"""
+        if job.status == 'up-to-date':
+            row = (job.rover.filepath.name, job.status, '100', '', '')
+            self.master.after(0, self.update_job_row, job.output_pos.name, row)
+        if job.stats:
+            self.master.after(0, self.insert_statistics_row, job.output_pos.name, job.stats, 0)
+            self.latest_pos_file = str(job.output_pos)
 
     def populate_statistics_table(self, all_file_stats):
-        """Populate statistics table with just filename and quality stats"""
+        """Populate statistics table with filename and .pos statistics"""
         if not all_file_stats:
             self.append_log("No quality statistics to display.\n")
             return
 
         # Clear existing entries
-        self.stats_tree.delete(*self.stats_tree.get_children())
+        self.clear_statistics()
 
         for filename, stats in all_file_stats.items():
             # Just use the .pos filename without timestamp
-            stats_values = {f'q{q} (%)': f"{stats.get(q, 0):.2f}" for q in range(1, 6)}
-            row_values = (filename,) + tuple(stats_values.values())
-            self.stats_tree.insert('', tk.END, values=row_values)
+            self.insert_statistics_row(filename, stats)
             
             # Update latest file reference
             if hasattr(self, 'latest_pos_file'):
                 self.latest_pos_file = os.path.join(self.output_path_var.get(), filename)
 
     def append_log(self, message):
-        """Ajoute un message au log visuel et au fichier log.txt"""
+        """Ajoute un message au log visuel et au fichier log.txt (depuis n'importe quel thread)"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {message}"
-        
-        # Ajouter au widget de log visuel
-        self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, log_message)
-        self.log_text.see(tk.END)
-        self.log_text.config(state='disabled')
-        
-        # Ajouter au fichier log.txt
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_message)
-        except Exception as e:
-            print(f"Erreur d'écriture dans le fichier log: {str(e)}")
+        self.log_writer.write(f"[{timestamp}] {message}")
+
+    def poll_log(self):
+        """Affiche les messages en attente dans le widget de log (thread Tk uniquement)"""
+        messages = self.log_writer.drain()
+        if messages:
+            self.log_text.config(state='normal')
+            self.log_text.insert(tk.END, ''.join(messages))
+            self.log_text.see(tk.END)
+            self.log_text.config(state='disabled')
+        self.master.after(self.LOG_POLL_MS, self.poll_log)
 
     def clear_logs(self):
         self.log_text.config(state='normal')
@@ -1623,6 +1508,7 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
     def clear_statistics(self):
         for item in self.stats_tree.get_children():
             self.stats_tree.delete(item)
+        self.row_statistics.clear()
 
     def set_widget_state(self, widget, state):
         try:
@@ -1648,10 +1534,25 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
                 self.set_widget_state(child, 'normal')
         self.run_button.configure(state='normal')
 
-    def update_progress(self, processed, total):
-        progress = (processed / total) * 100
+    def update_progress(self, processed, total, fraction=None, eta=None):
+        # Avancement pondéré par la durée des sessions si disponible, sinon nombre de rovers
+        progress = fraction * 100 if fraction is not None else (processed / total) * 100
         self.progress_var.set(progress)
-        self.master.update_idletasks()
+        self.eta_var.set(f"ETA {format_eta(eta)}")
+
+    def show_planned_jobs(self, rows):
+        for name, rover in rows:
+            self.job_rows[name] = self.jobs_tree.insert('', tk.END, values=(rover, 'pending', '0', '', ''))
+
+    def update_job_row(self, name, row, fraction=None, eta=None):
+        item = self.job_rows.get(name)
+        if item is None:
+            item = self.job_rows[name] = self.jobs_tree.insert('', tk.END, values=row)
+        else:
+            self.jobs_tree.item(item, values=row)
+        if fraction is not None:
+            self.progress_var.set(fraction * 100)
+            self.eta_var.set(f"ETA {format_eta(eta)}")
 
     def validate_antheight(self, P):
         """Validate that antenna height is a positive number."""
@@ -1906,15 +1807,18 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         )
         
         if sum_file_paths:
+            base_index = ObservationIndex(self.base_obs_list)
             for sum_file_path in sum_file_paths:
                 if sum_file_path not in self.sum_files:
                     try:
-                        parsed_data = self.parse_sum_file(sum_file_path)
+                        lat, lon, height = read_sum_file(sum_file_path).llh_text()
+                        self.append_log(f"Données extraites du fichier .sum:\n")
+                        self.append_log(f"Latitude: {lat}\nLongitude: {lon}\nHauteur: {height}\n")
                         sum_filename = Path(sum_file_path).stem
                         sum_date = self.extract_date_from_filename(sum_filename)
                         formatted_date = self.format_date(sum_date) if sum_date else "Date inconnue"
                         
-                        matching_base = self.find_matching_base_file(sum_date)
+                        matching_base = self.find_matching_base_file(sum_date, base_index)
                         status = "✓" if matching_base else "❌"
                         
                         self.sum_files.append(sum_file_path)
@@ -1924,9 +1828,9 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
                         
                         self.sum_files_listbox.insert(tk.END, display_text)
                         
-                        self.base_lat_var.set(parsed_data.get("Latitude (DD)", ""))
-                        self.base_lon_var.set(parsed_data.get("Longitude (DD)", ""))
-                        self.base_height_var.set(parsed_data.get("Elevation (m)", ""))
+                        self.base_lat_var.set(lat)
+                        self.base_lon_var.set(lon)
+                        self.base_height_var.set(height)
                         
                         self.append_log(f"Coordonnées importées depuis: {sum_file_path}\n")
                     except Exception as e:
@@ -1963,88 +1867,28 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
 
     def extract_date_from_filename(self, filename):
         """Extrait la date du nom du fichier."""
-        try:
-            # Supposons que la date est au format YYYYMMDD dans le nom du fichier
-            date_match = re.search(r'(\d{8})', filename)
-            if date_match:
-                return date_match.group(1)
-            return None
-        except Exception:
-            return None
+        return extract_date_from_filename(filename)
 
-    def find_matching_base_file(self, sum_date):
+    def find_matching_base_file(self, sum_date, base_index=None):
         """Trouve le fichier de base correspondant à la date du fichier .sum."""
         if not sum_date:
             return None
-            
-        for base in self.base_obs_list:
-            if base.date == sum_date:
-                return base.filepath
-        return None
 
-    def update_config_with_base_coordinates(self, lat, lon, height, config_file):
-        """Met à jour le fichier de configuration avec les nouvelles coordonnées."""
-        try:
-            # Lire le contenu du fichier
-            with open(config_file, 'r') as f:
-                lines = f.readlines()
-
-            # Mettre à jour les coordonnées et la configuration de l'antenne
-            updated_lines = []
-            for line in lines:
-                if line.startswith('ant1-pos1'):
-                    updated_lines.append(f'ant1-pos1          ={lat}       # (deg)\n')
-                elif line.startswith('ant1-pos2'):
-                    updated_lines.append(f'ant1-pos2          ={lon}       # (deg)\n')
-                elif line.startswith('ant1-pos3'):
-                    updated_lines.append(f'ant1-pos3          ={height}       # (m)\n')
-                elif line.startswith('ant2-pos1'):
-                    updated_lines.append(f'ant2-pos1          ={lat}  # (deg|m)\n')
-                elif line.startswith('ant2-pos2'):
-                    updated_lines.append(f'ant2-pos2          ={lon}  # (deg|m)\n')
-                elif line.startswith('ant2-pos3'):
-                    updated_lines.append(f'ant2-pos3          ={height}  # (m|m)\n')
-                else:
-                    updated_lines.append(line)
-
-            # Écrire le fichier mis à jour
-            with open(config_file, 'w') as f:
-                f.writelines(updated_lines)
-
-            self.append_log(f"Fichier de configuration mis à jour avec succès:\n")
-            self.append_log(f"Latitude: {lat}\n")
-            self.append_log(f"Longitude: {lon}\n")
-            self.append_log(f"Hauteur: {height}\n")
-
-        except Exception as e:
-            raise ValueError(f"Erreur lors de la mise à jour du fichier de configuration: {str(e)}")
+        base_index = base_index or ObservationIndex(self.base_obs_list)
+        base = base_index.first_on_date(sum_date)
+        return base.filepath if base else None
 
     def apply_antenna_config(self, show_message=True):
-        """Applique la configuration de l'antenne au fichier de configuration"""
+        """Applique la configuration de l'antenne (injectée dans la configuration de chaque traitement)"""
         try:
-            config_path = self.config_path_var.get()
-            if not config_path:
+            if not self.config_path_var.get():
                 raise ValueError("Aucun fichier de configuration sélectionné")
 
             # Récupérer l'offset total calculé
             total_offset = float(self.total_offset.get())
 
-            # Lire le fichier de configuration
-            with open(config_path, 'r') as f:
-                lines = f.readlines()
-
-            # Mettre à jour la configuration
-            updated_lines = []
-            for line in lines:
-                # Appliquer l'offset seulement à ant1 (rover), pas à ant2 (base)
-                if line.startswith('ant1-antdelu'):
-                    updated_lines.append(f'ant1-antdelu       ={total_offset:.3f}          # (m)\n')
-                else:
-                    updated_lines.append(line)
-
-            # Écrire le fichier mis à jour
-            with open(config_path, 'w') as f:
-                f.writelines(updated_lines)
+            # Appliquer l'offset seulement à ant1 (rover), pas à ant2 (base)
+            self.config_settings['ant1-antdelu'].set(f"{total_offset:.3f}")
 
             self.append_log(f"Configuration antenne mise à jour:\n")
             self.append_log(f"Offset rover (ant1) appliqué: {total_offset:.3f} m\n")
@@ -2075,61 +1919,6 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
 
         self.unsaved_changes = True
 
-    def parse_sum_file(self, file_path):
-        """Analyse le fichier .sum pour extraire les coordonnées et autres informations."""
-        try:
-            parsed_data = {
-                "Date (UTC)": None,
-                "Latitude (DD)": None,
-                "Longitude (DD)": None,
-                "Elevation (m)": None
-            }
-
-            with open(file_path, "r") as file:
-                content = file.readlines()
-
-            for line in content:
-                if "POS LAT IGS20" in line:
-                    parts = line.split()
-                    try:
-                        lat_deg = float(parts[7])
-                        lat_min = float(parts[8])
-                        lat_sec = float(parts[9])
-                        lat_dd = lat_deg + lat_min/60 + lat_sec/3600
-                        parsed_data["Latitude (DD)"] = f"{lat_dd:.9f}"
-                    except (IndexError, ValueError) as e:
-                        self.append_log(f"Erreur lors de l'extraction de la latitude: {str(e)}\n")
-
-                elif "POS LON IGS20" in line:
-                    parts = line.split()
-                    try:
-                        lon_deg = float(parts[7])
-                        lon_min = float(parts[8])
-                        lon_sec = float(parts[9])
-                        lon_dd = lon_deg - (lon_min/60 + lon_sec/3600) if lon_deg < 0 else lon_deg + lon_min/60 + lon_sec/3600
-                        parsed_data["Longitude (DD)"] = f"{lon_dd:.9f}"
-                    except (IndexError, ValueError) as e:
-                        self.append_log(f"Erreur lors de l'extraction de la longitude: {str(e)}\n")
-
-                elif "POS HGT IGS20" in line:
-                    parts = line.split()
-                    try:
-                        # Ne garder que la valeur de la hauteur sans le sigma
-                        parsed_data["Elevation (m)"] = parts[5]
-                    except (IndexError, ValueError) as e:
-                        self.append_log(f"Erreur lors de l'extraction de la hauteur: {str(e)}\n")
-
-            # Logs pour le débogage
-            self.append_log(f"Données extraites du fichier .sum:\n")
-            self.append_log(f"Latitude: {parsed_data['Latitude (DD)']}\n")
-            self.append_log(f"Longitude: {parsed_data['Longitude (DD)']}\n")
-            self.append_log(f"Hauteur: {parsed_data['Elevation (m)']}\n")
-
-            return parsed_data
-
-        except Exception as e:
-            raise ValueError(f"Erreur lors de l'analyse du fichier .sum: {e}")
-
     def update_coord_mode(self):
         """Met à jour l'interface selon le mode sélectionné"""
         mode = self.coord_mode.get()
@@ -2160,14 +1949,15 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             # Vider la Listbox
             self.sum_files_listbox.delete(0, tk.END)
             
-            # Réafficher tous les fichiers
+            # Réafficher tous les fichiers (index des bases construit une seule fois)
+            base_index = ObservationIndex(self.base_obs_list)
             for sum_file_path in self.sum_files:
                 sum_filename = Path(sum_file_path).stem
                 sum_date = self.extract_date_from_filename(sum_filename)
                 formatted_date = self.format_date(sum_date) if sum_date else "Date inconnue"
                 
                 # Vérifier la correspondance
-                matching_base = self.find_matching_base_file(sum_date)
+                matching_base = self.find_matching_base_file(sum_date, base_index)
                 status = "✓" if matching_base else ""
                 
                 # Créer le texte d'affichage
@@ -2188,13 +1978,10 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
             response = messagebox.askyesnocancel("Quitter", "Des modifications non sauvegardées existent.\nVoulez-vous sauvegarder avant de quitter ?")
             if response:  # Oui
                 self.save_project()
-                self.master.destroy()
             elif response is None:  # Annuler
                 return
-            else:  # Non
-                self.master.destroy()
-        else:
-            self.master.destroy()
+        self.log_writer.close()
+        self.master.destroy()
 
     def on_entry_change(self, *args):
         self.unsaved_changes = True
@@ -2260,13 +2047,19 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
         
         if export_path:
             try:
-                # Récupérer les en-têtes
+                # Récupérer les en-têtes, puis les statistiques complètes absentes du tableau
                 headers = [self.stats_tree.heading(col)['text'] for col in self.stats_tree['columns']]
+                rows = [
+                    (self.stats_tree.item(item)['values'],
+                     flatten_statistics(self.row_statistics[item]) if item in self.row_statistics else {})
+                    for item in self.stats_tree.get_children()
+                ]
+                extra = []
+                for _, flat in rows:
+                    extra.extend(key for key in flat if key not in headers and key not in extra)
+                headers += extra
                 # Récupérer les données
-                data = []
-                for item in self.stats_tree.get_children():
-                    values = self.stats_tree.item(item)['values']
-                    data.append(values)
+                data = [list(values) + [flat.get(key, '') for key in extra] for values, flat in rows]
                 
                 # Écrire dans le fichier CSV
                 with open(export_path, 'w', newline='', encoding='utf-8') as f:
@@ -2331,6 +2124,8 @@ Follow these steps to prepare and run batch PPK data processing efficiently with
                 "RTKLIB executable not found.\nPlease check the installation.")
 
 def main():
+    # Le convertisseur POS lit les fichiers dans des processus (exécutable figé sous Windows)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = PPKProcessorGUI(root)
     root.mainloop()
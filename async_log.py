@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+
+
+class AsyncLogWriter:
+    """Journal asynchrone : les messages sont mis en file et écrits par un thread dédié
+
+    write() peut être appelé depuis n'importe quel thread. Le fichier reste ouvert
+    et reçoit les messages par lots ; il est renommé (log.txt.1, log.txt.2, ...)
+    lorsqu'il dépasse max_bytes. L'interface lit sa propre file avec drain().
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, log_file, max_bytes=5 * 1024 * 1024, backup_count=3, flush_interval=0.5):
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.file_queue = queue.Queue()
+        self.display_queue = queue.Queue()
+        self.stream = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, message, display=True):
+        if self.closed:
+            return
+        self.file_queue.put(message)
+        if display:
+            self.display_queue.put(message)
+
+    def drain(self, max_messages=1000):
+        """Messages en attente d'affichage (au plus max_messages)"""
+        messages = []
+        try:
+            while len(messages) < max_messages:
+                messages.append(self.display_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    def close(self, timeout=5):
+        """Écrit les messages restants puis arrête le thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.file_queue.put(None)
+        self.thread.join(timeout)
+
+    def run(self):
+        running = True
+        while running:
+            try:
+                batch = [self.file_queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Regrouper ce qui est déjà en file en une seule écriture
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(self.file_queue.get_nowait())
+            except queue.Empty:
+                pass
+            if None in batch:
+                running = False
+                batch = [message for message in batch if message is not None]
+            if batch:
+                self.write_batch(''.join(batch))
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+    def write_batch(self, text):
+        try:
+            if self.stream is None:
+                self.stream = open(self.log_file, 'a', encoding='utf-8')
+            if self.max_bytes and self.stream.tell() + len(text) > self.max_bytes and self.stream.tell() > 0:
+                self.rotate()
+            self.stream.write(text)
+            self.stream.flush()
+        except Exception as e:
+            print(f"Erreur d'écriture dans le fichier log: {str(e)}")
+
+    def rotate(self):
+        """log.txt -> log.txt.1 -> log.txt.2 ... (les plus anciens sont supprimés)"""
+        self.stream.close()
+        self.stream = None
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.log_file}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.log_file}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            os.remove(self.log_file)
+        self.stream = open(self.log_file, 'a', encoding='utf-8')
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+
+# Séparateurs reconnus entre degrés, minutes et secondes (ramenés à un blanc)
+DMS_SEPARATORS = bytes.maketrans(b'\'":\t\r', b'     ')
+DMS_MARKS = tuple(mark.encode('utf-8') for mark in '°º′″')
+
+# Classes des octets du texte normalisé (octets non ASCII : autres)
+OTHER, DIGIT, DOT, SPACE, MINUS, PLUS, NORTH, SOUTH, NEWLINE = range(9)
+CHAR_CLASSES = np.full(256, OTHER, dtype=np.int8)
+CHAR_CLASSES[np.frombuffer(b'0123456789', dtype=np.uint8)] = DIGIT
+CHAR_CLASSES[ord('.')] = DOT
+CHAR_CLASSES[ord(' ')] = SPACE
+CHAR_CLASSES[ord('-')] = MINUS
+CHAR_CLASSES[ord('+')] = PLUS
+CHAR_CLASSES[np.frombuffer(b'NE', dtype=np.uint8)] = NORTH
+CHAR_CLASSES[np.frombuffer(b'SW', dtype=np.uint8)] = SOUTH
+CHAR_CLASSES[ord('\n')] = NEWLINE
+
+# Au-delà de 15 chiffres, la mantisse entière ne serait plus exacte en float64
+MAX_DIGITS = 15
+POWERS_OF_TEN = 10.0 ** np.arange(MAX_DIGITS + 1)
+
+# Caractères qui distinguent un texte d m s d'un simple nombre
+DMS_MARKERS_RE = r'[°º\'′"″:NSEW]|\d\s+\d'
+
+
+def dms_array_to_dd(values, errors='coerce'):
+    """Degrés décimaux (float64) d'une colonne de textes d m s, sans boucle par valeur
+
+    Formats acceptés : degrés, degrés minutes ou degrés minutes secondes,
+    séparés par des blancs, ° ' " (ou ′ ″) ou ':' ; signe '-'/'+' devant ou
+    lettre d'hémisphère N/S/E/W devant ou derrière (73° 9' 18.99", -79 58 39.88,
+    S 33:52:07.68, 079°58'39.88"W, 45.5). Le signe de '-0° 30' 15"' est conservé.
+
+    Toutes les valeurs sont réunies en un seul bloc d'octets, classés puis
+    rattachés à leur nombre et à leur ligne par des opérations sur tableaux :
+    chaque nombre est une mantisse entière exacte divisée par 10^décimales
+    (valeur correctement arrondie). Les valeurs illisibles donnent NaN, ou
+    ValueError avec errors='raise'.
+    """
+    shape = np.shape(values)
+    items = np.asarray(values, dtype=object).ravel()
+    count = len(items)
+    if not count:
+        return np.empty(shape)
+    try:
+        text = '\n'.join(items)
+        if text.count('\n') != count - 1:
+            raise TypeError
+    except TypeError:
+        # Valeurs non textuelles (None, nombres) ou retours à la ligne dans une valeur
+        text = '\n'.join(['' if item is None else str(item).replace('\n', ' ') for item in items])
+    data = (text + '\n').encode('utf-8')
+    for mark in DMS_MARKS:
+        data = data.replace(mark, b' ')
+    chars = np.frombuffer(data.translate(DMS_SEPARATORS), dtype=np.uint8)
+    classes = CHAR_CLASSES[chars]
+
+    # Ligne de chaque caractère (le '\n' final appartient à sa ligne)
+    line_ends = np.flatnonzero(classes == NEWLINE)
+    rows = np.repeat(np.arange(count, dtype=np.int32), np.diff(line_ends, prepend=-1))
+
+    # Nombres : suites de chiffres et de points
+    digit = classes == DIGIT
+    dot = classes == DOT
+    numeric = digit | dot
+    previous = np.concatenate(([False], numeric[:-1]))
+    following = np.concatenate((numeric[1:], [False]))
+    starts = numeric & ~previous
+    ends = np.flatnonzero(numeric & ~following)
+    token_ids = np.cumsum(starts, dtype=np.int32) - 1
+    token_rows = rows[starts]
+    token_count = len(token_rows)
+    tokens_per_row = np.bincount(token_rows, minlength=count)
+    first_token = np.cumsum(tokens_per_row) - tokens_per_row
+
+    invalid = (tokens_per_row == 0) | (tokens_per_row > 3)
+    invalid |= np.bincount(rows[classes == OTHER], minlength=count) > 0
+
+    # Mantisse : chaque chiffre pèse 10^(chiffres qui le suivent dans son nombre)
+    digits_seen = np.cumsum(digit, dtype=np.int32)
+    digit_positions = np.flatnonzero(digit)
+    digit_tokens = token_ids[digit_positions]
+    following_digits = digits_seen[ends][digit_tokens] - digits_seen[digit_positions]
+    token_digits = np.bincount(digit_tokens, minlength=token_count)
+    token_dots = np.bincount(token_ids[dot], minlength=token_count)
+    # Un point au plus, au moins un chiffre et pas plus de MAX_DIGITS chiffres par nombre
+    invalid[token_rows[(token_dots > 1) | (token_digits == 0) | (token_digits > MAX_DIGITS)]] = True
+    weights = (chars[digit_positions] - 48) * POWERS_OF_TEN[np.minimum(following_digits, MAX_DIGITS)]
+    mantissas = np.bincount(digit_tokens, weights=weights, minlength=token_count)
+    decimals = np.zeros(token_count, dtype=np.int32)
+    dot_positions = np.flatnonzero(dot)
+    dot_tokens = token_ids[dot_positions]
+    decimals[dot_tokens] = digits_seen[ends][dot_tokens] - digits_seen[dot_positions]
+    numbers = mantissas / POWERS_OF_TEN[np.minimum(decimals, MAX_DIGITS)]
+
+    # Signe : un seul, avant le premier nombre ; hémisphère : une lettre, avant ou après les nombres
+    before = np.cumsum(starts, dtype=np.int32)    # nombres commencés jusqu'à chaque caractère inclus
+    sign = (classes == MINUS) | (classes == PLUS)
+    letter = (classes == NORTH) | (classes == SOUTH)
+    for mask, allowed_after in ((sign, False), (letter, True)):
+        positions = np.flatnonzero(mask)
+        position_rows = rows[positions]
+        seen = before[positions] - first_token[position_rows]
+        misplaced = seen != 0
+        if allowed_after:
+            misplaced &= seen != tokens_per_row[position_rows]
+        invalid[position_rows[misplaced]] = True
+        invalid |= np.bincount(position_rows, minlength=count) > 1
+    invalid |= (np.bincount(rows[sign], minlength=count) > 0) & (np.bincount(rows[letter], minlength=count) > 0)
+    negative = (np.bincount(rows[classes == MINUS], minlength=count) > 0) | (
+        np.bincount(rows[classes == SOUTH], minlength=count) > 0
+    )
+
+    # Degrés, minutes, secondes : rang du nombre dans sa ligne
+    valid_tokens = ~invalid[token_rows]
+    ranks = (np.arange(token_count) - first_token[token_rows])[valid_tokens]
+    parts = np.zeros((3, count))
+    parts[ranks, token_rows[valid_tokens]] = numbers[valid_tokens]
+    degrees, minutes, seconds = parts
+    invalid |= (minutes >= 60) | (seconds >= 60)
+
+    dd = degrees + minutes / 60 + seconds / 3600
+    dd = np.where(negative, -dd, dd)
+    dd[invalid] = np.nan
+    if errors == 'raise' and invalid.any():
+        raise ValueError(f"Invalid DMS format: {items[int(np.argmax(invalid))]}")
+    return dd.reshape(shape)
+
+
+def dms_to_dd(dms_str):
+    """Degrés décimaux d'un texte d m s (ValueError s'il est illisible)"""
+    return float(dms_array_to_dd([dms_str], errors='raise')[0])
+
+
+def dms_columns(frame):
+    """Colonnes texte d'un DataFrame dont la plupart des valeurs sont en d m s"""
+    columns = []
+    for column in frame.columns:
+        values = frame[column].dropna()
+        if values.empty or pd.api.types.is_numeric_dtype(values):
+            continue
+        text = values.astype(str)
+        if not text.str.contains(DMS_MARKERS_RE).any():
+            # Nombres seuls : déjà en degrés décimaux
+            continue
+        if np.isfinite(dms_array_to_dd(text.to_numpy())).mean() >= 0.5:
+            columns.append(column)
+    return columns
+
+
+def convert_dms_columns(frame, columns=None, decimals=9):
+    """Ajoute une colonne '<nom> (DD)' après chaque colonne d m s
+
+    columns : colonnes à convertir (par défaut, détectées par dms_columns).
+    Retourne le nouveau DataFrame et {colonne: nombre de valeurs illisibles}.
+    """
+    columns = dms_columns(frame) if columns is None else list(columns)
+    result = frame.copy()
+    invalid = {}
+    for column in columns:
+        values = frame[column]
+        present = values.notna().to_numpy()
+        dd = dms_array_to_dd(np.where(present, values.astype(str).to_numpy(dtype=object), ''))
+        invalid[column] = int((np.isnan(dd) & present).sum())
+        result.insert(result.columns.get_loc(column) + 1, f"{column} (DD)", np.round(dd, decimals))
+    return result, invalid
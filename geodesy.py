@@ -0,0 +1,224 @@
+import numpy as np
+
+
+# Ellipsoïde WGS84
+WGS84_A = 6378137.0
+WGS84_F = 1.0 / 298.257223563
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)
+WGS84_E = np.sqrt(WGS84_E2)
+WGS84_B = WGS84_A * (1.0 - WGS84_F)
+WGS84_EP2 = WGS84_E2 / (1.0 - WGS84_E2)
+
+# Projection UTM : facteur d'échelle central, fausses origines
+UTM_K0 = 0.9996
+UTM_FALSE_EASTING = 500000.0
+UTM_FALSE_NORTHING_SOUTH = 10000000.0
+
+# Séries de Krüger à l'ordre 6 en n (Karney 2011) : erreur < 1 mm dans la zone et bien au-delà
+THIRD_FLATTENING = WGS84_F / (2.0 - WGS84_F)
+UTM_RECTIFYING_RADIUS = WGS84_A / (1.0 + THIRD_FLATTENING) * (
+    1.0 + THIRD_FLATTENING ** 2 / 4 + THIRD_FLATTENING ** 4 / 64 + THIRD_FLATTENING ** 6 / 256
+)
+# Coefficients de n, n², ... n⁶ de chaque terme (alpha : direct, beta : inverse)
+UTM_POWERS = THIRD_FLATTENING ** np.arange(1, 7)
+UTM_ALPHA = np.array([
+    [1 / 2, -2 / 3, 5 / 16, 41 / 180, -127 / 288, 7891 / 37800],
+    [0, 13 / 48, -3 / 5, 557 / 1440, 281 / 630, -1983433 / 1935360],
+    [0, 0, 61 / 240, -103 / 140, 15061 / 26880, 167603 / 181440],
+    [0, 0, 0, 49561 / 161280, -179 / 168, 6601661 / 7257600],
+    [0, 0, 0, 0, 34729 / 80640, -3418889 / 1995840],
+    [0, 0, 0, 0, 0, 212378941 / 319334400],
+]) @ UTM_POWERS
+UTM_BETA = np.array([
+    [1 / 2, -2 / 3, 37 / 96, -1 / 360, -81 / 512, 96199 / 604800],
+    [0, 1 / 48, 1 / 15, -437 / 1440, 46 / 105, -1118711 / 3870720],
+    [0, 0, 17 / 480, -37 / 840, -209 / 4480, 5569 / 90720],
+    [0, 0, 0, 4397 / 161280, -11 / 504, -830251 / 7257600],
+    [0, 0, 0, 0, 4583 / 161280, -108847 / 3991680],
+    [0, 0, 0, 0, 0, 20648693 / 638668800],
+]) @ UTM_POWERS
+
+
+def metres_per_degree(latitude):
+    """Longueur (m) d'un degré de latitude et de longitude sur l'ellipsoïde WGS84"""
+    phi = np.radians(latitude)
+    w = 1.0 - WGS84_E2 * np.sin(phi) ** 2
+    north = np.radians(1.0) * WGS84_A * (1.0 - WGS84_E2) / w ** 1.5
+    east = np.radians(1.0) * WGS84_A / np.sqrt(w) * np.cos(phi)
+    return north, east
+
+
+def geodetic_to_ecef(latitude, longitude, height):
+    """X, Y, Z (m) de positions géographiques (degrés, hauteur ellipsoïdale en m)"""
+    phi = np.radians(latitude)
+    lam = np.radians(longitude)
+    sin_phi = np.sin(phi)
+    cos_phi = np.cos(phi)
+    radius = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_phi * sin_phi)
+    horizontal = (radius + height) * cos_phi
+    return horizontal * np.cos(lam), horizontal * np.sin(lam), (radius * (1.0 - WGS84_E2) + height) * sin_phi
+
+
+def ecef_to_geodetic(x, y, z):
+    """Latitude, longitude (degrés) et hauteur ellipsoïdale (m) de coordonnées ECEF
+
+    Formule de Bowring suivie de deux itérations sur la latitude : précision
+    bien meilleure que le millimètre de la surface jusqu'aux orbites.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    p = np.hypot(x, y)
+    theta = np.arctan2(z * WGS84_A, p * WGS84_B)
+    phi = np.arctan2(z + WGS84_EP2 * WGS84_B * np.sin(theta) ** 3, p - WGS84_E2 * WGS84_A * np.cos(theta) ** 3)
+    for _ in range(2):
+        sin_phi = np.sin(phi)
+        radius = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_phi * sin_phi)
+        phi = np.arctan2(z + WGS84_E2 * radius * sin_phi, p)
+    sin_phi = np.sin(phi)
+    cos_phi = np.cos(phi)
+    radius = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_phi * sin_phi)
+    # Hauteur par projection sur la normale (stable aux pôles comme à l'équateur)
+    height = p * cos_phi + z * sin_phi - WGS84_A * np.sqrt(1.0 - WGS84_E2 * sin_phi * sin_phi)
+    return np.degrees(phi), np.degrees(np.arctan2(y, x)), height
+
+
+def utm_zone(latitude, longitude):
+    """Numéro de zone UTM (1-60) de chaque position, exceptions Norvège et Svalbard comprises"""
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = (np.asarray(longitude, dtype=np.float64) + 180.0) % 360.0 - 180.0
+    zone = np.clip(np.floor((longitude + 180.0) / 6.0).astype(np.int64) + 1, 1, 60)
+    zone = np.where((latitude >= 56) & (latitude < 64) & (longitude >= 3) & (longitude < 12), 32, zone)
+    svalbard = (latitude >= 72) & (latitude < 84) & (longitude >= 0) & (longitude < 42)
+    svalbard_zone = 31 + 2 * np.floor((longitude + 3.0) / 12.0).astype(np.int64)
+    return np.where(svalbard, svalbard_zone, zone)
+
+
+def utm_zone_label(zone, south):
+    """Libellés de zone ('17N', '56S'), comme dans les lignes PRJ des fichiers .sum"""
+    zone = np.asarray(zone)
+    return np.char.add(zone.astype(str), np.where(south, 'S', 'N'))
+
+
+def central_meridian(zone):
+    return 6.0 * np.asarray(zone, dtype=np.float64) - 183.0
+
+
+def sine_series(zeta, coefficients):
+    """Somme des coefficients[j] * sin(2 (j+1) zeta) pour zeta complexe
+
+    Avec u = exp(2i zeta), sin(2j zeta) = (u^j - u^-j) / 2i : deux polynômes
+    évalués par Horner remplacent douze sinus et cosinus hyperboliques.
+    """
+    u = np.exp(2j * zeta)
+    v = 1.0 / u
+    forward = np.zeros_like(u)
+    backward = np.zeros_like(u)
+    for coefficient in coefficients[::-1]:
+        forward = (forward + coefficient) * u
+        backward = (backward + coefficient) * v
+    return (forward - backward) / 2j
+
+
+def geodetic_to_utm(latitude, longitude, zone=None, south=None):
+    """Est, nord (m), zone et hémisphère (True au sud) de positions géographiques
+
+    zone : None pour la zone de chaque position (utm_zone), ou une zone imposée
+    (entier ou tableau) pour garder une seule grille de part et d'autre d'une
+    limite de zone. south : par défaut, hémisphère de chaque latitude.
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    if zone is None:
+        zone = utm_zone(latitude, longitude)
+    zone = np.broadcast_to(np.asarray(zone, dtype=np.int64), np.broadcast(latitude, longitude).shape)
+    south = latitude < 0 if south is None else np.broadcast_to(np.asarray(south, dtype=bool), zone.shape)
+
+    phi = np.radians(latitude)
+    lam = np.radians((longitude - central_meridian(zone) + 180.0) % 360.0 - 180.0)
+    sin_phi = np.sin(phi)
+    # Tangente de la latitude conforme
+    tau = np.sinh(np.arctanh(sin_phi) - WGS84_E * np.arctanh(WGS84_E * sin_phi))
+    xi = np.arctan2(tau, np.cos(lam))
+    eta = np.arctanh(np.sin(lam) / np.sqrt(1.0 + tau * tau))
+    zeta = xi + 1j * eta
+    zeta = zeta + sine_series(zeta, UTM_ALPHA)
+
+    scale = UTM_K0 * UTM_RECTIFYING_RADIUS
+    easting = UTM_FALSE_EASTING + scale * zeta.imag
+    northing = scale * zeta.real + np.where(south, UTM_FALSE_NORTHING_SOUTH, 0.0)
+    return easting, northing, zone.copy(), np.asarray(south).copy()
+
+
+def utm_to_geodetic(easting, northing, zone, south=False):
+    """Latitude et longitude (degrés) de coordonnées UTM d'une zone et d'un hémisphère"""
+    easting = np.asarray(easting, dtype=np.float64)
+    northing = np.asarray(northing, dtype=np.float64)
+    scale = UTM_K0 * UTM_RECTIFYING_RADIUS
+    xi = (northing - np.where(south, UTM_FALSE_NORTHING_SOUTH, 0.0)) / scale
+    eta = (easting - UTM_FALSE_EASTING) / scale
+    zeta = xi + 1j * eta
+    zeta = zeta - sine_series(zeta, UTM_BETA)
+    xi, eta = zeta.real, zeta.imag
+
+    sinh_eta = np.sinh(eta)
+    cos_xi = np.cos(xi)
+    tau_prime = np.sin(xi) / np.hypot(sinh_eta, cos_xi)
+    # Latitude géographique depuis la latitude conforme : Newton, convergence quadratique
+    tau = tau_prime.copy()
+    for _ in range(3):
+        root = np.sqrt(1.0 + tau * tau)
+        sigma = np.sinh(WGS84_E * np.arctanh(WGS84_E * tau / root))
+        tau_i = tau * np.sqrt(1.0 + sigma * sigma) - sigma * root
+        tau = tau + (tau_prime - tau_i) / np.sqrt(1.0 + tau_i * tau_i) * (
+            (1.0 + (1.0 - WGS84_E2) * tau * tau) / ((1.0 - WGS84_E2) * root)
+        )
+    latitude = np.degrees(np.arctan(tau))
+    longitude = central_meridian(zone) + np.degrees(np.arctan2(sinh_eta, cos_xi))
+    return latitude, (longitude + 180.0) % 360.0 - 180.0
+
+
+def enu_rotation(latitude, longitude):
+    """Matrice 3x3 ECEF -> est, nord, haut au point (latitude, longitude) en degrés"""
+    phi = np.radians(latitude)
+    lam = np.radians(longitude)
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+    sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+    return np.array([
+        [-sin_lam, cos_lam, 0.0],
+        [-sin_phi * cos_lam, -sin_phi * sin_lam, cos_phi],
+        [cos_phi * cos_lam, cos_phi * sin_lam, sin_phi],
+    ])
+
+
+def ecef_to_enu(x, y, z, origin):
+    """Est, nord, haut (m) de coordonnées ECEF autour de origin (latitude, longitude, hauteur)"""
+    rotation = enu_rotation(origin[0], origin[1])
+    x0, y0, z0 = geodetic_to_ecef(*origin)
+    dx = np.asarray(x, dtype=np.float64) - x0
+    dy = np.asarray(y, dtype=np.float64) - y0
+    dz = np.asarray(z, dtype=np.float64) - z0
+    return tuple(row[0] * dx + row[1] * dy + row[2] * dz for row in rotation)
+
+
+def enu_to_ecef(east, north, up, origin):
+    """Coordonnées ECEF de décalages est, nord, haut (m) autour de origin"""
+    rotation = enu_rotation(origin[0], origin[1])
+    x0, y0, z0 = geodetic_to_ecef(*origin)
+    east = np.asarray(east, dtype=np.float64)
+    north = np.asarray(north, dtype=np.float64)
+    up = np.asarray(up, dtype=np.float64)
+    return tuple(
+        base + rotation[0, i] * east + rotation[1, i] * north + rotation[2, i] * up
+        for i, base in enumerate((x0, y0, z0))
+    )
+
+
+def geodetic_to_enu(latitude, longitude, height, origin):
+    """Est, nord, haut (m) de positions géographiques autour de origin (latitude, longitude, hauteur)"""
+    return ecef_to_enu(*geodetic_to_ecef(latitude, longitude, height), origin)
+
+
+def enu_to_geodetic(east, north, up, origin):
+    """Latitude, longitude (degrés) et hauteur (m) de décalages est, nord, haut autour de origin"""
+    return ecef_to_geodetic(*enu_to_ecef(east, north, up, origin))
@@ -0,0 +1,422 @@
+import csv
+import os
+import re
+import sqlite3
+
+import numpy as np
+
+from geodesy import ecef_to_geodetic, geodetic_to_utm, utm_zone_label
+from pos_reader import CHUNK_BYTES, FRAME_COLUMNS, columns_frame, iter_pos_chunks
+
+
+# Colonnes exportées (mêmes noms que le tableau du convertisseur POS)
+EXPORT_COLUMNS = (
+    'Filename', 'Date', 'Time', 'Latitude', 'Longitude', 'Height', 'Q', 'Ns',
+    'Sdn', 'Sde', 'Sdu', 'Sdne', 'Sdeu', 'Sdun', 'Age', 'Ratio'
+)
+# Colonnes UTM ajoutées en option (zone de chaque époque, coordonnées en m)
+UTM_COLUMNS = ('UTM Zone', 'Easting', 'Northing')
+
+# Décimales des valeurs stockées en float32 (précision du fichier .pos)
+EXPORT_DECIMALS = {
+    'Sdn': 4, 'Sde': 4, 'Sdu': 4, 'Sdne': 4, 'Sdeu': 4, 'Sdun': 4, 'Age': 2, 'Ratio': 1,
+}
+
+# Limite d'une feuille Excel (ligne d'en-tête comprise)
+EXCEL_MAX_ROWS = 1048576
+EXCEL_SHEET_NAME = 'POS'
+# Caractères interdits dans un nom de feuille, longueur maximale
+SHEET_NAME_RE = re.compile(r'[\[\]:*?/\\]')
+SHEET_NAME_LENGTH = 31
+
+# GeoPackage : identifiant d'application 'GPKG', version 1.2, WGS84 géographique
+GPKG_APPLICATION_ID = 0x47504B47
+GPKG_USER_VERSION = 10200
+GPKG_SRS_ID = 4326
+GPKG_LAYER_NAME = 'pos'
+
+# En-tête GeoPackage (sans enveloppe, petit-boutiste) suivi d'un point WKB ISO PointZ
+GPKG_POINT_DTYPE = np.dtype([
+    ('magic', 'S2'), ('version', 'u1'), ('flags', 'u1'), ('srs_id', '<i4'),
+    ('byte_order', 'u1'), ('wkb_type', '<u4'), ('x', '<f8'), ('y', '<f8'), ('z', '<f8'),
+])
+WKB_POINT_Z = 1001
+
+
+def table_columns(columns):
+    """Colonnes typées d'un .pos nommées comme le tableau du convertisseur
+
+    Les fichiers xyz/enu sont rangés par position : x/e sous Latitude, sdx/sde
+    sous Sdn, etc.
+    """
+    position, sigma = FRAME_COLUMNS[columns_frame(columns) or 'llh']
+    table = {'time': columns['time']}
+    for label, name in zip(('Latitude', 'Longitude', 'Height'), position):
+        table[label] = columns[name]
+    table['Q'] = columns['Q']
+    table['Ns'] = columns['ns']
+    for label, name in zip(('Sdn', 'Sde', 'Sdu', 'Sdne', 'Sdeu', 'Sdun'), sigma):
+        table[label] = columns[name]
+    table['Age'] = columns['age']
+    table['Ratio'] = columns['ratio']
+    return table
+
+
+def export_columns(utm=False):
+    return EXPORT_COLUMNS + UTM_COLUMNS if utm else EXPORT_COLUMNS
+
+
+def geographic_positions(columns):
+    """Latitude, longitude (degrés) et hauteur d'un bloc llh ou xyz (ECEF) ; None en enu"""
+    frame = columns_frame(columns) or 'llh'
+    if frame == 'llh':
+        return columns['lat'], columns['lon'], columns['height']
+    if frame == 'xyz':
+        return ecef_to_geodetic(columns['x'], columns['y'], columns['z'])
+    return None
+
+
+def utm_values(columns):
+    """Zone ('17N'), est et nord UTM de chaque époque (vides pour une solution enu)"""
+    positions = geographic_positions(columns)
+    if positions is None:
+        count = len(columns['time'])
+        return {'UTM Zone': np.full(count, ''), 'Easting': np.full(count, np.nan), 'Northing': np.full(count, np.nan)}
+    easting, northing, zone, south = geodetic_to_utm(positions[0], positions[1])
+    return {
+        'UTM Zone': utm_zone_label(zone, south),
+        'Easting': np.round(easting, 4),
+        'Northing': np.round(northing, 4),
+    }
+
+
+def export_values(columns, utm=False):
+    """Colonnes d'export d'un bloc : date et heure en texte, float32 arrondis
+
+    Avec utm, les colonnes UTM_COLUMNS sont ajoutées.
+    """
+    table = table_columns(columns)
+    stamps = np.datetime_as_string(table.pop('time'), unit='ms')
+    values = {
+        'Date': np.char.replace(stamps.astype('U10'), '-', '/'),
+        'Time': np.char.partition(stamps, 'T')[:, 2],
+    }
+    for label, column in table.items():
+        column = np.asarray(column)
+        if label in EXPORT_DECIMALS:
+            column = np.round(column.astype(np.float64), EXPORT_DECIMALS[label])
+        values[label] = column
+    if utm:
+        values.update(utm_values(columns))
+    return values
+
+
+def export_rows(filename, columns, utm=False):
+    """Lignes (listes Python) d'un bloc de colonnes, dans l'ordre de export_columns(utm)"""
+    values = export_values(columns, utm)
+    lists = [values[label].tolist() for label in export_columns(utm)[1:]]
+    return [[filename] + list(row) for row in zip(*lists)]
+
+
+def sheet_title(name, used):
+    """Nom de feuille Excel valide et unique dans le classeur"""
+    base = SHEET_NAME_RE.sub('_', name)[:SHEET_NAME_LENGTH] or EXCEL_SHEET_NAME
+    title = base
+    index = 2
+    while title.lower() in used:
+        suffix = f" ({index})"
+        title = base[:SHEET_NAME_LENGTH - len(suffix)] + suffix
+        index += 1
+    used.add(title.lower())
+    return title
+
+
+def file_label(name):
+    """Nom d'un fichier .pos utilisable comme partition ou nom de couche (sans extension)"""
+    return re.sub(r'[^\w.-]', '_', os.path.splitext(name)[0]) or 'pos'
+
+
+class ExcelPosWriter:
+    """Classeur Excel écrit en flux (openpyxl write-only)
+
+    Les lignes sont écrites au fur et à mesure et ne restent pas en mémoire.
+    Une feuille pleine (EXCEL_MAX_ROWS) est continuée sur une nouvelle feuille ;
+    avec sheet_per_file, chaque fichier .pos commence sa propre feuille.
+    Avec utm, les colonnes UTM_COLUMNS sont ajoutées.
+    """
+
+    def __init__(self, path, sheet_per_file=False, max_rows=EXCEL_MAX_ROWS, utm=False):
+        import openpyxl
+
+        self.path = path
+        self.sheet_per_file = sheet_per_file
+        self.utm = utm
+        self.max_rows = max_rows
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = None
+        self.sheet_rows = 0
+        self.sheet_source = None
+        self.titles = set()
+        self.sheets = []
+        self.rows = 0
+
+    def new_sheet(self, name):
+        self.sheet = self.workbook.create_sheet(sheet_title(name, self.titles))
+        self.sheet.append(list(export_columns(self.utm)))
+        self.sheet_rows = 1
+        self.sheets.append(self.sheet.title)
+
+    def write(self, filename, columns):
+        rows = export_rows(filename, columns, self.utm)
+        if self.sheet_per_file and filename != self.sheet_source:
+            self.sheet = None
+        self.sheet_source = filename
+        start = 0
+        while start < len(rows):
+            if self.sheet is None or self.sheet_rows >= self.max_rows:
+                self.new_sheet(filename if self.sheet_per_file else EXCEL_SHEET_NAME)
+            stop = start + min(len(rows) - start, self.max_rows - self.sheet_rows)
+            for row in rows[start:stop]:
+                self.sheet.append(row)
+            self.sheet_rows += stop - start
+            start = stop
+        self.rows += len(rows)
+
+    def close(self):
+        if not self.sheets:
+            # Classeur vide : une feuille avec l'en-tête seulement
+            self.new_sheet(EXCEL_SHEET_NAME)
+        self.workbook.save(self.path)
+
+
+class CsvPosWriter:
+    """Fichier CSV écrit bloc par bloc (mêmes colonnes que l'export Excel)"""
+
+    def __init__(self, path, utm=False):
+        self.path = path
+        self.utm = utm
+        self.stream = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(export_columns(utm))
+        self.rows = 0
+
+    def write(self, filename, columns):
+        rows = export_rows(filename, columns, self.utm)
+        self.writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self):
+        self.stream.close()
+
+
+class ParquetPosWriter:
+    """Jeu de données Parquet partitionné date=AAAA-MM-JJ/file=<nom du .pos>/
+
+    Les colonnes gardent leur type (horodatage, float64, float32, int8) ;
+    chaque partition reçoit un fichier Parquet écrit par groupes de lignes
+    au fil des blocs. Lisible en une fois avec pandas.read_parquet(dossier)
+    ou pyarrow.dataset. Avec utm, les colonnes UTM_COLUMNS sont ajoutées.
+
+    Réexporter dans le même dossier remplace les partitions des fichiers
+    réécrits (leurs anciens .parquet sont supprimés) ; les autres sont gardées.
+    """
+
+    def __init__(self, path, utm=False):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.utm = utm
+        self.writers = {}
+        self.parts = {}   # {dossier de partition: nombre de fichiers écrits par cet export}
+        self.source = None
+        self.rows = 0
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, filename, columns):
+        if filename != self.source:
+            # Fichiers .pos écrits l'un après l'autre : leurs partitions sont terminées
+            self.close_writers()
+            self.source = filename
+        table = table_columns(columns)
+        if self.utm:
+            table.update(utm_values(columns))
+        times = np.asarray(table['time'])
+        days = times.astype('datetime64[D]')
+        # Une partition par jour : le bloc est découpé aux changements de date
+        bounds = np.flatnonzero(days[1:] != days[:-1]) + 1
+        for start, stop in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(times)]))):
+            batch = self.pa.table({
+                ('Time' if label == 'time' else label): np.asarray(values[start:stop])
+                for label, values in table.items()
+            })
+            key = str(days[start])
+            if key not in self.writers:
+                folder = os.path.join(self.path, f"date={key}", f"file={file_label(filename)}")
+                self.writers[key] = self.pq.ParquetWriter(self.part_path(folder), batch.schema)
+            self.writers[key].write_table(batch)
+        self.rows += len(times)
+
+    def part_path(self, folder):
+        """Nouveau fichier de la partition ; à la première utilisation, ses anciens fichiers sont supprimés"""
+        if folder not in self.parts:
+            os.makedirs(folder, exist_ok=True)
+            for name in os.listdir(folder):
+                if name.endswith('.parquet'):
+                    os.remove(os.path.join(folder, name))
+            self.parts[folder] = 0
+        index = self.parts[folder]
+        self.parts[folder] += 1
+        return os.path.join(folder, f"part-{index}.parquet")
+
+    def close_writers(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+    def close(self):
+        self.close_writers()
+
+
+class GeoPackagePosWriter:
+    """Couche de points GeoPackage (WGS84, PointZ) écrite avec sqlite3
+
+    Une seule couche 'pos' avec le nom du fichier en attribut, ou une couche
+    par fichier .pos (layer_per_file). Les .pos en ECEF (xyz) sont convertis
+    en latitude/longitude ; les solutions enu ne peuvent pas être exportées.
+    """
+
+    ATTRIBUTES = (
+        ('Filename', 'TEXT'), ('Time', 'DATETIME'), ('Height', 'DOUBLE'), ('Q', 'INTEGER'),
+        ('Ns', 'INTEGER'), ('Sdn', 'REAL'), ('Sde', 'REAL'), ('Sdu', 'REAL'), ('Sdne', 'REAL'),
+        ('Sdeu', 'REAL'), ('Sdun', 'REAL'), ('Age', 'REAL'), ('Ratio', 'REAL'),
+    )
+
+    def __init__(self, path, layer_per_file=False):
+        if os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.layer_per_file = layer_per_file
+        # Créé dans le thread Tk, rempli par le thread d'export
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=OFF')
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self.connection.execute(f'PRAGMA application_id={GPKG_APPLICATION_ID}')
+        self.connection.execute(f'PRAGMA user_version={GPKG_USER_VERSION}')
+        self.create_metadata()
+        self.layers = {}   # {nom de couche: [min x, min y, max x, max y]}
+        self.rows = 0
+
+    def create_metadata(self):
+        self.connection.executescript("""
+            CREATE TABLE gpkg_spatial_ref_sys (
+                srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY, organization TEXT NOT NULL,
+                organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT
+            );
+            CREATE TABLE gpkg_contents (
+                table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,
+                description TEXT DEFAULT '', last_change DATETIME NOT NULL
+                    DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+                min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, srs_id INTEGER,
+                CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id)
+            );
+            CREATE TABLE gpkg_geometry_columns (
+                table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+                srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+                CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name)
+            );
+        """)
+        self.connection.executemany('INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)', [
+            ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', None),
+            ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', None),
+            ('WGS 84 geodetic', GPKG_SRS_ID, 'EPSG', 4326,
+             'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,'
+             'AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,'
+             'AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],'
+             'AUTHORITY["EPSG","4326"]]', None),
+        ])
+
+    def layer(self, filename):
+        name = file_label(filename) if self.layer_per_file else GPKG_LAYER_NAME
+        if name not in self.layers:
+            attributes = ', '.join(f'"{column}" {sql_type}' for column, sql_type in self.ATTRIBUTES)
+            self.connection.execute(
+                f'CREATE TABLE "{name}" (fid INTEGER PRIMARY KEY AUTOINCREMENT, geom POINTZ, {attributes})'
+            )
+            self.connection.execute(
+                "INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) VALUES (?, 'features', ?, ?)",
+                (name, name, GPKG_SRS_ID)
+            )
+            self.connection.execute(
+                "INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', 'POINT', ?, 1, 0)", (name, GPKG_SRS_ID)
+            )
+            self.layers[name] = [np.inf, np.inf, -np.inf, -np.inf]
+        return name
+
+    def write(self, filename, columns):
+        positions = geographic_positions(columns)
+        if positions is None:
+            raise ValueError(f"{filename}: GeoPackage export needs latitude/longitude or ECEF .pos files")
+        name = self.layer(filename)
+        values = export_values(columns)
+        lat, lon, height = (np.asarray(value, dtype=np.float64) for value in positions)
+
+        points = np.zeros(len(lat), dtype=GPKG_POINT_DTYPE)
+        points['magic'] = b'GP'
+        points['flags'] = 1   # petit-boutiste, sans enveloppe
+        points['srs_id'] = GPKG_SRS_ID
+        points['byte_order'] = 1
+        points['wkb_type'] = WKB_POINT_Z
+        points['x'] = lon
+        points['y'] = lat
+        points['z'] = height
+        blobs = points.tobytes()
+        size = GPKG_POINT_DTYPE.itemsize
+
+        stamps = np.char.add(np.datetime_as_string(np.asarray(columns['time']), unit='ms'), 'Z').tolist()
+        attributes = [values[column].tolist() for column, _ in self.ATTRIBUTES[3:]]
+        rows = [
+            (blobs[i * size:(i + 1) * size], filename, stamps[i], *row)
+            for i, row in enumerate(zip(height.tolist(), *attributes))
+        ]
+        placeholders = ', '.join('?' * (len(self.ATTRIBUTES) + 1))
+        columns_sql = ', '.join(f'"{column}"' for column, _ in self.ATTRIBUTES)
+        with self.connection:
+            self.connection.executemany(f'INSERT INTO "{name}" (geom, {columns_sql}) VALUES ({placeholders})', rows)
+
+        extent = self.layers[name]
+        extent[:] = [min(extent[0], lon.min()), min(extent[1], lat.min()),
+                     max(extent[2], lon.max()), max(extent[3], lat.max())]
+        self.rows += len(rows)
+
+    def close(self):
+        with self.connection:
+            for name, (min_x, min_y, max_x, max_y) in self.layers.items():
+                self.connection.execute(
+                    'UPDATE gpkg_contents SET min_x = ?, min_y = ?, max_x = ?, max_y = ? WHERE table_name = ?',
+                    (float(min_x), float(min_y), float(max_x), float(max_y), name)
+                )
+        self.connection.close()
+
+
+def export_pos_files(sources, writer, on_progress=None, chunk_bytes=None, buckets=None, filters=None):
+    """Écrit les époques de fichiers .pos [(nom, chemin)] bloc par bloc dans writer
+
+    Les blocs viennent directement du lecteur .pos (ou de son cache) : la
+    mémoire utilisée ne dépend pas de la taille de la campagne.
+    on_progress(lignes écrites) est appelé après chaque bloc. Avec filters
+    (PosFilter) et buckets (TimeBuckets), les époques sont filtrées puis
+    réduites comme à la lecture.
+    """
+    try:
+        for filename, path in sources:
+            chunks = iter_pos_chunks(path, chunk_bytes or CHUNK_BYTES, buckets=buckets, filters=filters)
+            for columns in chunks:
+                writer.write(filename, columns)
+                if on_progress:
+                    on_progress(writer.rows)
+    finally:
+        writer.close()
+    return writer.rows
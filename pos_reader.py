@@ -0,0 +1,962 @@
+import concurrent.futures
+import functools
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+import numpy as np
+
+
+# Colonnes de position et d'écarts-types selon le type de solution RTKLIB (out-solformat)
+FRAME_COLUMNS = {
+    'llh': (('lat', 'lon', 'height'), ('sdn', 'sde', 'sdu', 'sdne', 'sdeu', 'sdun')),
+    'xyz': (('x', 'y', 'z'), ('sdx', 'sdy', 'sdz', 'sdxy', 'sdyz', 'sdzx')),
+    'enu': (('e', 'n', 'u'), ('sde', 'sdn', 'sdu', 'sden', 'sdnu', 'sdue')),
+}
+
+# Types des colonnes (mémoire et cache disque)
+POSITION_DTYPE = '<f8'
+SIGMA_DTYPE = '<f4'
+EXTRA_DTYPES = {'time': 'datetime64[ms]', 'Q': 'i1', 'ns': 'i1', 'age': '<f4', 'ratio': '<f4'}
+
+# Origine du temps GPS (semaine 0) pour le format semaine/TOW
+GPS_EPOCH = np.datetime64('1980-01-06T00:00:00', 'ms')
+
+# Ligne d'en-tête des colonnes : "%  GPST   latitude(deg) longitude(deg) height(m) ..."
+TIME_SYSTEM_RE = re.compile(r'^%\s*(GPST|UTC|JST)\b')
+
+# '2024/07/15 10:00:00.000' devient '2024 07 15 10 00 00.000' : toute la ligne est numérique
+DATE_SEPARATORS = str.maketrans('/:', '  ')
+# Même conversion sur les octets lus ; les fins de ligne Windows (\r) deviennent des blancs
+DATA_SEPARATORS = bytes.maketrans(b'/:\r', b'   ')
+
+# Lecture à largeur fixe : colonnes séparatrices (blanc, '/' et ':' des dates, \r des
+# fins de ligne Windows) et caractères admis dans les colonnes de nombres
+FIXED_WIDTH_SEPARATORS = (32, 47, 58, 13)
+NUMBER_CHARS = np.zeros(256, dtype=bool)
+NUMBER_CHARS[[32, 45]] = True
+NUMBER_CHARS[48:58] = True
+
+# Lignes converties à la fois (les mots de chiffres restent en cache)
+FIXED_WIDTH_ROWS = 2048
+
+# Conversion de 8 chiffres lus comme un mot de 64 bits (petit-boutiste), valeur des
+# chiffres dans l'octet de poids faible : regroupement par 2, 4 puis 8 chiffres
+# (multiplication et décalage pour chaque étape)
+SWAR_STEPS = (
+    (np.uint64(10 * 256 + 1), np.uint64(8), np.uint64(0x00FF00FF00FF00FF)),
+    (np.uint64(100 * 65536 + 1), np.uint64(16), np.uint64(0x0000FFFF0000FFFF)),
+    (np.uint64(10000 * 2 ** 32 + 1), np.uint64(32), np.uint64(0x00000000FFFFFFFF)),
+)
+
+# Taille approximative d'un bloc lu en mémoire
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Réduction par intervalles de temps : première époque ou moyenne de l'intervalle
+RESAMPLE_MODES = ('decimate', 'mean')
+
+# Cache binaire à côté du .pos : en-tête JSON puis une zone contiguë par colonne
+CACHE_SUFFIX = '.cache'
+CACHE_MAGIC = b'PPKPOS2\n'
+CACHE_ALIGN = 64
+
+# Index épars temps -> position (octets) d'une ligne tous les INDEX_STRIDE octets
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'PPKIDX1\n'
+INDEX_STRIDE = 64 * 1024
+
+
+class PosFormat:
+    """Format d'un fichier .pos déclaré par son en-tête RTKLIB
+
+    time : 'hms' (aaaa/mm/jj hh:mm:ss.sss) ou 'tow' (semaine, secondes) ;
+    frame : 'llh', 'xyz' ou 'enu' ; dms : latitude/longitude en d m s.
+    """
+
+    def __init__(self, time='hms', frame='llh', dms=False, time_system='GPST'):
+        self.time = time
+        self.frame = frame
+        self.dms = dms
+        self.time_system = time_system
+
+    @property
+    def position_columns(self):
+        return FRAME_COLUMNS[self.frame][0]
+
+    @property
+    def sigma_columns(self):
+        return FRAME_COLUMNS[self.frame][1]
+
+    @property
+    def columns(self):
+        """Colonnes après le temps, dans l'ordre du fichier"""
+        return self.position_columns + ('Q', 'ns') + self.sigma_columns + ('age', 'ratio')
+
+    @property
+    def dtypes(self):
+        dtypes = {'time': EXTRA_DTYPES['time']}
+        for name in self.columns:
+            if name in EXTRA_DTYPES:
+                dtypes[name] = EXTRA_DTYPES[name]
+            elif name in self.position_columns:
+                dtypes[name] = POSITION_DTYPE
+            else:
+                dtypes[name] = SIGMA_DTYPE
+        return dtypes
+
+    @property
+    def time_fields(self):
+        return 6 if self.time == 'hms' else 2
+
+    @property
+    def field_count(self):
+        """Nombre de valeurs numériques par ligne de données"""
+        position_fields = 7 if self.dms else 3  # d m s, d m s, hauteur
+        return self.time_fields + position_fields + len(self.columns) - 3
+
+    def to_dict(self):
+        return {'time': self.time, 'frame': self.frame, 'dms': self.dms, 'time_system': self.time_system}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __eq__(self, other):
+        return isinstance(other, PosFormat) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PosFormat({self.time}, {self.frame}{', dms' if self.dms else ''}, {self.time_system})"
+
+
+def detect_pos_format(header, first_line=None):
+    """Détermine le format à partir des lignes d'en-tête (%) et de la première ligne de données"""
+    fmt = PosFormat()
+    labels = header[-1] if header else ''
+    for line in header:
+        match = TIME_SYSTEM_RE.match(line)
+        if match:
+            labels = line
+            fmt.time_system = match.group(1)
+
+    if 'x-ecef' in labels:
+        fmt.frame = 'xyz'
+    elif 'e-baseline' in labels:
+        fmt.frame = 'enu'
+    elif "latitude(d'" in labels:
+        fmt.dms = True
+
+    if first_line is not None:
+        tokens = first_line.split()
+        if tokens and '/' not in tokens[0]:
+            fmt.time = 'tow'
+        elif not header:
+            # Sans en-tête : latitude en d m s si la ligne compte 4 valeurs de plus
+            fmt.dms = len(first_line.translate(DATE_SEPARATORS).split()) == PosFormat(dms=True).field_count
+    return fmt
+
+
+def epoch_milliseconds(fields):
+    """Millisecondes depuis 1970 (datetime64[ms]) à partir des colonnes année..secondes"""
+    years = fields[:, 0].astype(np.int64) - 1970
+    months = fields[:, 1].astype(np.int64) - 1
+    days = fields[:, 2].astype(np.int64) - 1
+    dates = (years.astype('datetime64[Y]') + months.astype('timedelta64[M]')).astype('datetime64[D]')
+    dates = dates + days.astype('timedelta64[D]')
+    seconds = fields[:, 3] * 3600.0 + fields[:, 4] * 60.0 + fields[:, 5]
+    return dates.astype('datetime64[ms]') + np.rint(seconds * 1000.0).astype('timedelta64[ms]')
+
+
+def tow_milliseconds(fields):
+    """datetime64[ms] à partir des colonnes semaine GPS et secondes de la semaine"""
+    milliseconds = np.rint((fields[:, 0] * 604800.0 + fields[:, 1]) * 1000.0).astype(np.int64)
+    return GPS_EPOCH + milliseconds.astype('timedelta64[ms]')
+
+
+def dms_degrees(degrees, minutes, seconds):
+    """Degrés décimaux ; le signe est porté par les degrés (y compris -0)"""
+    return np.copysign(np.abs(degrees) + minutes / 60.0 + seconds / 3600.0, degrees)
+
+
+def parse_fixed_width(data, ncols):
+    """Valeurs (lignes x ncols) d'un bloc d'octets dont toutes les lignes ont la même largeur
+
+    RTKLIB écrit des colonnes à largeur fixe : chaque champ occupe les mêmes
+    caractères sur toutes les lignes et le point décimal est toujours à la même
+    place. Les colonnes sont classées d'après leurs octets minimum et maximum
+    (séparateur, point, chiffre, ou mélange blanc/signe/chiffre vérifié case
+    par case). Les chiffres de chaque champ sont regroupés en mots de 64 bits
+    convertis 8 chiffres à la fois ; l'entier exact obtenu, divisé par
+    10^décimales, donne la valeur correctement arrondie, comme np.fromstring.
+    Retourne None si le bloc ne suit pas ce schéma.
+    """
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    width = data.index(b'\n') + 1
+    if len(data) % width or width <= 8:
+        return None
+    lines = np.frombuffer(data, dtype=np.uint8).reshape(-1, width)
+    if not (lines[:, -1] == 10).all():
+        return None
+    chars = lines[:, :-1]
+
+    low = chars.min(axis=0)
+    high = chars.max(axis=0)
+    constant = low == high
+    separator = constant & np.isin(low, FIXED_WIDTH_SEPARATORS)
+    dot = constant & (low == 46)
+    digit = (low >= 48) & (high <= 57)
+    # Colonnes où blancs, signe et chiffres se mélangent (début des nombres cadrés à droite)
+    mixed_columns = np.flatnonzero(~(separator | dot | digit))
+    mixed = chars[:, mixed_columns]
+    if not NUMBER_CHARS[mixed].all():
+        return None
+
+    # Champs : plages de colonnes séparées par des colonnes séparatrices
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], (~separator).view(np.int8), [0]))))
+    if len(edges) != 2 * ncols:
+        return None
+    starts, stops = edges[::2], edges[1::2]
+    if not digit[stops - 1].all():
+        return None
+
+    # Mots de 8 octets lus de droite à gauche dans chaque champ, avec le masque des octets
+    # de chiffres, celui des chiffres à gauche du point (décalés d'un octet pour combler
+    # le point) et le poids 10^k du mot dans la mantisse entière du champ
+    field_of = np.full(chars.shape[1], -1)
+    offsets, masks, shifts, weights = [], [], [], []
+    scales = np.ones(ncols)
+    for i, (start, stop) in enumerate(zip(starts, stops)):
+        field_of[start:stop] = i
+        dots = [column for column in range(start, stop) if dot[column]]
+        field_mixed = [column for column in range(start, stop) if not (digit[column] or dot[column])]
+        # Au plus un point ; blancs et signe seulement avant les chiffres ; au plus 15 chiffres (float64 exact)
+        if len(dots) > 1 or stop - start - len(dots) > 15 or (field_mixed and field_mixed[-1] - start >= len(field_mixed)):
+            return None
+        if dots:
+            scales[i] = 10.0 ** (stop - 1 - dots[0])
+        digits = 0
+        for end in range(stop, start, -8):
+            columns = [column for column in range(max(start, end - 8), end) if column not in dots]
+            point = bool(dots) and end - 8 < dots[0] < end
+            offsets.append(end - 8)
+            masks.append(sum(15 << 8 * (column - end + 8) for column in columns))
+            shifts.append(sum(15 << 8 * (column - end + 8) for column in columns if point and column < dots[0]))
+            weights.append((i, 10.0 ** digits))
+            digits += len(columns)
+
+    # Dans les colonnes mélangées : pas de blanc ni de signe après un caractère non blanc
+    filled = mixed != 32
+    following = (mixed_columns[1:] == mixed_columns[:-1] + 1) & (field_of[mixed_columns[1:]] == field_of[mixed_columns[:-1]])
+    if following.any():
+        pairs = np.flatnonzero(following)
+        if (filled[:, pairs] & (~filled[:, pairs + 1] | (mixed[:, pairs + 1] == 45))).any():
+            return None
+    minus = mixed == 45
+    sign_columns = np.flatnonzero(minus.any(axis=0))
+
+    # Vues (non alignées) des 8 octets qui commencent à chaque colonne - 8 des lignes ;
+    # la première ligne est lue dans une copie précédée de 8 blancs
+    first = np.ndarray((1, width), dtype='<u8', buffer=b' ' * 8 + data[:width], strides=(width, 1))
+    rest = np.ndarray((len(chars) - 1, width), dtype='<u8', buffer=data, offset=width - 8, strides=(width, 1))
+    offsets = np.array(offsets) + 8
+    masks = np.array(masks, dtype=np.uint64)
+    shifts = np.array(shifts, dtype=np.uint64)
+    matrix = np.zeros((len(offsets), ncols))
+    for k, (i, weight) in enumerate(weights):
+        matrix[k, i] = weight
+
+    values = np.empty((len(chars), ncols))
+    blocks = [(first, values[:1])]
+    blocks += [(rest[row:row + FIXED_WIDTH_ROWS], values[1 + row:1 + row + FIXED_WIDTH_ROWS])
+               for row in range(0, len(rest), FIXED_WIDTH_ROWS)]
+    for windows, out in blocks:
+        word = windows[:, offsets]
+        word &= masks
+        word += (word & shifts) * np.uint64(255)
+        for factor, shift, mask in SWAR_STEPS:
+            word *= factor
+            word >>= shift
+            word &= mask
+        # Mantisses entières < 2^53 : le produit matriciel en float64 est exact
+        np.matmul(word.astype(np.float64), matrix, out=out)
+
+    # Un '-' est lu comme le chiffre 13 (0x2D & 0x0F) : on le retire de la mantisse, puis
+    # négation en flottant ('-0 30 15.0' en d m s garde son signe)
+    for j in sign_columns:
+        column = mixed_columns[j]
+        field = field_of[column]
+        digits = np.count_nonzero(~dot[column + 1:stops[field]])
+        mantissa = values[:, field] - minus[:, j] * (13.0 * 10.0 ** digits)
+        values[:, field] = np.where(minus[:, j], -mantissa, mantissa)
+    values /= scales
+    return values
+
+
+def parse_lines(text, ncols):
+    """Valeurs des lignes complètes et numériques d'un texte ; les autres lignes sont écartées"""
+    rows = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < ncols:
+            continue
+        try:
+            rows.append([float(field) for field in fields[:ncols]])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=np.float64).reshape(-1, ncols)
+
+
+def data_lines(block):
+    """Lignes de données d'un bloc d'octets (sans lignes d'en-tête %)"""
+    # En-tête en début de fichier : on l'écarte sans découper le reste du bloc
+    start = 0
+    while block.startswith((b'%', b'\n', b'\r\n'), start):
+        start = block.find(b'\n', start) + 1 or len(block)
+    # Les lignes vides restantes sont ignorées par parse_pos_block
+    if block.find(b'%', start) < 0:
+        return block[start:] if start else block
+    return b''.join(line for line in block.splitlines(True) if line.strip() and not line.startswith(b'%'))
+
+
+def parse_pos_block(data, fmt=None, filters=None):
+    """Convertit un bloc de lignes de données .pos (octets) en colonnes typées
+
+    Tout le bloc est converti d'un coup (largeur fixe, sinon np.fromstring)
+    puis découpé en colonnes. Seul un bloc contenant une ligne invalide
+    (texte, ligne tronquée) est relu ligne par ligne ; ces lignes sont
+    écartées sans perdre le reste du bloc. Avec filters (PosFilter), les
+    époques rejetées sont écartées avant la création des colonnes typées.
+    """
+    fmt = fmt or PosFormat()
+    ncols = fmt.field_count
+    if isinstance(data, str):
+        data = data.encode('ascii', errors='replace')
+    values = parse_fixed_width(data, ncols) if data else None
+    if values is None:
+        text = data.translate(DATA_SEPARATORS).decode('ascii', errors='replace')
+        line_count = sum(1 for line in text.splitlines() if line.strip())
+        try:
+            values = np.fromstring(text, dtype=np.float64, sep=' ') if line_count else np.empty(0)
+        except ValueError:
+            values = None
+        if values is None or values.size != ncols * line_count:
+            # Lignes tronquées, texte ou colonnes en trop : on ne garde que les lignes valides
+            values = parse_lines(text, ncols)
+    values = values.reshape(-1, ncols)
+
+    # Colonnes en float64 (vues sur le tableau de valeurs), typées après le filtrage
+    raw = {'time': epoch_milliseconds(values) if fmt.time == 'hms' else tow_milliseconds(values)}
+    i = fmt.time_fields
+    if fmt.dms:
+        raw['lat'] = dms_degrees(values[:, i], values[:, i + 1], values[:, i + 2])
+        raw['lon'] = dms_degrees(values[:, i + 3], values[:, i + 4], values[:, i + 5])
+        i += 6
+        names = fmt.columns[2:]
+    else:
+        names = fmt.columns
+    for name in names:
+        raw[name] = values[:, i]
+        i += 1
+
+    if filters:
+        mask = filters.mask(raw)
+        if not mask.all():
+            raw = {name: column[mask] for name, column in raw.items()}
+    dtypes = fmt.dtypes
+    return {name: column.astype(dtypes[name], copy=False) for name, column in raw.items()}
+
+
+def read_pos_header(pos_file):
+    """Lignes d'en-tête (%) d'un fichier .pos et première ligne de données"""
+    header = []
+    first_line = None
+    with open(pos_file, 'r', errors='replace') as f:
+        for line in f:
+            if line.startswith('%'):
+                header.append(line.rstrip('\n'))
+            elif line.strip():
+                first_line = line
+                break
+    return header, first_line
+
+
+def read_pos_format(pos_file):
+    return detect_pos_format(*read_pos_header(pos_file))
+
+
+def cache_path(pos_file):
+    return f"{pos_file}{CACHE_SUFFIX}"
+
+
+def source_signature(pos_file):
+    stat = os.stat(pos_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PosCacheWriter:
+    """Écrit le cache d'un .pos au fil de la lecture (une colonne par fichier temporaire)
+
+    Les colonnes sont réunies dans le fichier cache à la fin ; la mémoire
+    utilisée ne dépend pas de la taille du .pos. Un dossier non inscriptible
+    désactive simplement le cache.
+    """
+
+    def __init__(self, pos_file, fmt):
+        self.pos_file = pos_file
+        self.fmt = fmt
+        self.signature = source_signature(pos_file)
+        self.rows = 0
+        self.parts = {}
+        try:
+            directory = os.path.dirname(os.path.abspath(pos_file))
+            for name in fmt.dtypes:
+                self.parts[name] = tempfile.TemporaryFile(dir=directory)
+        except OSError:
+            self.abort()
+
+    @property
+    def active(self):
+        return bool(self.parts)
+
+    def add(self, columns):
+        if not self.active:
+            return
+        try:
+            for name, dtype in self.fmt.dtypes.items():
+                self.parts[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            self.rows += len(columns['time'])
+        except OSError:
+            self.abort()
+
+    def finish(self):
+        """Assemble le fichier cache (remplacement atomique)"""
+        if not self.active:
+            return None
+        path = cache_path(self.pos_file)
+        tmp_path = f"{path}.tmp"
+        try:
+            # La source ne doit pas avoir changé pendant la lecture
+            if source_signature(self.pos_file) != self.signature:
+                return None
+            layout = []
+            offset = 0
+            for name, dtype in self.fmt.dtypes.items():
+                layout.append([name, dtype, offset])
+                offset += self.rows * np.dtype(dtype).itemsize
+                offset += -offset % CACHE_ALIGN
+            header = json.dumps({
+                'source_size': self.signature[0],
+                'source_mtime': self.signature[1],
+                'rows': self.rows,
+                'format': self.fmt.to_dict(),
+                'columns': layout,
+            }).encode()
+            data_start = len(CACHE_MAGIC) + 4 + len(header)
+            data_start += -data_start % CACHE_ALIGN
+            with open(tmp_path, 'wb') as f:
+                f.write(CACHE_MAGIC + struct.pack('<I', len(header)) + header)
+                for name, dtype, column_offset in layout:
+                    f.seek(data_start + column_offset)
+                    part = self.parts[name]
+                    part.seek(0)
+                    while True:
+                        block = part.read(CHUNK_BYTES)
+                        if not block:
+                            break
+                        f.write(block)
+                f.truncate(data_start + offset)
+            os.replace(tmp_path, path)
+            return path
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        finally:
+            self.abort()
+
+    def abort(self):
+        for part in self.parts.values():
+            part.close()
+        self.parts = {}
+
+
+def load_pos_cache(pos_file, with_format=False):
+    """Colonnes d'un .pos depuis son cache (tableaux memmap), None si absent ou périmé"""
+    path = cache_path(pos_file)
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+        if (header['source_size'], header['source_mtime']) != source_signature(pos_file):
+            return None
+        data_start = len(CACHE_MAGIC) + 4 + length
+        data_start += -data_start % CACHE_ALIGN
+        rows = header['rows']
+        columns = {}
+        for name, dtype, offset in header['columns']:
+            if rows:
+                columns[name] = np.memmap(path, dtype=dtype, mode='r', offset=data_start + offset, shape=(rows,))
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+        if with_format:
+            return columns, PosFormat.from_dict(header['format'])
+        return columns
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
+
+
+class PosFilter:
+    """Conditions de lecture d'un .pos : les époques qui n'y répondent pas sont écartées
+
+    quality : Q acceptés (ex. {1} pour les solutions fixées) ; start / end :
+    fenêtre de temps, bornes comprises (datetime64 ou texte ISO, dans le
+    système de temps du fichier) ; bbox : (lat min, lon min, lat max, lon max)
+    en degrés ; max_sdu : écart-type vertical maximal en mètres.
+    """
+
+    def __init__(self, quality=None, start=None, end=None, bbox=None, max_sdu=None):
+        self.quality = sorted({int(q) for q in quality}) if quality else None
+        self.start = np.datetime64(start, 'ms') if start is not None else None
+        self.end = np.datetime64(end, 'ms') if end is not None else None
+        self.bbox = tuple(float(value) for value in bbox) if bbox else None
+        self.max_sdu = float(max_sdu) if max_sdu is not None else None
+        if self.bbox and (len(self.bbox) != 4 or self.bbox[0] > self.bbox[2] or self.bbox[1] > self.bbox[3]):
+            raise ValueError(f"Invalid bounding box: {bbox}")
+
+    def __bool__(self):
+        return any(value is not None for value in (self.quality, self.start, self.end, self.bbox, self.max_sdu))
+
+    def __repr__(self):
+        return (f"PosFilter(quality={self.quality}, start={self.start}, end={self.end}, "
+                f"bbox={self.bbox}, max_sdu={self.max_sdu})")
+
+    def mask(self, columns):
+        """Époques retenues (tableau booléen)"""
+        mask = np.ones(len(columns['time']), dtype=bool)
+        if self.quality:
+            mask &= np.isin(columns['Q'], self.quality)
+        if self.start is not None:
+            mask &= columns['time'] >= self.start
+        if self.end is not None:
+            mask &= columns['time'] <= self.end
+        if self.bbox:
+            if 'lat' not in columns:
+                raise ValueError("The bounding box filter needs latitude/longitude .pos files")
+            lat = np.asarray(columns['lat'])
+            lon = np.asarray(columns['lon'])
+            mask &= (lat >= self.bbox[0]) & (lat <= self.bbox[2]) & (lon >= self.bbox[1]) & (lon <= self.bbox[3])
+        if self.max_sdu is not None:
+            if 'sdu' not in columns:
+                raise ValueError("The sdu filter needs llh or enu .pos files")
+            mask &= np.asarray(columns['sdu']) <= self.max_sdu
+        return mask
+
+    def time_window(self, times):
+        """Tranche [début, fin] d'époques triées par recherche binaire, None si non triées"""
+        if self.start is None and self.end is None:
+            return slice(0, len(times))
+        milliseconds = np.asarray(times).view(np.int64)
+        if len(milliseconds) > 1 and (np.diff(milliseconds) < 0).any():
+            return None
+        start = np.searchsorted(times, self.start, 'left') if self.start is not None else 0
+        end = np.searchsorted(times, self.end, 'right') if self.end is not None else len(times)
+        return slice(int(start), int(max(start, end)))
+
+    def apply(self, columns):
+        mask = self.mask(columns)
+        if mask.all():
+            return columns
+        return {name: np.asarray(values)[mask] for name, values in columns.items()}
+
+
+class TimeBuckets:
+    """Réduction des époques par intervalles de `seconds` secondes
+
+    Les intervalles sont alignés sur les secondes rondes depuis 1970 (donc sur
+    minuit quand seconds divise 86400). En mode 'decimate', la première époque
+    de chaque intervalle est gardée ; en mode 'mean', l'intervalle donne une
+    époque datée de son début : position moyenne, pire Q (le plus grand), ns
+    minimal, écarts-types quadratiques moyens, âge maximal et ratio minimal.
+    """
+
+    def __init__(self, seconds, mode='decimate'):
+        if seconds <= 0:
+            raise ValueError(f"Invalid bucket length: {seconds}")
+        if mode not in RESAMPLE_MODES:
+            raise ValueError(f"Unknown resample mode: {mode}")
+        self.milliseconds = int(round(seconds * 1000))
+        self.mode = mode
+
+    def __repr__(self):
+        return f"TimeBuckets({self.milliseconds / 1000:g} s, {self.mode})"
+
+    def keys(self, times):
+        return np.asarray(times).astype(np.int64) // self.milliseconds
+
+    def reduce(self, columns):
+        """Une époque par intervalle (époques consécutives de même intervalle)"""
+        keys = self.keys(columns['time'])
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+        if self.mode == 'decimate':
+            return {name: np.asarray(values)[starts] for name, values in columns.items()}
+
+        counts = np.diff(np.append(starts, len(keys)))
+        position, sigma = FRAME_COLUMNS[columns_frame(columns) or 'llh']
+        reduced = {'time': (keys[starts] * self.milliseconds).astype('datetime64[ms]')}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if name in position:
+                reduced[name] = np.add.reduceat(values, starts) / counts
+            elif name in sigma:
+                squares = np.add.reduceat(values.astype(np.float64) ** 2, starts)
+                reduced[name] = np.sqrt(squares / counts).astype(values.dtype)
+            elif name in ('Q', 'age'):
+                reduced[name] = np.maximum.reduceat(values, starts)
+            elif name in ('ns', 'ratio'):
+                reduced[name] = np.minimum.reduceat(values, starts)
+        return reduced
+
+    def apply(self, chunks):
+        """Blocs réduits ; un intervalle à cheval sur deux blocs est réduit une seule fois"""
+        pending = None
+        for columns in chunks:
+            if pending is not None:
+                columns = {name: np.concatenate((pending[name], values)) for name, values in columns.items()}
+            keys = self.keys(columns['time'])
+            # Le dernier intervalle peut se poursuivre dans le bloc suivant
+            last = len(keys) - int(np.argmax(keys[::-1] != keys[-1])) if (keys != keys[-1]).any() else 0
+            pending = {name: np.asarray(values)[last:] for name, values in columns.items()}
+            if last:
+                yield self.reduce({name: values[:last] for name, values in columns.items()})
+        if pending is not None and len(pending['time']):
+            yield self.reduce(pending)
+
+
+def iter_pos_chunks(pos_file, chunk_bytes=CHUNK_BYTES, use_cache=True, fmt=None, buckets=None, filters=None):
+    """Parcourt un fichier .pos par blocs d'environ chunk_bytes
+
+    Les lignes d'en-tête (%) et les lignes vides sont ignorées. La mémoire
+    utilisée ne dépend que de la taille des blocs, pas de celle du fichier.
+    Si un cache à jour existe, les blocs sont lus dans le cache ; sinon le
+    cache est écrit pendant la lecture complète du fichier. Avec filters
+    (PosFilter), seules les époques retenues sont rendues ; avec buckets
+    (TimeBuckets), les blocs filtrés sont réduits par intervalles de temps.
+    """
+    if buckets:
+        yield from buckets.apply(iter_pos_chunks(pos_file, chunk_bytes, use_cache, fmt, filters=filters))
+        return
+
+    if use_cache:
+        cached = load_pos_cache(pos_file)
+        if cached is not None:
+            if filters:
+                # Fenêtre de temps par recherche binaire : le reste du cache n'est pas lu
+                window = filters.time_window(cached['time'])
+                if window is not None:
+                    cached = {name: column[window] for name, column in cached.items()}
+            rows = len(cached['time'])
+            step = max(1, chunk_bytes // 100)
+            for start in range(0, rows, step):
+                columns = {name: column[start:start + step] for name, column in cached.items()}
+                if filters:
+                    columns = filters.apply(columns)
+                    if not len(columns['time']):
+                        continue
+                yield columns
+            return
+
+    fmt = fmt or read_pos_format(pos_file)
+    writer = PosCacheWriter(pos_file, fmt) if use_cache else None
+    complete = False
+    try:
+        with open(pos_file, 'rb') as f:
+            while True:
+                block = f.read(chunk_bytes)
+                if not block:
+                    break
+                # Le bloc est complété jusqu'à la fin de la ligne en cours
+                if not block.endswith(b'\n'):
+                    block += f.readline()
+                data = data_lines(block)
+                if data:
+                    if writer:
+                        # Le cache garde toutes les époques ; le filtre s'applique ensuite
+                        columns = parse_pos_block(data, fmt)
+                        if len(columns['time']):
+                            writer.add(columns)
+                        if filters:
+                            columns = filters.apply(columns)
+                    else:
+                        columns = parse_pos_block(data, fmt, filters)
+                    if len(columns['time']):
+                        yield columns
+        complete = True
+    finally:
+        if writer:
+            if complete:
+                writer.finish()
+            else:
+                writer.abort()
+
+
+def read_pos_columns(pos_file, use_cache=True, with_format=False, buckets=None, filters=None):
+    """Toutes les colonnes d'un fichier .pos (dict de tableaux NumPy typés)
+
+    Avec filters (PosFilter), seules les époques retenues ; avec buckets
+    (TimeBuckets), une époque par intervalle de temps.
+    """
+    if use_cache and not buckets and not filters:
+        cached = load_pos_cache(pos_file, with_format)
+        if cached is not None:
+            return cached
+    fmt = read_pos_format(pos_file)
+    chunks = list(iter_pos_chunks(pos_file, use_cache=use_cache, fmt=fmt, buckets=buckets, filters=filters))
+    if chunks:
+        columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in fmt.dtypes}
+    else:
+        columns = {name: np.empty(0, dtype=dtype) for name, dtype in fmt.dtypes.items()}
+    return (columns, fmt) if with_format else columns
+
+
+def index_path(pos_file):
+    return f"{pos_file}{INDEX_SUFFIX}"
+
+
+class IndexedPosFile:
+    """Accès par plage de temps à un fichier .pos projeté en mémoire (mmap)
+
+    Un index épars associe le temps d'une ligne à sa position dans le fichier,
+    une ligne environ tous les `stride` octets : il est construit en ne lisant
+    que ces lignes, puis gardé dans un fichier .idx à côté du .pos. read(t0, t1)
+    ne convertit que les octets entre les deux entrées d'index qui encadrent la
+    plage ; la latence ne dépend pas de la taille du fichier. Les époques
+    doivent être en ordre chronologique, sinon tout le fichier est relu.
+
+        with IndexedPosFile('rover.pos') as pos:
+            columns = pos.read('2024-07-15T10:00', '2024-07-15T10:05')
+    """
+
+    def __init__(self, pos_file, stride=INDEX_STRIDE, use_cache=True):
+        self.pos_file = pos_file
+        self.stride = int(stride)
+        self.fmt = read_pos_format(pos_file)
+        self.file = open(pos_file, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        # mmap refuse les fichiers vides
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.size = size
+
+        index = self.load_index() if use_cache else None
+        if index is None:
+            index = self.build_index()
+            if use_cache:
+                self.save_index(*index)
+        self.times, self.offsets = index
+        self.ordered = not (np.diff(self.times.view(np.int64)) < 0).any()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b''
+        self.file.close()
+
+    @property
+    def start(self):
+        """Première époque (None si le fichier ne contient aucune donnée)"""
+        return self.times[0] if len(self.times) else None
+
+    @property
+    def end(self):
+        return self.times[-1] if len(self.times) else None
+
+    def line_at(self, offset):
+        """Début de la première ligne de données à partir de offset (None en fin de fichier)"""
+        data = self.data
+        while offset < self.size:
+            end = data.find(b'\n', offset)
+            end = self.size if end < 0 else end + 1
+            if data[offset:end].strip() and data[offset:offset + 1] != b'%':
+                return offset
+            offset = end
+        return None
+
+    def build_index(self):
+        """Temps et positions d'une ligne par tranche de stride octets, plus la dernière ligne"""
+        offsets = []
+        position = 0
+        while True:
+            offset = self.line_at(position)
+            if offset is None:
+                break
+            if not offsets or offset > offsets[-1]:
+                offsets.append(offset)
+            # Début de la ligne suivant le prochain saut de stride octets
+            newline = self.data.find(b'\n', offset + self.stride)
+            if newline < 0:
+                break
+            position = newline + 1
+        if offsets:
+            last = self.data.rfind(b'\n', 0, self.size - 1) + 1
+            last = self.line_at(last)
+            if last is not None and last > offsets[-1]:
+                offsets.append(last)
+
+        lines = []
+        for offset in offsets:
+            end = self.data.find(b'\n', offset)
+            lines.append(self.data[offset:end + 1 if end >= 0 else self.size].rstrip(b'\r\n') + b'\n')
+        times = parse_pos_block(b''.join(lines), self.fmt)['time'] if lines else np.empty(0, 'datetime64[ms]')
+        if len(times) != len(offsets):
+            # Ligne échantillonnée incomplète : conversion ligne par ligne, on écarte les illisibles
+            kept = [(offset, parse_pos_block(line, self.fmt)['time']) for offset, line in zip(offsets, lines)]
+            kept = [(offset, time[0]) for offset, time in kept if len(time)]
+            offsets = [offset for offset, _ in kept]
+            times = np.array([time for _, time in kept], dtype='datetime64[ms]')
+        return times.astype('datetime64[ms]'), np.array(offsets, dtype=np.int64)
+
+    def load_index(self):
+        """Index du fichier .idx, None s'il est absent, périmé ou d'un autre pas"""
+        try:
+            with open(index_path(self.pos_file), 'rb') as f:
+                if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return None
+                (length,) = struct.unpack('<I', f.read(4))
+                header = json.loads(f.read(length))
+                if ((header['source_size'], header['source_mtime']) != source_signature(self.pos_file)
+                        or header['stride'] != self.stride):
+                    return None
+                count = header['count']
+                times = np.fromfile(f, dtype='<i8', count=count).view('datetime64[ms]')
+                offsets = np.fromfile(f, dtype='<i8', count=count)
+            if len(times) != count or len(offsets) != count:
+                return None
+            return times, offsets
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+
+    def save_index(self, times, offsets):
+        """Écrit le fichier .idx (un dossier non inscriptible désactive simplement le cache)"""
+        path = index_path(self.pos_file)
+        tmp_path = f"{path}.tmp"
+        signature = source_signature(self.pos_file)
+        header = json.dumps({
+            'source_size': signature[0],
+            'source_mtime': signature[1],
+            'stride': self.stride,
+            'count': len(offsets),
+        }).encode()
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(INDEX_MAGIC + struct.pack('<I', len(header)) + header)
+                f.write(times.astype('datetime64[ms]').view('<i8').tobytes())
+                f.write(offsets.astype('<i8').tobytes())
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def byte_range(self, t0=None, t1=None):
+        """Octets [début, fin) contenant toutes les époques de [t0, t1]"""
+        if not len(self.offsets):
+            return 0, 0
+        if not self.ordered:
+            return int(self.offsets[0]), self.size
+        start, end = 0, len(self.offsets)
+        if t0 is not None:
+            # Dernière entrée strictement avant t0 : les époques égales à t0 peuvent la suivre
+            start = max(int(np.searchsorted(self.times, t0, 'left')) - 1, 0)
+        if t1 is not None:
+            # Première entrée après t1 : la plage s'arrête au début de sa ligne
+            end = int(np.searchsorted(self.times, t1, 'right'))
+        stop = int(self.offsets[end]) if end < len(self.offsets) else self.size
+        return int(self.offsets[start]), max(int(self.offsets[start]), stop)
+
+    def read(self, t0=None, t1=None, filters=None):
+        """Colonnes typées des époques de [t0, t1] (bornes comprises, None : sans limite)
+
+        t0 / t1 : datetime64 ou texte ISO dans le système de temps du fichier ;
+        filters (PosFilter) s'applique en plus à la plage lue.
+        """
+        t0 = np.datetime64(t0, 'ms') if t0 is not None else None
+        t1 = np.datetime64(t1, 'ms') if t1 is not None else None
+        start, stop = self.byte_range(t0, t1)
+        data = data_lines(self.data[start:stop]) if stop > start else b''
+        if data:
+            window = PosFilter(start=t0, end=t1)
+            columns = parse_pos_block(data, self.fmt, window or None)
+        else:
+            columns = {name: np.empty(0, dtype=dtype) for name, dtype in self.fmt.dtypes.items()}
+        if filters:
+            columns = filters.apply(columns)
+        return columns
+
+
+def map_pos_files(function, paths, max_workers=None, on_file=None, cancel=None):
+    """Applique function(chemin) à chaque fichier .pos dans un pool de processus (thread si un seul)
+
+    function doit être sérialisable (fonction du module ou functools.partial) ;
+    les résultats sont rendus dans l'ordre des chemins. on_file(terminés, total)
+    est appelé à chaque fichier traité. Si l'événement cancel est levé, les
+    fichiers en attente sont abandonnés et None est retourné.
+    """
+    paths = list(paths)
+    if cancel and cancel.is_set():
+        return None
+    if not paths:
+        return []
+
+    results = [None] * len(paths)
+    if len(paths) == 1:
+        # Un seul fichier : pas de processus, mais un thread pour que cancel soit suivi
+        # pendant la lecture comme avec le pool (le travail abandonné se termine seul)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    else:
+        max_workers = max_workers or min(len(paths), os.cpu_count() or 1)
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(function, path): i for i, path in enumerate(paths)}
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, timeout=0.1, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if cancel and cancel.is_set():
+                return None
+            for future in done:
+                results[futures[future]] = future.result()
+            if on_file and done:
+                on_file(len(paths) - len(pending), len(paths))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def load_pos_files(paths, max_workers=None, on_file=None, cancel=None, buckets=None, filters=None):
+    """Colonnes de plusieurs fichiers .pos lues en parallèle (voir map_pos_files)
+
+    Chaque processus renvoie des tableaux NumPy typés ; None si le chargement
+    est annulé.
+    """
+    return map_pos_files(
+        functools.partial(read_pos_columns, buckets=buckets, filters=filters),
+        paths, max_workers=max_workers, on_file=on_file, cancel=cancel
+    )
+
+
+def columns_frame(columns):
+    """Type de solution ('llh', 'xyz', 'enu') d'après les noms de colonnes"""
+    for frame, (position, _) in FRAME_COLUMNS.items():
+        if position[0] in columns:
+            return frame
+    return None
@@ -0,0 +1,317 @@
+import functools
+
+import numpy as np
+
+from geodesy import enu_to_geodetic, geodetic_to_enu
+from pos_reader import CHUNK_BYTES, FRAME_COLUMNS, columns_frame, iter_pos_chunks, map_pos_files
+
+
+QUALITY_LABELS = {1: 'fix', 2: 'float', 3: 'sbas', 4: 'dgps', 5: 'single', 6: 'ppp'}
+PERCENTILES = (50, 95, 99)
+
+# Histogrammes à bornes fixes : la mémoire ne dépend pas du nombre d'époques.
+# Écarts-types : 200 classes logarithmiques par décade de 0.1 mm à 1 km (~1 % de résolution)
+SIGMA_EDGES = np.logspace(-4, 3, 7 * 200 + 1)
+RATIO_EDGES = np.array([0, 1, 2, 3, 5, 10, 20, 50, 100, np.inf])
+MAX_SATELLITES = 128
+
+# Un écart supérieur à GAP_FACTOR fois l'intervalle nominal est compté comme une coupure
+GAP_FACTOR = 1.5
+
+# Écart-type plancher pour la pondération 1/sigma² (un sigma nul donnerait un poids infini)
+MIN_WEIGHT_SIGMA = 1e-4
+
+
+def histogram_percentile(counts, edges, percentile):
+    """Percentile approché (centre géométrique de la classe) d'un histogramme"""
+    total = counts.sum()
+    if not total:
+        return None
+    rank = np.searchsorted(np.cumsum(counts), total * percentile / 100.0)
+    rank = min(int(rank), len(counts) - 1)
+    return float(np.sqrt(edges[rank] * edges[rank + 1]))
+
+
+class PosStatistics:
+    """Statistiques d'un fichier .pos accumulées bloc par bloc (une seule lecture)"""
+
+    def __init__(self):
+        self.epochs = 0
+        self.quality_counts = np.zeros(8, dtype=np.int64)
+        self.sigma_columns = None   # sdn/sde/sdu (llh), sdx/sdy/sdz (xyz) ou sde/sdn/sdu (enu)
+        self.sigma_counts = {}
+        self.sigma_max = {}
+        self.ratio_counts = np.zeros(len(RATIO_EDGES) - 1, dtype=np.int64)
+        self.ratio_sum = 0.0
+        self.ratio_min = None
+        self.ratio_max = None
+        self.ns_counts = np.zeros(MAX_SATELLITES + 1, dtype=np.int64)
+        self.start = None
+        self.end = None
+        self.step_counts = {}   # {écart entre époques consécutives en ms: nombre}
+
+    def add(self, columns):
+        times = columns['time']
+        if not len(times):
+            return
+        self.epochs += len(times)
+
+        quality = np.clip(columns['Q'].astype(np.int64), 0, len(self.quality_counts) - 1)
+        self.quality_counts += np.bincount(quality, minlength=len(self.quality_counts))
+
+        if self.sigma_columns is None:
+            self.sigma_columns = FRAME_COLUMNS[columns_frame(columns) or 'llh'][1][:3]
+            for name in self.sigma_columns:
+                self.sigma_counts[name] = np.zeros(len(SIGMA_EDGES) + 1, dtype=np.int64)
+                self.sigma_max[name] = 0.0
+        for name in self.sigma_columns:
+            values = np.abs(columns[name])
+            # Classe 0 : sous la première borne, dernière classe : au-delà de 1 km
+            self.sigma_counts[name] += np.bincount(
+                np.searchsorted(SIGMA_EDGES, values, side='right'), minlength=len(SIGMA_EDGES) + 1
+            )
+            self.sigma_max[name] = max(self.sigma_max[name], float(values.max()))
+
+        ratio = columns['ratio']
+        counts, _ = np.histogram(ratio, bins=RATIO_EDGES)
+        self.ratio_counts += counts
+        self.ratio_sum += float(ratio.sum(dtype=np.float64))
+        self.ratio_min = float(ratio.min()) if self.ratio_min is None else min(self.ratio_min, float(ratio.min()))
+        self.ratio_max = float(ratio.max()) if self.ratio_max is None else max(self.ratio_max, float(ratio.max()))
+
+        ns = np.clip(columns['ns'].astype(np.int64), 0, MAX_SATELLITES)
+        self.ns_counts += np.bincount(ns, minlength=MAX_SATELLITES + 1)
+
+        # Écarts entre époques, y compris avec la dernière époque du bloc précédent
+        milliseconds = times.astype(np.int64)
+        if self.end is not None:
+            milliseconds = np.concatenate(([self.end.astype(np.int64)], milliseconds))
+        else:
+            self.start = times[0]
+        self.end = times[-1]
+        steps = np.diff(milliseconds)
+        steps = steps[steps > 0]
+        if len(steps):
+            values, counts = np.unique(steps, return_counts=True)
+            for value, count in zip(values.tolist(), counts.tolist()):
+                self.step_counts[value] = self.step_counts.get(value, 0) + count
+
+    def interval(self):
+        """Intervalle nominal (ms) : écart le plus fréquent entre époques"""
+        if not self.step_counts:
+            return None
+        return max(self.step_counts.items(), key=lambda item: (item[1], -item[0]))[0]
+
+    def summary(self):
+        """Résumé sérialisable (JSON) des statistiques"""
+        if not self.epochs:
+            return None
+
+        interval = self.interval()
+        gaps = {
+            step: count for step, count in self.step_counts.items() if step > interval * GAP_FACTOR
+        } if interval else {}
+
+        quality = {
+            label: round(float(self.quality_counts[q]) * 100.0 / self.epochs, 2)
+            for q, label in QUALITY_LABELS.items()
+        }
+
+        sigmas = {}
+        for name in self.sigma_columns:
+            # Bornes de classe pour la classe 0 et la dernière (hors plage)
+            edges = np.concatenate(([SIGMA_EDGES[0] / 10], SIGMA_EDGES, [self.sigma_max[name] or SIGMA_EDGES[-1]]))
+            sigmas[name] = {
+                f'p{p}': min(histogram_percentile(self.sigma_counts[name], edges, p), self.sigma_max[name])
+                for p in PERCENTILES
+            }
+            sigmas[name]['max'] = self.sigma_max[name]
+
+        ratio_bins = {}
+        for low, high, count in zip(RATIO_EDGES[:-1], RATIO_EDGES[1:], self.ratio_counts.tolist()):
+            label = f">={low:g}" if np.isinf(high) else f"{low:g}-{high:g}"
+            ratio_bins[label] = count
+
+        satellites = np.nonzero(self.ns_counts)[0]
+        span = float((self.end - self.start).astype(np.int64)) / 1000.0
+
+        return {
+            'epochs': self.epochs,
+            'start': str(self.start.astype('datetime64[s]')).replace('T', ' '),
+            'end': str(self.end.astype('datetime64[s]')).replace('T', ' '),
+            'span_s': span,
+            'interval_s': interval / 1000.0 if interval else None,
+            'gaps': sum(gaps.values()),
+            'gap_time_s': sum((step - interval) * count for step, count in gaps.items()) / 1000.0,
+            'max_gap_s': max(gaps) / 1000.0 if gaps else 0.0,
+            'quality': quality,
+            'sigma': sigmas,
+            'ratio': {
+                'mean': self.ratio_sum / self.epochs,
+                'min': self.ratio_min,
+                'max': self.ratio_max,
+                'bins': ratio_bins,
+            },
+            'ns': {
+                'min': int(satellites[0]),
+                'max': int(satellites[-1]),
+                'mean': float((self.ns_counts * np.arange(len(self.ns_counts))).sum()) / self.epochs,
+            },
+        }
+
+
+def compute_pos_statistics(pos_file, chunk_bytes=None):
+    """Statistiques complètes d'un fichier .pos (None s'il ne contient aucune époque)"""
+    stats = PosStatistics()
+    for columns in iter_pos_chunks(pos_file, chunk_bytes or CHUNK_BYTES):
+        stats.add(columns)
+    return stats.summary()
+
+
+def flatten_statistics(summary):
+    """Aplatit un résumé en colonnes (export CSV)"""
+    row = {
+        'epochs': summary['epochs'],
+        'start': summary['start'],
+        'end': summary['end'],
+        'span (s)': summary['span_s'],
+        'interval (s)': summary['interval_s'],
+        'gaps': summary['gaps'],
+        'gap time (s)': summary['gap_time_s'],
+        'max gap (s)': summary['max_gap_s'],
+    }
+    for label, value in summary['quality'].items():
+        row[f'{label} (%)'] = value
+    for name, values in summary['sigma'].items():
+        for key, value in values.items():
+            row[f'{name} {key} (m)'] = round(value, 4) if value is not None else None
+    row['ratio mean'] = round(summary['ratio']['mean'], 2)
+    row['ratio min'] = summary['ratio']['min']
+    row['ratio max'] = summary['ratio']['max']
+    for label, count in summary['ratio']['bins'].items():
+        row[f'ratio {label}'] = count
+    row['ns min'] = summary['ns']['min']
+    row['ns max'] = summary['ns']['max']
+    row['ns mean'] = round(summary['ns']['mean'], 1)
+    return row
+
+
+class WeightedPosition:
+    """Position moyenne d'un fichier .pos pondérée par 1/sigma², accumulée bloc par bloc
+
+    Chaque axe est pondéré par son propre écart-type (nord/sdn, est/sde,
+    haut/sdu ; x/sdx... en ECEF). Les sommes portent sur les écarts à la
+    première époque pour garder la précision du float64 ; en latitude/longitude,
+    ce sont des écarts nord, est, haut en mètres dans le repère local.
+    """
+
+    def __init__(self):
+        self.epochs = 0
+        self.fixed = 0
+        self.frame = None
+        self.start = None
+        self.end = None
+        self.reference = None
+        self.weights = np.zeros(3)
+        self.sums = np.zeros(3)
+        self.squares = np.zeros(3)
+
+    def add(self, columns):
+        times = columns['time']
+        if not len(times):
+            return
+        if self.frame is None:
+            self.frame = columns_frame(columns) or 'llh'
+        position_names, sigma_names = FRAME_COLUMNS[self.frame]
+
+        positions = np.stack([np.asarray(columns[name], dtype=np.float64) for name in position_names])
+        if self.reference is None:
+            self.reference = positions[:, 0].copy()
+        if self.frame == 'llh':
+            east, north, up = geodetic_to_enu(*positions, self.reference)
+            offsets = np.stack((north, east, up))
+        else:
+            offsets = positions - self.reference[:, None]
+        sigmas = np.stack([np.abs(columns[name]).astype(np.float64) for name in sigma_names[:3]])
+        weights = 1.0 / np.maximum(sigmas, MIN_WEIGHT_SIGMA) ** 2
+
+        self.weights += weights.sum(axis=1)
+        self.sums += (weights * offsets).sum(axis=1)
+        self.squares += (weights * offsets * offsets).sum(axis=1)
+        self.epochs += len(times)
+        self.fixed += int(np.count_nonzero(columns['Q'] == 1))
+        first, last = times.min(), times.max()
+        self.start = first if self.start is None else min(self.start, first)
+        self.end = last if self.end is None else max(self.end, last)
+
+    def summary(self):
+        """Position moyenne, précision formelle et dispersion (m) ; None sans époque"""
+        if not self.epochs:
+            return None
+        offset = self.sums / self.weights
+        if self.frame == 'llh':
+            north, east, up = offset
+            position = np.array([float(value) for value in enu_to_geodetic(east, north, up, self.reference)])
+        else:
+            position = self.reference + offset
+        # Précision formelle de la moyenne pondérée : 1/sqrt(somme des poids), en mètres
+        precision = 1.0 / np.sqrt(self.weights)
+        # Dispersion pondérée des époques autour de la moyenne (mètres)
+        scatter = np.sqrt(np.maximum(self.squares / self.weights - offset ** 2, 0.0))
+
+        return {
+            'frame': self.frame,
+            'epochs': self.epochs,
+            'start': str(self.start.astype('datetime64[s]')).replace('T', ' '),
+            'end': str(self.end.astype('datetime64[s]')).replace('T', ' '),
+            'span_s': float((self.end - self.start).astype(np.int64)) / 1000.0,
+            'fix_percent': self.fixed * 100.0 / self.epochs,
+            'position': position.tolist(),
+            'precision': precision.tolist(),
+            'scatter': scatter.tolist(),
+        }
+
+
+def summarize_pos_file(pos_file, buckets=None, filters=None, chunk_bytes=None):
+    """Résumé pondéré d'un fichier .pos (None s'il ne contient aucune époque)"""
+    position = WeightedPosition()
+    for columns in iter_pos_chunks(pos_file, chunk_bytes or CHUNK_BYTES, buckets=buckets, filters=filters):
+        position.add(columns)
+    return position.summary()
+
+
+def summarize_pos_files(paths, max_workers=None, on_file=None, cancel=None, buckets=None, filters=None):
+    """Résumés pondérés de plusieurs fichiers .pos calculés en parallèle (None si annulé)"""
+    return map_pos_files(
+        functools.partial(summarize_pos_file, buckets=buckets, filters=filters),
+        paths, max_workers=max_workers, on_file=on_file, cancel=cancel
+    )
+
+
+def summary_row(filename, summary):
+    """Ligne d'export d'un résumé pondéré
+
+    Comme dans l'aperçu, une solution ECEF/ENU occupe les colonnes
+    Latitude/Longitude/Height. Précision et dispersion sont rangées par axe :
+    nord/est/haut en llh et enu, X/Y/Z (dans les colonnes N/E/U) en ECEF.
+    """
+    decimals = 9 if summary['frame'] == 'llh' else 4
+    row = {
+        'Filename': filename,
+        'Frame': summary['frame'],
+        'Start': summary['start'],
+        'End': summary['end'],
+        'Span (h)': round(summary['span_s'] / 3600.0, 3),
+        'Epochs': summary['epochs'],
+        'Fix (%)': round(summary['fix_percent'], 2),
+    }
+    for label, value in zip(('Latitude', 'Longitude', 'Height'), summary['position']):
+        row[label] = round(value, 4 if label == 'Height' else decimals)
+    # Axes dans l'ordre des colonnes du format (e, n, u en ENU), remis dans l'ordre N/E/U
+    axes = FRAME_COLUMNS['enu'][0]
+    order = [axes.index(axis) for axis in 'neu'] if summary['frame'] == 'enu' else [0, 1, 2]
+    for axis, i in zip('NEU', order):
+        row[f'Precision {axis} (m)'] = round(summary['precision'][i], 5)
+    for axis, i in zip('NEU', order):
+        row[f'Std {axis} (m)'] = round(summary['scatter'][i], 4)
+    return row
@@ -0,0 +1,796 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from pos_stats import compute_pos_statistics
+from ppk_config import PPKConfig, base_position_overrides
+from rinex_header import HeaderCache, RinexHeader, epoch_from_fields, read_rinex_header
+from sum_file import read_sum_file
+
+
+# Masquer la fenêtre de commande de rnx2rtkp sous Windows
+CREATE_NO_WINDOW = 0x08000000
+
+# Message d'avancement de rnx2rtkp : "processing : 2024/07/15 10:00:30.0 Q=1"
+PROGRESS_RE = re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})\s+(\d{1,2}):(\d{1,2}):(\d{1,2}(?:\.\d*)?)')
+# Intervalle minimal (s) entre deux notifications d'avancement d'un même traitement
+PROGRESS_INTERVAL = 0.5
+# Nombre de lignes de sortie (hors avancement) conservées pour le diagnostic
+OUTPUT_TAIL_LINES = 200
+
+# Cache des en-têtes RINEX partagé avec l'interface graphique
+HEADER_CACHE_NAME = 'rinex_cache.json'
+
+
+def epoch_from_strings(date_str, time_str):
+    """Convertit les chaînes YYYYMMDD / HHMMSS des observations en datetime"""
+    try:
+        return datetime.datetime.strptime(f"{date_str}{time_str or '000000'}", "%Y%m%d%H%M%S")
+    except (TypeError, ValueError):
+        return None
+
+
+class RoverObservation:
+    def __init__(self, filepath, header_cache=None):
+        self.filepath = Path(filepath)
+        self.name = self.filepath.stem
+        self.header = self.read_header(header_cache)
+        self.date, self.time = self.extract_date_time()
+        self.start, self.end = self.extract_time_span()
+
+    def read_header(self, header_cache=None):
+        try:
+            if header_cache is not None:
+                return header_cache.read(self.filepath)
+            return read_rinex_header(self.filepath)
+        except Exception as e:
+            print(f"Error reading file {self.filepath}: {e}")
+            return RinexHeader()
+
+    def extract_date_time(self):
+        # En-tête RINEX (TIME OF FIRST OBS), sinon première ligne d'époque
+        epoch = self.header.start
+        if epoch is None:
+            return None, None
+        return epoch.strftime("%Y%m%d"), epoch.strftime("%H%M%S")
+
+    def extract_time_span(self):
+        start = self.header.start or epoch_from_strings(self.date, self.time)
+        return start, self.header.end or start
+
+
+class BaseObservation(RoverObservation):
+    def extract_date_time(self):
+        # Première méthode : chercher dans l'en-tête RINEX (format EMLID)
+        if self.header.first_obs:
+            epoch = self.header.first_obs
+            return epoch.strftime("%Y%m%d"), epoch.strftime("%H%M%S")
+
+        # Deuxième méthode : format FOIF A30 (ligne 2)
+        if self.header.run_date:
+            return self.header.run_date
+
+        # Troisième méthode : première ligne de données
+        return super().extract_date_time()
+
+
+class NavigationFile(BaseObservation):
+    pass  # Hérite de BaseObservation
+
+
+def load_observations(paths, cls, header_cache=None, max_workers=None, on_batch=None,
+                      batch_size=50):
+    """Lit les en-têtes d'une liste de fichiers dans un pool de threads
+
+    Les observations sont rendues dans l'ordre des chemins, par lots de
+    batch_size, via on_batch(observations) ; la liste complète est retournée.
+    """
+    paths = list(paths)
+    observations = []
+    if not paths:
+        return observations
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    batch = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for observation in executor.map(lambda path: cls(path, header_cache), paths):
+            observations.append(observation)
+            batch.append(observation)
+            if len(batch) >= batch_size:
+                if on_batch:
+                    on_batch(batch)
+                batch = []
+    if batch and on_batch:
+        on_batch(batch)
+    return observations
+
+
+class ObservationIndex:
+    """Index des observations par date et par intervalle [première, dernière époque]"""
+
+    def __init__(self, observations):
+        self.by_date = {}
+        spans = []
+        for obs in observations:
+            if obs.date:
+                self.by_date.setdefault(obs.date, []).append(obs)
+            if obs.start and obs.end:
+                spans.append((obs.start, obs.end, obs))
+
+        # Intervalles triés par début : recherche par bisection sur la fenêtre utile
+        spans.sort(key=lambda span: span[0])
+        self.spans = spans
+        self.starts = [span[0] for span in spans]
+        self.max_duration = max((end - start for start, end, _ in spans), default=datetime.timedelta(0))
+
+    def overlapping(self, start, end):
+        """Observations dont l'intervalle recoupe [start, end]"""
+        lo = bisect_left(self.starts, start - self.max_duration)
+        hi = bisect_right(self.starts, end)
+        return [span for span in self.spans[lo:hi] if span[1] >= start]
+
+    def first_on_date(self, date):
+        matches = self.by_date.get(date)
+        return matches[0] if matches else None
+
+    def best_match(self, obs):
+        """Observation qui recouvre le plus la session de obs (à défaut : même date)"""
+        if obs.start and obs.end:
+            candidates = self.overlapping(obs.start, obs.end)
+            if candidates:
+                return max(
+                    candidates,
+                    key=lambda span: min(span[1], obs.end) - max(span[0], obs.start)
+                )[2]
+        return self.first_on_date(obs.date)
+
+
+class NavigationIndex:
+    """Index des fichiers de navigation par nom et par groupes de chiffres du nom"""
+
+    def __init__(self, nav_files):
+        self.by_stem = {}
+        self.by_token = {}
+        for nav in nav_files:
+            stem = nav.filepath.stem
+            self.by_stem.setdefault(stem.lower(), nav)
+            for digits in re.findall(r'\d{6,}', stem):
+                for i in range(len(digits) - 5):
+                    self.by_token.setdefault(digits[i:i + 6], nav)
+                    if i + 8 <= len(digits):
+                        self.by_token.setdefault(digits[i:i + 8], nav)
+
+    def match(self, base):
+        nav = self.by_stem.get(base.filepath.stem.lower())
+        if nav:
+            return nav
+        # Date de la base, date du nom de fichier puis premier groupe de 6 chiffres du nom
+        legacy_token = re.search(r'\d{6}|\d{8}', base.filepath.stem)
+        for token in (base.date, extract_date_from_filename(base.filepath.stem),
+                      legacy_token.group() if legacy_token else None):
+            if token and token in self.by_token:
+                return self.by_token[token]
+        return None
+
+
+def index_sum_files(sum_files):
+    """{date: fichier .sum} (le premier fichier importé l'emporte)"""
+    index = {}
+    for sum_file in sum_files:
+        sum_date = extract_date_from_filename(Path(sum_file).stem)
+        if sum_date:
+            index.setdefault(sum_date, sum_file)
+    return index
+
+
+def read_messages(stream, chunk_size=4096):
+    """Découpe un flux binaire en messages sur \\r et \\n, au fil de l'eau"""
+    pending = b''
+    read = getattr(stream, 'read1', stream.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        parts = re.split(rb'[\r\n]', pending + chunk)
+        pending = parts.pop()
+        for part in parts:
+            if part.strip():
+                yield part.decode(errors='replace')
+    if pending.strip():
+        yield pending.decode(errors='replace')
+
+
+class JobProgress:
+    """Avancement d'un traitement d'après les époques affichées par rnx2rtkp
+
+    La fraction est la position de l'époque courante dans la session du rover.
+    En mode combined, rnx2rtkp fait un passage avant puis un passage arrière.
+    """
+
+    def __init__(self, start, end, soltype='forward'):
+        self.start = start
+        self.end = end
+        self.span = (end - start).total_seconds() if start and end and end > start else None
+        self.combined = soltype in ('combined', '2')
+        self.backward = soltype in ('backward', '1')
+        self.second_pass = False
+        self.last_epoch = None
+        self.fraction = 0.0
+        self.epochs = 0
+        self.started = time.monotonic()
+
+    def update(self, epoch):
+        self.epochs += 1
+        if self.span is None:
+            return
+        position = min(max((epoch - self.start).total_seconds() / self.span, 0.0), 1.0)
+        if self.combined:
+            if not self.second_pass and self.last_epoch and epoch < self.last_epoch:
+                self.second_pass = True
+            fraction = 0.5 + 0.5 * (1.0 - position) if self.second_pass else 0.5 * position
+        elif self.backward:
+            fraction = 1.0 - position
+        else:
+            fraction = position
+        self.fraction = max(self.fraction, fraction)
+        self.last_epoch = epoch
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """Époques traitées par seconde"""
+        elapsed = self.elapsed
+        return self.epochs / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def work(self):
+        """Poids du traitement dans l'estimation de l'ETA (durée de la session)"""
+        return (self.span or 1.0) * (2 if self.combined else 1)
+
+
+class BatchJob:
+    """Un traitement rnx2rtkp (rover + base + nav) prêt à être lancé"""
+    def __init__(self, rover, base, nav, config_file, output_pos):
+        self.rover = rover
+        self.base = base
+        self.nav = nav
+        self.config_file = Path(config_file)
+        self.output_pos = Path(output_pos)
+
+        # Résultat, rempli une fois le traitement terminé
+        self.status = 'pending'
+        self.returncode = None
+        self.stderr = ''
+        self.elapsed = None
+        self.stats = None
+        self.fingerprint = None
+        self.progress = None
+
+    def command(self, rtk_exe):
+        return [
+            str(rtk_exe),
+            "-k", str(self.config_file),
+            "-o", str(self.output_pos),
+            str(self.rover.filepath),
+            str(self.base.filepath),
+            str(self.nav.filepath),
+        ]
+
+    def to_dict(self):
+        return {
+            'rover': str(self.rover.filepath),
+            'base': str(self.base.filepath),
+            'nav': str(self.nav.filepath),
+            'output': str(self.output_pos),
+            'status': self.status,
+            'returncode': self.returncode,
+            'processing_time': self.elapsed,
+            'quality': self.stats['quality'] if self.stats else None,
+            'statistics': self.stats,
+            'error': self.stderr.strip() if self.status == 'failed' else None,
+        }
+
+
+def extract_date_from_filename(filename):
+    """Extrait la date du nom du fichier."""
+    try:
+        # Supposons que la date est au format YYYYMMDD dans le nom du fichier
+        date_match = re.search(r'(\d{8})', filename)
+        if date_match:
+            return date_match.group(1)
+        return None
+    except Exception:
+        return None
+
+
+def compute_quality_statistics(pos_file, log=print):
+    """Statistiques d'un fichier .pos (qualité Q, écarts-types, ratio, satellites, époques)"""
+    try:
+        stats = compute_pos_statistics(pos_file)
+        if stats is None:
+            log(f"No valid quality data found in {pos_file}\n")
+        return stats
+    except Exception as e:
+        log(f"Error computing quality statistics for {pos_file}: {e}\n")
+        return None
+
+
+def file_signature(path):
+    """Signature rapide d'un fichier : chemin, taille et date de modification"""
+    stat = os.stat(path)
+    return f"{Path(path).resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def job_fingerprint(job, rtk_exe):
+    """Empreinte des entrées d'un traitement (rover/base/nav, configuration générée, exécutable)"""
+    digest = hashlib.sha1()
+    for path in (job.rover.filepath, job.base.filepath, job.nav.filepath, rtk_exe):
+        digest.update(file_signature(path).encode('utf-8'))
+    with open(job.config_file, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ProcessingManifest:
+    """Empreintes des .pos déjà produits dans un répertoire de sortie (mode incrémental)"""
+    FILENAME = 'ppk_manifest.json'
+
+    def __init__(self, output_dir):
+        self.path = Path(output_dir) / self.FILENAME
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_up_to_date(self, job):
+        entry = self.entries.get(job.output_pos.name)
+        if not entry or entry.get('fingerprint') != job.fingerprint:
+            return False
+        try:
+            # Le .pos doit toujours exister et ne pas avoir été modifié depuis le traitement
+            return file_signature(job.output_pos) == entry.get('output')
+        except OSError:
+            return False
+
+    def cached_stats(self, job):
+        stats = self.entries.get(job.output_pos.name, {}).get('stats')
+        # Les manifestes antérieurs ne contiennent que les pourcentages Q
+        return stats if stats and 'epochs' in stats else None
+
+    def record(self, job):
+        self.entries[job.output_pos.name] = {
+            'fingerprint': job.fingerprint,
+            'rover': str(job.rover.filepath),
+            'output': file_signature(job.output_pos),
+            'stats': job.stats,
+        }
+
+    def save(self):
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=4, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+def config_overrides(config, config_settings):
+    """Valeurs de l'interface/du projet à injecter dans la configuration de chaque traitement"""
+    return {
+        key: value for key, value in config_settings.items()
+        if key in config and value
+    }
+
+
+class BatchProcessor:
+    """Traitement par lots rnx2rtkp, indépendant de l'interface Tk"""
+
+    def __init__(self, rtk_exe, config_file, output_dir, rover_obs_list, base_obs_list, nav_obs_list,
+                 coord_mode="manual", base_coordinates=None, sum_files=(), config_settings=None,
+                 max_workers=None, incremental=False, log=None):
+        self.rtk_exe = Path(rtk_exe)
+        self.config_file = Path(config_file)
+        self.output_dir = Path(output_dir)
+        self.rover_obs_list = list(rover_obs_list)
+        self.base_obs_list = list(base_obs_list)
+        self.nav_obs_list = list(nav_obs_list)
+        self.coord_mode = coord_mode
+        self.base_coordinates = base_coordinates
+        self.sum_files = list(sum_files)
+        self.config_settings = dict(config_settings or {})
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+        self.incremental = incremental
+        self.log = log or (lambda message: print(message, end=''))
+
+        self.jobs = []
+        self.skipped = []  # [(rover, raison)]
+        self.soltype = 'forward'
+        self.started = None
+
+    def skip(self, rover, reason):
+        self.log(reason)
+        self.skipped.append((rover, reason.strip()))
+
+    def plan_jobs(self, scratch_dir):
+        """Associe chaque rover à sa base, son fichier nav et génère sa configuration"""
+        # Lire ppk.conf une seule fois ; le fichier d'origine n'est jamais modifié
+        base_config = PPKConfig.load(self.config_file)
+        common_overrides = config_overrides(base_config, self.config_settings)
+        self.soltype = base_config.get('pos1-soltype', 'forward')
+
+        # Si mode manuel, les mêmes coordonnées sont appliquées à tous les traitements
+        if self.coord_mode == "manual":
+            common_overrides.update(base_position_overrides(*self.base_coordinates))
+            self.log("Mode manuel : utilisation des coordonnées fixes pour tous les fichiers\n")
+
+        # Index construits une seule fois pour tout le lot
+        base_index = ObservationIndex(self.base_obs_list)
+        nav_index = NavigationIndex(self.nav_obs_list)
+        sum_index = index_sum_files(self.sum_files)
+
+        jobs = []
+        reserved_outputs = set()
+        for rover in self.rover_obs_list:
+            if not rover.date:
+                self.skip(rover, f"No date found for rover file '{rover.filepath.name}'. Skipping.\n")
+                continue
+
+            # Base dont la session recouvre celle du rover (à défaut : même date)
+            base_file = base_index.best_match(rover)
+
+            if not base_file:
+                self.skip(rover, f"No matching base file found for rover file '{rover.filepath.name}' with date '{rover.date}'. Skipping.\n")
+                continue
+
+            matching_nav = nav_index.match(base_file)
+
+            if not matching_nav:
+                self.skip(rover, f"No matching navigation file found for base file '{base_file.filepath.name}'. Skipping rover file '{rover.filepath.name}'.\n")
+                continue
+
+            job_overrides = dict(common_overrides)
+
+            # En mode auto seulement, mettre à jour les coordonnées depuis le fichier .sum
+            if self.coord_mode == "auto":
+                matching_sum = sum_index.get(rover.date)
+
+                if matching_sum:
+                    try:
+                        # Chaque .sum n'est analysé qu'une fois pour toute la campagne (cache)
+                        lat, lon, height = read_sum_file(matching_sum).llh_text()
+                        self.log(f"Mise à jour des coordonnées depuis {Path(matching_sum).name} pour le traitement de {rover.filepath.name}\n")
+                        self.log(f"Latitude: {lat}, Longitude: {lon}, Hauteur: {height}\n")
+                        job_overrides.update(base_position_overrides(lat, lon, height))
+                    except Exception as e:
+                        self.log(f"Erreur lors de la mise à jour des coordonnées depuis {matching_sum}: {str(e)}\n")
+
+            # Simple file naming - just use rover name
+            base_filename = f"{rover.name}.pos"
+            output_pos = self.output_dir / base_filename
+
+            # If file exists (or is already reserved by another job), add simple numeric suffix.
+            # En mode incrémental le nom reste stable : un rover modifié remplace son propre .pos
+            if (output_pos.exists() and not self.incremental) or output_pos in reserved_outputs:
+                counter = 1
+                while ((self.output_dir / f"{rover.name}_{counter}.pos").exists() and not self.incremental) or \
+                        (self.output_dir / f"{rover.name}_{counter}.pos") in reserved_outputs:
+                    counter += 1
+                output_pos = self.output_dir / f"{rover.name}_{counter}.pos"
+                self.log(f"File '{base_filename}' exists, saving as '{output_pos.name}'\n")
+            reserved_outputs.add(output_pos)
+
+            # Chaque traitement reçoit sa propre configuration dans le dossier de travail
+            job_config_file = base_config.with_overrides(job_overrides).write(
+                Path(scratch_dir) / f"{rover.name}_{len(jobs)}.conf"
+            )
+
+            job = BatchJob(rover, base_file, matching_nav, job_config_file, output_pos)
+            if self.incremental:
+                job.fingerprint = job_fingerprint(job, self.rtk_exe)
+            jobs.append(job)
+
+        return jobs
+
+    def run(self, on_result=None, on_progress=None, on_job_progress=None, on_planned=None):
+        """Lance tous les traitements ; on_result est appelé dans l'ordre de fin des traitements
+
+        on_planned(jobs) est appelé une fois les traitements préparés et
+        on_job_progress(job) pendant l'exécution de chaque rnx2rtkp.
+        """
+        total_rovers = len(self.rover_obs_list)
+        scratch_dir = Path(tempfile.mkdtemp(prefix="ppk_jobs_"))
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self.jobs = self.plan_jobs(scratch_dir)
+            self.started = time.monotonic()
+            if on_planned:
+                on_planned(self.jobs)
+            processed_rovers = len(self.skipped)
+            if on_progress and processed_rovers:
+                on_progress(processed_rovers, total_rovers)
+
+            pending_jobs = self.jobs
+            manifest = None
+            if self.incremental:
+                manifest = ProcessingManifest(self.output_dir)
+                pending_jobs = []
+                for job in self.jobs:
+                    if manifest.is_up_to_date(job):
+                        job.status = 'up-to-date'
+                        job.stats = manifest.cached_stats(job) or compute_quality_statistics(job.output_pos, self.log)
+                        self.log(f"Up to date, skipping rover: {job.rover.filepath.name}\n")
+                        if on_result:
+                            on_result(job)
+                        processed_rovers += 1
+                        if on_progress:
+                            on_progress(processed_rovers, total_rovers)
+                    else:
+                        pending_jobs.append(job)
+
+            max_workers = min(self.max_workers, max(1, len(pending_jobs)))
+            self.log(f"Lancement de {len(pending_jobs)} traitement(s) sur {max_workers} processus simultané(s)\n")
+
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {pool.submit(self.run_job, job, on_job_progress): job for job in pending_jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        job.status = 'failed'
+                        job.stderr = str(e)
+                        self.log(f"Error during processing: {str(e)}\n")
+
+                    if manifest is not None and job.status == 'ok':
+                        manifest.record(job)
+                        manifest.save()
+                    if on_result:
+                        on_result(job)
+                    processed_rovers += 1
+                    if on_progress:
+                        on_progress(processed_rovers, total_rovers)
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        return self.jobs
+
+    def run_job(self, job, on_job_progress=None):
+        """Exécute rnx2rtkp pour un traitement puis calcule ses statistiques de qualité
+
+        La sortie de rnx2rtkp est lue au fil de l'eau : chaque époque affichée
+        fait avancer job.progress.
+        """
+        command = job.command(self.rtk_exe)
+        self.log(f"Executing: {' '.join(command)}\n")
+
+        job.status = 'running'
+        job.progress = JobProgress(job.rover.start, job.rover.end, self.soltype)
+        if on_job_progress:
+            on_job_progress(job)
+
+        # Utiliser CREATE_NO_WINDOW pour masquer la fenêtre de commande
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            creationflags=CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        output = []
+        notified = time.monotonic()
+        for message in read_messages(process.stdout):
+            match = PROGRESS_RE.search(message)
+            epoch = None
+            if match:
+                try:
+                    epoch = epoch_from_fields(*match.groups())
+                except ValueError:
+                    pass
+            if epoch is None:
+                output.append(message)
+                del output[:-OUTPUT_TAIL_LINES]
+                continue
+            job.progress.update(epoch)
+            if on_job_progress and time.monotonic() - notified >= PROGRESS_INTERVAL:
+                notified = time.monotonic()
+                on_job_progress(job)
+        process.wait()
+
+        job.elapsed = round(job.progress.elapsed, 1)
+        job.returncode = process.returncode
+        job.stderr = '\n'.join(output)
+
+        if process.returncode == 0:
+            job.status = 'ok'
+            job.progress.fraction = 1.0
+            self.log(f"Processing completed for Rover: {job.rover.filepath.name}\n")
+            job.stats = compute_quality_statistics(job.output_pos, self.log)
+        else:
+            job.status = 'failed'
+            self.log(f"Error for Rover: {job.rover.filepath.name}. Error Message: {job.stderr}\n")
+        if on_job_progress:
+            on_job_progress(job)
+        return job
+
+    def campaign_progress(self):
+        """Avancement global (0-1) et temps restant estimé en secondes (None si inconnu)
+
+        Chaque traitement est pondéré par la durée de sa session ; le débit
+        observé depuis le début du lot donne l'ETA. Les traitements à jour
+        (mode incrémental) ne comptent pas.
+        """
+        total = done = 0.0
+        for job in self.jobs:
+            if job.status == 'up-to-date':
+                continue
+            weight = job.progress.work if job.progress else JobProgress(
+                job.rover.start, job.rover.end, self.soltype).work
+            total += weight
+            if job.status in ('ok', 'failed'):
+                done += weight
+            elif job.progress:
+                done += weight * job.progress.fraction
+        if not total:
+            return 1.0, 0.0
+        fraction = done / total
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        if fraction <= 0 or elapsed <= 0:
+            return fraction, None
+        return fraction, elapsed * (1.0 - fraction) / fraction
+
+    def results(self):
+        """Résultats du lot sous forme sérialisable (JSON)"""
+        return {
+            'finished': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'jobs': [job.to_dict() for job in self.jobs],
+            'skipped': [
+                {'rover': str(rover.filepath), 'reason': reason}
+                for rover, reason in self.skipped
+            ],
+        }
+
+
+def format_eta(seconds):
+    """Durée restante au format H:MM:SS ('--:--' si inconnue)"""
+    if seconds is None:
+        return "--:--"
+    return str(datetime.timedelta(seconds=int(round(seconds))))
+
+
+def header_cache_path():
+    """Chemin du cache d'en-têtes dans %APPDATA%\\PPK_Batch_Processor (None hors Windows)"""
+    app_data = os.getenv('APPDATA')
+    if not app_data:
+        return None
+    return os.path.join(app_data, 'PPK_Batch_Processor', HEADER_CACHE_NAME)
+
+
+def load_project(file_path):
+    """Charge un projet .ppk tel qu'écrit par PPKProcessorGUI._do_save"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def processor_from_project(project_data, output_dir=None, rtk_exe=None, config_file=None,
+                           max_workers=None, incremental=None, log=None, header_cache=None):
+    """Construit un BatchProcessor à partir des données d'un projet .ppk"""
+    output_dir = output_dir or project_data.get('output_directory')
+    if not output_dir:
+        raise ValueError("Aucun répertoire de sortie (output_directory) dans le projet")
+
+    base_coords = project_data.get('base_coordinates', {})
+    coord_mode = project_data.get('coord_mode')
+    if not coord_mode:
+        # Anciens projets : mode auto si des fichiers .sum sont présents
+        coord_mode = "auto" if project_data.get('sum_files') else "manual"
+    if coord_mode == "manual":
+        try:
+            base_coordinates = tuple(
+                float(base_coords[key]) for key in ('latitude', 'longitude', 'height')
+            )
+        except (KeyError, ValueError):
+            raise ValueError("Coordonnées de base manquantes ou invalides dans le projet (mode manuel)")
+    else:
+        base_coordinates = None
+
+    def existing(paths, kind, cls):
+        found = []
+        for path in paths:
+            if os.path.exists(path):
+                found.append(path)
+            elif log:
+                log(f"Warning: {kind} file not found: {path}\n")
+        return load_observations(found, cls, header_cache)
+
+    return BatchProcessor(
+        rtk_exe=rtk_exe or project_data['executable_path'],
+        config_file=config_file or project_data['config_path'],
+        output_dir=output_dir,
+        rover_obs_list=existing(project_data.get('rover_files', []), "Rover", RoverObservation),
+        base_obs_list=existing(project_data.get('base_files', []), "Base", BaseObservation),
+        nav_obs_list=existing(project_data.get('nav_files', []), "Navigation", NavigationFile),
+        coord_mode=coord_mode,
+        base_coordinates=base_coordinates,
+        sum_files=project_data.get('sum_files', []),
+        config_settings=project_data.get('config_settings', {}),
+        max_workers=max_workers or project_data.get('max_workers'),
+        incremental=project_data.get('incremental', False) if incremental is None else incremental,
+        log=log,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exécute un projet PPK (.ppk) sans interface graphique"
+    )
+    parser.add_argument("project", help="Fichier projet .ppk")
+    parser.add_argument("-j", "--jobs", type=int, help="Nombre de processus rnx2rtkp simultanés (défaut : projet ou nombre de coeurs)")
+    parser.add_argument("-o", "--output-dir", help="Répertoire de sortie des fichiers .pos")
+    parser.add_argument("--exe", help="Chemin de rnx2rtkp (remplace celui du projet)")
+    parser.add_argument("--config", help="Fichier ppk.conf (remplace celui du projet)")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="Ne retraiter que les rovers dont les entrées ou la configuration ont changé")
+    parser.add_argument("--results", help="Fichier JSON des résultats (défaut : <sortie>/ppk_results.json)")
+    args = parser.parse_args(argv)
+
+    def log(message):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sys.stderr.write(f"[{timestamp}] {message}")
+        sys.stderr.flush()
+
+    header_cache = HeaderCache(header_cache_path())
+    try:
+        processor = processor_from_project(
+            load_project(args.project),
+            output_dir=args.output_dir,
+            rtk_exe=args.exe,
+            config_file=args.config,
+            max_workers=args.jobs,
+            incremental=args.incremental,
+            log=log,
+            header_cache=header_cache,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        log(f"Erreur lors du chargement du projet {args.project}: {e}\n")
+        return 2
+
+    try:
+        header_cache.save()
+    except OSError as e:
+        log(f"Warning: impossible d'écrire le cache des en-têtes: {e}\n")
+
+    if not processor.rover_obs_list:
+        log("Aucun fichier rover à traiter.\n")
+        return 2
+
+    def progress(done, total):
+        fraction, eta = processor.campaign_progress()
+        log(f"Progression : {done}/{total} ({fraction * 100:.0f} %, ETA {format_eta(eta)})\n")
+
+    processor.run(on_progress=progress)
+
+    results = processor.results()
+    results['project'] = str(Path(args.project).resolve())
+    results_path = Path(args.results) if args.results else processor.output_dir / "ppk_results.json"
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    log(f"Résultats écrits dans {results_path}\n")
+    log("Batch PPK Processing Completed.\n")
+
+    return 0 if all(job.status in ('ok', 'up-to-date') for job in processor.jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
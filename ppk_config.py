@@ -0,0 +1,100 @@
+import re
+from pathlib import Path
+
+
+# clé = valeur   # commentaire
+CONFIG_LINE_RE = re.compile(r'^([A-Za-z0-9_\-]+)\s*=(.*?)(\s+#.*)?$')
+
+
+class PPKConfig:
+    """Modèle clé/valeur d'un fichier de configuration RTKLIB (ppk.conf)
+
+    Le fichier est lu une seule fois. Les modifications produisent une nouvelle
+    instance (with_overrides) et le fichier d'origine n'est jamais réécrit.
+    """
+
+    def __init__(self, entries=None):
+        # Chaque entrée est soit une ligne brute (commentaire, ligne vide),
+        # soit une liste [clé, valeur, commentaire, ligne d'origine]
+        self.entries = entries if entries is not None else []
+        self.index = {}
+        for i, entry in enumerate(self.entries):
+            if not isinstance(entry, str):
+                self.index[entry[0]] = i
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.parse(f.read())
+
+    @classmethod
+    def parse(cls, text):
+        entries = []
+        for line in text.splitlines():
+            match = CONFIG_LINE_RE.match(line.rstrip())
+            if match and not line.startswith('#'):
+                entries.append([match.group(1), match.group(2).strip(), (match.group(3) or '').strip(), line])
+            else:
+                entries.append(line)
+        return cls(entries)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get(self, key, default=None):
+        if key not in self.index:
+            return default
+        return self.entries[self.index[key]][1]
+
+    def keys(self):
+        return list(self.index)
+
+    def with_overrides(self, overrides):
+        """Retourne une copie de la configuration avec les valeurs remplacées"""
+        entries = [entry if isinstance(entry, str) else list(entry) for entry in self.entries]
+        config = PPKConfig(entries)
+        for key, value in overrides.items():
+            value = str(value).strip()
+            if key in config.index:
+                entry = config.entries[config.index[key]]
+                if entry[1] != value:
+                    entry[1] = value
+                    entry[3] = None  # ligne à régénérer
+            else:
+                config.index[key] = len(config.entries)
+                config.entries.append([key, value, '', None])
+        return config
+
+    def render(self):
+        lines = []
+        for entry in self.entries:
+            if isinstance(entry, str):
+                lines.append(entry)
+            elif entry[3] is not None:
+                lines.append(entry[3])
+            else:
+                key, value, comment = entry[0], entry[1], entry[2]
+                line = f"{key:<19}={value}"
+                if comment:
+                    line = f"{line:<30} {comment}"
+                lines.append(line)
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        path = Path(path)
+        with open(path, 'w') as f:
+            f.write(self.render())
+        return path
+
+
+def base_position_overrides(lat, lon, height):
+    """Clés ppk.conf à remplacer pour fixer la position de la base (llh)"""
+    return {
+        'ant1-pos1': lat,
+        'ant1-pos2': lon,
+        'ant1-pos3': height,
+        'ant2-postype': 'llh',
+        'ant2-pos1': lat,
+        'ant2-pos2': lon,
+        'ant2-pos3': height,
+    }
@@ -0,0 +1,260 @@
+import datetime
+import json
+import os
+import re
+import threading
+
+
+# Lignes d'époque RINEX 3 (> 2024 07 15 10 00 00.0000000) et RINEX 2 ( 24  7 15 10  0  0.0000000  0 12G01...)
+EPOCH3_RE = re.compile(r'^>\s*(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2}(?:\.\d*)?)')
+EPOCH2_RE = re.compile(r'^\s(\d{2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2}\.\d+)\s+\d\s+\d+')
+
+# Format FOIF A30 : date et heure sur la deuxième ligne du fichier
+RUN_DATE_RE = re.compile(r'(\d{8})\s+(\d{6})')
+
+# Nombre maximal de lignes lues après l'en-tête pour trouver la première époque
+MAX_DATA_LINES = 1000
+
+
+def epoch_from_fields(year, month, day, hour, minute, second):
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 80 else 1900
+    return datetime.datetime(year, int(month), int(day), int(hour), int(minute), int(float(second)))
+
+
+def match_epoch_line(line):
+    """Retourne le datetime d'une ligne d'époque RINEX 2/3, sinon None"""
+    match = EPOCH3_RE.match(line) or EPOCH2_RE.match(line)
+    if match:
+        try:
+            return epoch_from_fields(*match.groups())
+        except ValueError:
+            return None
+    return None
+
+
+def parse_floats(text, count):
+    try:
+        values = tuple(float(value) for value in text.split()[:count])
+    except ValueError:
+        return None
+    return values if len(values) == count else None
+
+
+class RinexHeader:
+    """Métadonnées d'en-tête d'un fichier RINEX (la section de données n'est jamais chargée)"""
+
+    FIELDS = (
+        'version', 'file_type', 'marker_name', 'first_obs', 'last_obs', 'first_epoch',
+        'last_epoch', 'interval', 'approx_position', 'antenna_type', 'antenna_delta',
+        'obs_types', 'run_date'
+    )
+
+    def __init__(self):
+        self.version = None
+        self.file_type = None
+        self.marker_name = None
+        self.first_obs = None        # TIME OF FIRST OBS (en-tête)
+        self.last_obs = None         # TIME OF LAST OBS (en-tête)
+        self.first_epoch = None      # première ligne d'époque, si l'en-tête n'a pas l'heure
+        self.last_epoch = None       # dernière ligne d'époque (fin du fichier)
+        self.interval = None
+        self.approx_position = None  # (X, Y, Z) en mètres
+        self.antenna_type = None
+        self.antenna_delta = None    # (H, E, N) en mètres
+        self.obs_types = {}          # {système: [types]}
+        self.run_date = None         # (YYYYMMDD, HHMMSS) de la deuxième ligne (FOIF A30)
+
+    @property
+    def start(self):
+        return self.first_obs or self.first_epoch
+
+    @property
+    def end(self):
+        return self.last_obs or self.last_epoch
+
+    def to_dict(self):
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            data[field] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        header = cls()
+        for field in cls.FIELDS:
+            value = data.get(field)
+            if field in ('first_obs', 'last_obs', 'first_epoch', 'last_epoch') and value:
+                value = datetime.datetime.fromisoformat(value)
+            elif field in ('approx_position', 'antenna_delta', 'run_date') and value:
+                value = tuple(value)
+            elif field == 'obs_types':
+                value = value or {}
+            setattr(header, field, value)
+        return header
+
+
+def read_rinex_header(filepath, tail_bytes=65536):
+    """Lit l'en-tête RINEX ligne par ligne jusqu'à END OF HEADER
+
+    Si l'en-tête ne donne pas l'heure de la première observation, la lecture
+    continue jusqu'à la première ligne d'époque. Si la dernière observation
+    n'est pas dans l'en-tête, seule la fin du fichier (tail_bytes) est parcourue.
+    """
+    header = RinexHeader()
+    obs_system = None
+
+    with open(filepath, 'r', errors='replace') as f:
+        for line_number, line in enumerate(f):
+            label = line[60:].strip()
+
+            if line_number == 1:
+                match = RUN_DATE_RE.search(line.strip())
+                if match:
+                    header.run_date = (match.group(1), match.group(2))
+
+            if label == "RINEX VERSION / TYPE":
+                try:
+                    header.version = float(line[:9])
+                except ValueError:
+                    pass
+                header.file_type = line[20:21].strip() or None
+            elif label == "MARKER NAME":
+                header.marker_name = line[:60].strip()
+            elif label in ("TIME OF FIRST OBS", "TIME OF LAST OBS"):
+                parts = line[:60].split()
+                if len(parts) >= 6:
+                    try:
+                        epoch = epoch_from_fields(*parts[:6])
+                    except ValueError:
+                        continue
+                    if label == "TIME OF FIRST OBS":
+                        header.first_obs = epoch
+                    else:
+                        header.last_obs = epoch
+            elif label == "INTERVAL":
+                values = parse_floats(line[:60], 1)
+                header.interval = values[0] if values else None
+            elif label == "APPROX POSITION XYZ":
+                header.approx_position = parse_floats(line[:60], 3)
+            elif label == "ANT # / TYPE":
+                header.antenna_type = line[20:40].strip() or None
+            elif label == "ANTENNA: DELTA H/E/N":
+                header.antenna_delta = parse_floats(line[:60], 3)
+            elif label == "SYS / # / OBS TYPES":
+                # RINEX 3 : le système est vide sur les lignes de continuation
+                if line[0].strip():
+                    obs_system = line[0]
+                    header.obs_types[obs_system] = []
+                if obs_system:
+                    header.obs_types[obs_system].extend(line[7:60].split())
+            elif label == "# / TYPES OF OBSERV":
+                # RINEX 2 : mêmes types pour tous les systèmes
+                header.obs_types.setdefault('*', []).extend(line[6:60].split())
+            elif label == "END OF HEADER":
+                break
+
+        if header.first_obs is None:
+            for line_number, line in enumerate(f):
+                if line_number >= MAX_DATA_LINES:
+                    break
+                epoch = match_epoch_line(line)
+                if epoch:
+                    header.first_epoch = epoch
+                    break
+
+    if header.last_obs is None:
+        header.last_epoch = read_last_epoch(filepath, tail_bytes)
+
+    return header
+
+
+def read_last_epoch(filepath, tail_bytes=65536):
+    """Dernière ligne d'époque d'un fichier d'observation (seule la fin du fichier est lue)"""
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - tail_bytes))
+        tail = f.read().decode('ascii', errors='replace').splitlines()
+    for line in reversed(tail):
+        epoch = match_epoch_line(line)
+        if epoch:
+            return epoch
+    return None
+
+
+class HeaderCache:
+    """Cache disque des en-têtes RINEX, clé (chemin, taille, mtime)
+
+    Un fichier modifié ou remplacé change de taille ou de date et est relu.
+    Le cache est sûr entre threads ; save() n'écrit que s'il a changé.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        # Une seule écriture du fichier à la fois (même fichier temporaire, puis os.replace)
+        self.save_lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def file_key(filepath):
+        stat = os.stat(filepath)
+        return os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns
+
+    def get(self, filepath):
+        path, size, mtime = self.file_key(filepath)
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and entry['size'] == size and entry['mtime'] == mtime:
+            return RinexHeader.from_dict(entry['header'])
+        return None
+
+    def put(self, filepath, header):
+        path, size, mtime = self.file_key(filepath)
+        with self.lock:
+            self.entries[path] = {'size': size, 'mtime': mtime, 'header': header.to_dict()}
+            self.dirty = True
+
+    def read(self, filepath):
+        """En-tête depuis le cache, sinon lu sur le disque puis mis en cache"""
+        header = self.get(filepath)
+        if header is None:
+            header = read_rinex_header(filepath)
+            self.put(filepath, header)
+        return header
+
+    def save(self):
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = {'version': self.VERSION, 'entries': dict(self.entries)}
+                self.dirty = False
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                # Les entrées seront écrites à la prochaine sauvegarde
+                with self.lock:
+                    self.dirty = True
+                raise
@@ -7,6 +7,16 @@ build_exe_options = {
     "excludes": [],
     "include_files": [
         "tools.py",
+        "async_log.py",
+        "ppk_config.py",
+        "ppk_batch.py",
+        "rinex_header.py",
+        "geodesy.py",
+        "sum_file.py",
+        "dms.py",
+        "pos_reader.py",
+        "pos_stats.py",
+        "pos_export.py",
         "PPK batch processor.py",
         "Drone_GNSS_app_v1.3.py",
         # Ajoutez tous les autres fichiers nécessaires à votre application
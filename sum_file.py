@@ -0,0 +1,258 @@
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+import re
+import threading
+
+from geodesy import geodetic_to_utm, utm_zone_label
+
+
+# Lignes d'en-tête : MKR BASE, RNX base.24O, BEG/END 2024-07-15 08:00:00.00, INT 30.00
+FIELD_RE = re.compile(r'^(MKR|RNX|BEG|END|INT)\s+(.*?)\s*$')
+# Lignes de position : POS LAT IGS20 24:197 1   73.1552   0.0000  73 09 18.99435   0.0000   0.003
+POS_RE = re.compile(r'^POS\s+(LAT|LON|HGT)\s+(\S+)')
+# Entête de la projection, suivie de la ligne PRJ UTM 17N 495000.000 8120000.000
+PRJ_HEADER_RE = re.compile(r'^PRJ\s+TYPE\s+ZONE\s+EASTING\s+NORTHING')
+TIME_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2}):(\d{1,2}(?:\.\d*)?)')
+
+
+def parse_time(text):
+    match = TIME_RE.search(text)
+    if not match:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    seconds = float(second)
+    return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute)) + datetime.timedelta(
+        seconds=seconds
+    )
+
+
+def parse_dms(degrees, minutes, seconds):
+    """(signe, degrés, minutes, secondes) ; le signe vient du texte ('-0 30 15.0' est négatif)"""
+    sign = -1 if degrees.startswith('-') else 1
+    return sign, abs(int(degrees)), int(minutes), float(seconds.strip('"'))
+
+
+def dms_degrees(dms):
+    sign, degrees, minutes, seconds = dms
+    return sign * (degrees + minutes / 60 + seconds / 3600)
+
+
+class SumRecord:
+    """Contenu d'un fichier .sum (résumé de solution PPP)
+
+    Positions en degrés décimaux (et d m s d'origine), hauteur et écarts-types
+    en mètres, coordonnées UTM, période d'observation (datetime) et repère de
+    la solution (ex. IGS20). Les champs absents du fichier restent à None.
+    """
+
+    def __init__(self):
+        self.marker = None
+        self.rinex_file = None
+        self.start = None
+        self.end = None
+        self.interval = None         # secondes
+        self.frame = None            # repère des positions POS (IGS20, ITRF20...)
+        self.latitude_dms = None     # (signe, degrés, minutes, secondes)
+        self.longitude_dms = None
+        self.height = None
+        self.sigma_north = None
+        self.sigma_east = None
+        self.sigma_height = None
+        self.utm_zone = None         # ex. 17N
+        self.utm_easting = None
+        self.utm_northing = None
+        self.text = {}               # valeurs telles qu'écrites dans le fichier (affichage)
+
+    @property
+    def latitude(self):
+        return dms_degrees(self.latitude_dms) if self.latitude_dms else None
+
+    @property
+    def longitude(self):
+        return dms_degrees(self.longitude_dms) if self.longitude_dms else None
+
+    @property
+    def duration(self):
+        """Durée de la session en secondes entières (None sans BEG/END)"""
+        if self.start is None or self.end is None:
+            return None
+        return int((self.end - self.start).total_seconds())
+
+    def has_position(self):
+        return None not in (self.latitude_dms, self.longitude_dms, self.height)
+
+    def utm(self):
+        """(zone, est, nord) de la ligne PRJ, sinon calculés depuis la position ; None sans position"""
+        if self.utm_easting is not None and self.utm_northing is not None:
+            return self.utm_zone, self.utm_easting, self.utm_northing
+        if self.latitude_dms is None or self.longitude_dms is None:
+            return None
+        easting, northing, zone, south = geodetic_to_utm(self.latitude, self.longitude)
+        return str(utm_zone_label(zone, south)), float(easting), float(northing)
+
+    def llh_text(self):
+        """Latitude, longitude et hauteur au format ppk.conf ; ValueError si la position manque"""
+        if not self.has_position():
+            raise ValueError("Position POS LAT/LON/HGT absente du fichier .sum")
+        return f"{self.latitude:.9f}", f"{self.longitude:.9f}", f"{self.height:.4f}"
+
+    def viewer_fields(self):
+        """Champs du formulaire du GNSS Data Viewer (textes, None si absents)"""
+        duration = self.duration
+        text = self.text.get
+        utm = self.utm()
+        return {
+            "Date (UTC)": text('start').split()[0] if text('start') else self.marker,
+            "File": self.rinex_file,
+            "GNSS Model": None,
+            "Description of Occupation": None,
+            "Time Start (UTC)": text('start'),
+            "Time End (UTC)": text('end'),
+            "Duration": (
+                f"{duration // 3600:02}:{(duration % 3600) // 60:02}:{duration % 60:02}" if duration is not None else None
+            ),
+            "Interval": text('interval'),
+            "Latitude (DD)": text('latitude'),
+            "Longitude (DD)": text('longitude'),
+            "UTM N (m)": text('utm_northing') or (f"{utm[2]:.3f}" if utm else None),
+            "UTM E (m)": text('utm_easting') or (f"{utm[1]:.3f}" if utm else None),
+            "Elevation (m)": text('height'),
+            "Reference Point": "APC",
+            "Sigma UTM N (m)": text('sigma_north'),
+            "Sigma UTM E (m)": text('sigma_east'),
+            "Sigma Elev. (m)": text('sigma_height'),
+            "Datum": "ITRF20",
+            "Solution": "PPP",
+        }
+
+    def __repr__(self):
+        return (f"SumRecord({self.marker}, {self.start} - {self.end}, {self.frame}, "
+                f"{self.latitude}, {self.longitude}, {self.height})")
+
+
+def parse_sum_lines(lines):
+    """SumRecord des lignes d'un fichier .sum, en une seule passe
+
+    ValueError si une ligne POS ou PRJ est incomplète.
+    """
+    record = SumRecord()
+    text = record.text
+    utm_next = False
+
+    for number, line in enumerate(lines, 1):
+        try:
+            if utm_next:
+                # Ligne qui suit l'entête PRJ TYPE ZONE EASTING NORTHING
+                utm_next = False
+                parts = line.split()
+                record.utm_zone = parts[2]
+                text['utm_easting'], text['utm_northing'] = parts[3], parts[4]
+                record.utm_easting, record.utm_northing = float(parts[3]), float(parts[4])
+                continue
+
+            match = FIELD_RE.match(line)
+            if match:
+                key, value = match.groups()
+                if key == 'MKR':
+                    record.marker = value
+                elif key == 'RNX':
+                    record.rinex_file = value
+                elif key == 'BEG':
+                    text['start'] = value
+                    record.start = parse_time(value)
+                elif key == 'END':
+                    text['end'] = value
+                    record.end = parse_time(value)
+                else:
+                    text['interval'] = value
+                    record.interval = float(value.split()[0]) if value else None
+                continue
+
+            match = POS_RE.match(line)
+            if match:
+                axis, frame = match.groups()
+                record.frame = record.frame or frame
+                parts = line.split()
+                if axis == 'HGT':
+                    text['height'], text['sigma_height'] = parts[5], parts[7]
+                    record.height, record.sigma_height = float(parts[5]), float(parts[7])
+                elif axis == 'LAT':
+                    record.latitude_dms = parse_dms(parts[7], parts[8], parts[9])
+                    text['latitude'] = f"{parts[7]}° {parts[8]}' {parts[9]}\""
+                    text['sigma_north'] = parts[11]
+                    record.sigma_north = float(parts[11])
+                else:
+                    record.longitude_dms = parse_dms(parts[7], parts[8], parts[9])
+                    text['longitude'] = f"{parts[7]}° {parts[8]}' {parts[9]}\""
+                    text['sigma_east'] = parts[11]
+                    record.sigma_east = float(parts[11])
+                continue
+
+            if PRJ_HEADER_RE.match(line):
+                utm_next = True
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"ligne {number} invalide ({line.strip()}): {e}")
+    return record
+
+
+class SumFileCache:
+    """Fichiers .sum déjà analysés, clé (chemin, taille, mtime)
+
+    Un fichier modifié est relu ; sinon le même SumRecord est rendu (à ne pas
+    modifier). Sûr entre threads.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def read(self, file_path):
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and entry[0] == key:
+            return entry[1]
+        with open(file_path, 'r', errors='replace') as f:
+            try:
+                record = parse_sum_lines(f)
+            except ValueError as e:
+                raise ValueError(f"Erreur lors de l'analyse du fichier .sum {os.path.basename(file_path)}: {e}")
+        with self.lock:
+            self.entries[path] = (key, record)
+        return record
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Cache partagé par les interfaces et le traitement par lots
+SUM_CACHE = SumFileCache()
+
+
+def read_sum_file(file_path):
+    """SumRecord d'un fichier .sum (analysé une seule fois tant qu'il ne change pas)"""
+    return SUM_CACHE.read(file_path)
+
+
+def read_sum_files(paths, max_workers=None):
+    """[(chemin, SumRecord ou exception)] de plusieurs fichiers .sum, dans l'ordre des chemins
+
+    Les fichiers sont lus en parallèle par des threads : les lectures disque
+    (ou réseau) se superposent et le cache partagé est rempli au passage.
+    """
+    paths = list(paths)
+
+    def read(path):
+        try:
+            return read_sum_file(path)
+        except (OSError, ValueError) as e:
+            return e
+
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers or min(32, len(paths))) as executor:
+        return list(zip(paths, executor.map(read, paths)))
@@ -3,6 +3,7 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import shutil
 from pathlib import Path
+from sum_file import read_sum_file
 
 class TestCoordinatesGUI:
     def __init__(self, master):
@@ -139,29 +140,6 @@ class TestCoordinatesGUI:
             self.auto_coord_frame.grid()
             self.update_auto_coordinates()
 
-    def parse_sum_file(self, file_path):
-        """Parse le fichier .sum pour extraire les coordonnées"""
-        try:
-            with open(file_path, "r") as file:
-                content = file.readlines()
-
-            lat = lon = height = None
-            for line in content:
-                if "POS LAT" in line:
-                    parts = line.split()
-                    lat = float(parts[7]) + float(parts[8])/60 + float(parts[9].strip('"'))/3600
-                elif "POS LON" in line:
-                    parts = line.split()
-                    lon = float(parts[7]) + float(parts[8])/60 + float(parts[9].strip('"'))/3600
-                elif "POS HGT" in line:
-                    parts = line.split()
-                    height = float(parts[5])
-
-            return lat, lon, height
-        except Exception as e:
-            self.append_log(f"Erreur lors du parsing du fichier .sum: {str(e)}\n")
-            return None, None, None
-
     def update_auto_coordinates(self):
         """Met à jour les coordonnées automatiquement"""
         try:
@@ -175,9 +153,14 @@ class TestCoordinatesGUI:
                 self.auto_coords_label.config(text="Aucun fichier .sum trouvé")
                 return
 
-            lat, lon, height = self.parse_sum_file(sum_files[0])
-            
-            if lat is not None and lon is not None and height is not None:
+            try:
+                record = read_sum_file(sum_files[0])
+            except (OSError, ValueError) as e:
+                self.append_log(f"Erreur lors du parsing du fichier .sum: {str(e)}\n")
+                record = None
+
+            if record and record.has_position():
+                lat, lon, height = record.latitude, record.longitude, record.height
                 self.base_lat_var.set(f"{lat:.8f}")
                 self.base_lon_var.set(f"{lon:.8f}")
                 self.base_height_var.set(f"{height:.3f}")
@@ -0,0 +1,88 @@
+import math
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dms import convert_dms_columns, dms_array_to_dd, dms_to_dd
+
+
+def reference_dd(degrees, minutes=0.0, seconds=0.0, negative=False):
+    value = degrees + minutes / 60 + seconds / 3600
+    return -value if negative else value
+
+
+CASES = [
+    ("45", 45.0),
+    ("45.5", 45.5),
+    ("-79 58 39.88", reference_dd(79, 58, 39.88, True)),
+    ("73° 9' 18.99\"", reference_dd(73, 9, 18.99)),
+    ("079°58'39.88\"W", reference_dd(79, 58, 39.88, True)),
+    ("W 079°58'39.88\"", reference_dd(79, 58, 39.88, True)),
+    ("S 33:52:07.68", reference_dd(33, 52, 7.68, True)),
+    ("33:52:07.68N", reference_dd(33, 52, 7.68)),
+    ("+12 30", reference_dd(12, 30)),
+    ("151º12′55.07″E", reference_dd(151, 12, 55.07)),
+    ("-0° 30' 15\"", reference_dd(0, 30, 15, True)),
+]
+
+
+@pytest.mark.parametrize('text, expected', CASES)
+def test_dms_to_dd(text, expected):
+    assert dms_to_dd(text) == pytest.approx(expected, rel=1e-15, abs=1e-15)
+
+
+def test_negative_zero_degrees_keep_their_sign():
+    assert dms_to_dd("-0° 30' 15\"") < 0
+    assert dms_to_dd("-0 0 0.5") < 0
+    assert math.copysign(1.0, dms_to_dd("-0")) == -1.0
+
+
+@pytest.mark.parametrize('text', [
+    "", "abc", "45 61 00", "45 30 60", "1 2 3 4", "-45 30 N", "N 45 S", "45 - 30", "4.5.6", "--45", None,
+])
+def test_invalid_values(text):
+    assert np.isnan(dms_array_to_dd([text])[0])
+    with pytest.raises(ValueError):
+        dms_to_dd(text)
+
+
+def test_array_matches_regex_reference():
+    # Référence indépendante : découpage par expression régulière, valeur par valeur
+    rng = np.random.default_rng(3)
+    values, expected = [], []
+    for _ in range(2000):
+        degrees = int(rng.integers(0, 180))
+        minutes = int(rng.integers(0, 60))
+        seconds = round(float(rng.uniform(0, 60 - 1e-3)), int(rng.integers(0, 6)))
+        text = rng.choice([f"{degrees}° {minutes}' {seconds}\"", f"{degrees} {minutes} {seconds}",
+                           f"{degrees}:{minutes:02d}:{seconds}"])
+        hemisphere = rng.choice(['', 'N', 'S', 'E', 'W', '-'])
+        text = f"-{text}" if hemisphere == '-' else f"{text}{hemisphere}"
+        values.append(text)
+        numbers = [float(token) for token in re.findall(r'\d+(?:\.\d*)?', text)]
+        expected.append(reference_dd(*numbers, negative=hemisphere in ('-', 'S', 'W')))
+
+    result = dms_array_to_dd(np.array(values, dtype=object).reshape(40, 50))
+    assert result.shape == (40, 50)
+    np.testing.assert_allclose(result.ravel(), expected, rtol=1e-15, atol=1e-13)
+
+
+def test_convert_dms_columns():
+    frame = pd.DataFrame({
+        'Name': ['A', 'B'],
+        'Latitude': ["45° 30' 00\"N", "33 52 07.68 S"],
+        'Longitude': ["079°58'39.88\"W", "151 12 55.07"],
+    })
+    frame.loc[2] = ['C', None, 'n/a']
+    converted, invalid = convert_dms_columns(frame)
+    assert list(converted.columns) == ['Name', 'Latitude', 'Latitude (DD)', 'Longitude', 'Longitude (DD)']
+    assert invalid == {'Latitude': 0, 'Longitude': 1}
+    np.testing.assert_allclose(
+        converted['Latitude (DD)'], [45.5, reference_dd(33, 52, 7.68, True), np.nan], atol=1e-9
+    )
+    np.testing.assert_allclose(
+        converted['Longitude (DD)'], [reference_dd(79, 58, 39.88, True), reference_dd(151, 12, 55.07), np.nan],
+        atol=1e-9,
+    )
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from geodesy import (
+    WGS84_B, ecef_to_enu, ecef_to_geodetic, enu_to_geodetic, geodetic_to_ecef, geodetic_to_enu, geodetic_to_utm,
+    metres_per_degree, utm_to_geodetic, utm_zone, utm_zone_label,
+)
+
+
+# Points de contrôle calculés avec PROJ (EPSG:4326 -> EPSG:326xx / 327xx)
+UTM_CONTROL = [
+    # latitude, longitude, zone, sud, est, nord
+    (48.8583701, 2.2944813, 31, False, 448250.5989, 5411951.5989),
+    (-33.8567844, 151.2152967, 56, True, 334900.2343, 6252290.4776),
+    (45.5048, -73.5874, 18, False, 610352.3607, 5040000.2133),
+    (63.7467, -68.517, 19, False, 523838.0324, 7068878.8567),
+    (0.0, 3.0, 31, False, 500000.0, 0.0),
+    (60.0, 5.0, 32, False, 276979.9264, 6658157.2024),
+    (78.2232, 15.6267, 33, False, 514278.7151, 8683355.4695),
+    (-45.0, -75.7, 18, True, 444829.2903, 5016811.2856),
+]
+
+
+def test_utm_matches_proj_control_points():
+    latitude, longitude, zone, south, easting, northing = (np.array(column) for column in zip(*UTM_CONTROL))
+    result_e, result_n, result_zone, result_south = geodetic_to_utm(latitude, longitude)
+    np.testing.assert_array_equal(result_zone, zone)
+    np.testing.assert_array_equal(result_south, south)
+    np.testing.assert_allclose(result_e, easting, rtol=0, atol=1e-3)
+    np.testing.assert_allclose(result_n, northing, rtol=0, atol=1e-3)
+
+
+def test_utm_round_trip():
+    rng = np.random.default_rng(5)
+    latitude = rng.uniform(-80, 84, 5000)
+    longitude = rng.uniform(-180, 180, 5000)
+    easting, northing, zone, south = geodetic_to_utm(latitude, longitude)
+    back_lat, back_lon = utm_to_geodetic(easting, northing, zone, south)
+    north, east = metres_per_degree(latitude)
+    np.testing.assert_allclose((back_lat - latitude) * north, 0, atol=1e-6)
+    np.testing.assert_allclose(((back_lon - longitude + 180) % 360 - 180) * east, 0, atol=1e-6)
+
+
+def test_utm_forced_zone():
+    # Position à l'est de la limite 18/19, exprimée dans la grille de la zone 18
+    easting, northing, zone, south = geodetic_to_utm(45.5, -71.9, zone=18)
+    assert zone == 18 and not south
+    assert 740000 < easting < 745000
+    back_lat, back_lon = utm_to_geodetic(easting, northing, 18)
+    assert back_lat == pytest.approx(45.5, abs=1e-10)
+    assert back_lon == pytest.approx(-71.9, abs=1e-10)
+
+
+def test_utm_zone_exceptions():
+    np.testing.assert_array_equal(
+        utm_zone([45.0, 60.0, 60.0, 60.0, 78.0, 78.0, 78.0, 78.0, 0.0, 0.0],
+                 [-73.6, 5.0, 2.9, 12.0, 8.0, 15.0, 25.0, 40.0, 180.0, -180.0]),
+        [18, 32, 31, 33, 31, 33, 35, 37, 1, 1],
+    )
+    np.testing.assert_array_equal(utm_zone_label([17, 56], [False, True]), ['17N', '56S'])
+
+
+def test_ecef_known_points():
+    np.testing.assert_allclose(geodetic_to_ecef(0.0, 0.0, 0.0), (6378137.0, 0.0, 0.0), atol=1e-9)
+    np.testing.assert_allclose(geodetic_to_ecef(90.0, 0.0, 0.0), (0.0, 0.0, WGS84_B), atol=1e-9)
+    assert WGS84_B == pytest.approx(6356752.314245, abs=1e-6)
+    # Valeur PROJ (EPSG:4979 -> EPSG:4978)
+    np.testing.assert_allclose(
+        geodetic_to_ecef(45.5048, -73.5874, 123.4), (1265222.5667, -4295369.7831, 4526931.1331), atol=1e-4
+    )
+
+
+def test_ecef_round_trip():
+    rng = np.random.default_rng(6)
+    latitude = np.concatenate([rng.uniform(-90, 90, 5000), [90.0, -90.0, 0.0]])
+    longitude = np.concatenate([rng.uniform(-180, 180, 5000), [0.0, 0.0, 0.0]])
+    height = np.concatenate([rng.uniform(-500, 40000, 5000), [0.0, 10.0, -100.0]])
+    back_lat, back_lon, back_h = ecef_to_geodetic(*geodetic_to_ecef(latitude, longitude, height))
+    north, east = metres_per_degree(latitude)
+    np.testing.assert_allclose((back_lat - latitude) * north, 0, atol=1e-6)
+    np.testing.assert_allclose(((back_lon - longitude + 180) % 360 - 180) * east, 0, atol=1e-6)
+    np.testing.assert_allclose(back_h, height, atol=1e-6)
+
+
+def test_enu_directions_and_round_trip():
+    origin = (45.5048, -73.5874, 0.0)
+    north, east = metres_per_degree(origin[0])
+    e, n, u = geodetic_to_enu(origin[0] + 1.0 / north, origin[1], origin[2], origin)
+    np.testing.assert_allclose((e, n, u), (0.0, 1.0, 0.0), atol=1e-6)
+    e, n, u = geodetic_to_enu(origin[0], origin[1] + 1.0 / east, origin[2], origin)
+    np.testing.assert_allclose((e, n, u), (1.0, 0.0, 0.0), atol=1e-6)
+    x, y, z = geodetic_to_ecef(*origin)
+    radial = np.array([x, y, z]) / np.linalg.norm([x, y, z])
+    np.testing.assert_allclose(ecef_to_enu(x + radial[0], y + radial[1], z + radial[2], origin)[2], 1.0, atol=1e-2)
+
+    rng = np.random.default_rng(7)
+    offsets = rng.uniform(-5000, 5000, (3, 1000))
+    latitude, longitude, height = enu_to_geodetic(*offsets, origin)
+    np.testing.assert_allclose(geodetic_to_enu(latitude, longitude, height, origin), offsets, atol=1e-6)
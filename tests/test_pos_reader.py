@@ -0,0 +1,272 @@
+import datetime
+import io
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from pos_reader import (
+    FRAME_COLUMNS, IndexedPosFile, PosFilter, TimeBuckets, cache_path, iter_pos_chunks, load_pos_cache,
+    load_pos_files, parse_fixed_width, read_pos_columns, read_pos_format,
+)
+
+
+LABELS = {
+    'llh': "latitude(deg) longitude(deg)  height(m)   Q  ns   sdn(m)   sde(m)   sdu(m)  sdne(m)  sdeu(m)  sdun(m)",
+    'xyz': "x-ecef(m)      y-ecef(m)      z-ecef(m)   Q  ns   sdx(m)   sdy(m)   sdz(m)  sdxy(m)  sdyz(m)  sdzx(m)",
+    'enu': "e-baseline(m)  n-baseline(m)  u-baseline(m)   Q  ns   sde(m)   sdn(m)   sdu(m)  sden(m)  sdnu(m)  sdue(m)",
+}
+GPS_EPOCH = datetime.datetime(1980, 1, 6)
+START = datetime.datetime(2024, 7, 15, 23, 59, 50)
+
+
+def epoch_lines(frame, time, rows, seed=0):
+    """Lignes de données au format RTKLIB (colonnes à largeur fixe, signes variables)"""
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(rows):
+        epoch = START + datetime.timedelta(milliseconds=200 * i)
+        if time == 'hms':
+            stamp = epoch.strftime('%Y/%m/%d %H:%M:%S.') + f"{epoch.microsecond // 1000:03d}"
+        else:
+            elapsed = (epoch - GPS_EPOCH).total_seconds()
+            stamp = f"{int(elapsed // 604800):5d} {elapsed % 604800:10.3f}"
+        if frame == 'llh':
+            position = f"{rng.uniform(-89, 89):14.9f} {rng.uniform(-179, 179):14.9f} {rng.uniform(-50, 3000):10.4f}"
+        elif frame == 'xyz':
+            position = " ".join(f"{value:14.4f}" for value in rng.uniform(-6.4e6, 6.4e6, 3))
+        else:
+            position = " ".join(f"{value:14.4f}" for value in rng.uniform(-2000, 2000, 3))
+        sigmas = " ".join(f"{value:8.4f}" for value in rng.uniform(0, 0.5, 3))
+        covariances = " ".join(f"{value:8.4f}" for value in rng.uniform(-0.1, 0.1, 3))
+        lines.append(
+            f"{stamp}  {position} {rng.integers(1, 6):3d} {rng.integers(4, 30):3d} {sigmas} {covariances}"
+            f" {rng.uniform(0, 2):6.2f} {rng.uniform(0, 999):6.1f}\n"
+        )
+    return lines
+
+
+def write_pos(path, frame='llh', time='hms', rows=200, lines=None, seed=0):
+    system = 'GPST' if time == 'tow' else 'UTC'
+    label = f"%  {system:<22}{LABELS[frame]} age(s)  ratio\n"
+    lines = epoch_lines(frame, time, rows, seed) if lines is None else lines
+    with open(path, 'w', newline='') as f:
+        f.write("% program   : RTKLIB\n% pos mode  : kinematic\n" + label)
+        f.writelines(lines)
+    return str(path)
+
+
+def reference_columns(lines, frame, time):
+    """Colonnes attendues, lues par np.loadtxt et datetime (indépendants du lecteur)"""
+    text = "".join(lines).replace('/', ' ').replace(':', ' ')
+    values = np.loadtxt(io.StringIO(text), ndmin=2)
+    if time == 'hms':
+        times = [
+            datetime.datetime(*map(int, row[:5])) + datetime.timedelta(seconds=row[5]) for row in values
+        ]
+        values = values[:, 6:]
+    else:
+        times = [GPS_EPOCH + datetime.timedelta(weeks=row[0], seconds=row[1]) for row in values]
+        values = values[:, 2:]
+    position, sigma = FRAME_COLUMNS[frame]
+    names = position + ('Q', 'ns') + sigma + ('age', 'ratio')
+    columns = {'time': np.array(times, dtype='datetime64[ms]')}
+    columns.update({name: values[:, i] for i, name in enumerate(names)})
+    return columns
+
+
+def assert_columns_equal(columns, expected):
+    assert set(columns) == set(expected)
+    for name, values in expected.items():
+        # Même valeur que np.loadtxt, convertie dans le type de la colonne
+        np.testing.assert_array_equal(columns[name], values.astype(columns[name].dtype), err_msg=name)
+
+
+@pytest.mark.parametrize('frame', ['llh', 'xyz', 'enu'])
+@pytest.mark.parametrize('time', ['hms', 'tow'])
+def test_read_matches_loadtxt(tmp_path, frame, time):
+    lines = epoch_lines(frame, time, 300)
+    path = write_pos(tmp_path / 'rover.pos', frame, time, lines=lines)
+
+    fmt = read_pos_format(path)
+    assert (fmt.frame, fmt.time) == (frame, time)
+    columns = read_pos_columns(path, use_cache=False)
+    assert_columns_equal(columns, reference_columns(lines, frame, time))
+
+
+def test_read_in_small_chunks(tmp_path):
+    lines = epoch_lines('llh', 'hms', 500)
+    path = write_pos(tmp_path / 'rover.pos', lines=lines)
+
+    chunks = list(iter_pos_chunks(path, chunk_bytes=1000, use_cache=False))
+    assert len(chunks) > 10
+    columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    assert_columns_equal(columns, reference_columns(lines, 'llh', 'hms'))
+
+
+def test_dms_latitude_longitude(tmp_path):
+    lines = [
+        "2024/07/15 10:00:00.000   45 30 15.12345  -73 10 05.54321    25.1323   1  10"
+        "   0.0100   0.0200   0.0300   0.0010   0.0020   0.0030   0.00    3.1\n",
+        "2024/07/15 10:00:01.000   -0 30 15.00000    0 10 05.00000    25.1323   1  10"
+        "   0.0100   0.0200   0.0300   0.0010   0.0020   0.0030   0.00    3.1\n",
+    ]
+    path = tmp_path / 'dms.pos'
+    with open(path, 'w') as f:
+        f.write("%  GPST                  latitude(d'\")   longitude(d'\")  height(m)   Q  ns   sdn(m)   sde(m)"
+                "   sdu(m)  sdne(m)  sdeu(m)  sdun(m) age(s)  ratio\n")
+        f.writelines(lines)
+
+    columns = read_pos_columns(str(path), use_cache=False)
+    np.testing.assert_allclose(columns['lat'], [45 + 30 / 60 + 15.12345 / 3600, -(30 / 60 + 15 / 3600)], rtol=1e-15)
+    np.testing.assert_allclose(columns['lon'], [-(73 + 10 / 60 + 5.54321 / 3600), 10 / 60 + 5 / 3600], rtol=1e-15)
+
+
+def test_fixed_width_matches_fromstring():
+    rng = np.random.default_rng(1)
+    checked = 0
+    for _ in range(300):
+        widths = rng.integers(4, 16, size=rng.integers(1, 7))
+        decimals = [int(rng.integers(0, width - 2)) for width in widths]
+        lines = []
+        for _ in range(int(rng.integers(1, 40))):
+            fields = []
+            for width, places in zip(widths, decimals):
+                limit = 10.0 ** (width - places - 3)
+                fields.append(f"{rng.uniform(-limit, limit):{width}.{places}f}")
+            lines.append(" " + " ".join(fields) + "\n")
+        data = "".join(lines).encode()
+        values = parse_fixed_width(data, len(widths))
+        if values is None:
+            continue
+        checked += 1
+        expected = np.array([[float(token) for token in line.split()] for line in lines])
+        # Bit à bit, y compris le signe de -0.0
+        np.testing.assert_array_equal(values.view(np.uint64), expected.view(np.uint64))
+    assert checked > 100
+
+
+def test_invalid_lines_do_not_lose_the_file(tmp_path):
+    lines = epoch_lines('llh', 'hms', 50)
+    damaged = lines[:10] + ["garbage line here\n"] + lines[10:20] + ["\n", lines[20][:40] + "\n"] + lines[21:]
+    path = write_pos(tmp_path / 'rover.pos', lines=damaged + [lines[-1][:30]])
+
+    columns = read_pos_columns(path, use_cache=False)
+    expected = reference_columns(lines[:20] + lines[21:], 'llh', 'hms')
+    assert_columns_equal(columns, expected)
+
+
+def test_filtered_read_matches_mask_after_read(tmp_path):
+    lines = epoch_lines('llh', 'hms', 2000)
+    path = write_pos(tmp_path / 'rover.pos', lines=lines)
+    everything = read_pos_columns(path, use_cache=False)
+    filters = PosFilter(
+        quality=(1, 2), start=everything['time'][300], end=everything['time'][1700],
+        bbox=(-45, -90, 60, 120), max_sdu=0.4,
+    )
+    mask = filters.mask(everything)
+    assert 0 < mask.sum() < len(mask)
+    expected = {name: values[mask] for name, values in everything.items()}
+
+    # Lecture du texte, puis lecture depuis le cache écrit au passage
+    for _ in range(2):
+        columns = read_pos_columns(path, filters=filters)
+        for name in expected:
+            np.testing.assert_array_equal(columns[name], expected[name], err_msg=name)
+    assert load_pos_cache(path) is not None
+
+
+def test_cache_is_rebuilt_when_the_source_changes(tmp_path):
+    lines = epoch_lines('llh', 'hms', 100)
+    path = write_pos(tmp_path / 'rover.pos', lines=lines)
+    first = read_pos_columns(path)
+    cached = load_pos_cache(path)
+    assert cached is not None
+    for name in first:
+        np.testing.assert_array_equal(cached[name], first[name])
+
+    # Taille modifiée : une époque de plus
+    with open(path, 'a') as f:
+        f.write(epoch_lines('llh', 'hms', 101)[-1])
+    assert load_pos_cache(path) is None
+    assert len(read_pos_columns(path)['time']) == 101
+    assert len(load_pos_cache(path)['time']) == 101
+
+    # Même taille, date de modification différente : valeur changée en place
+    with open(path, 'r+b') as f:
+        data = f.read()
+        f.seek(data.index(b'\n2024') + 1 + len('2024/07/15 23:59:50.000  '))
+        f.write(b'1')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_pos_cache(path) is None
+    assert read_pos_columns(path)['lat'][0] != first['lat'][0]
+
+
+def test_corrupt_cache_is_ignored(tmp_path):
+    path = write_pos(tmp_path / 'rover.pos', rows=20)
+    read_pos_columns(path)
+    with open(cache_path(path), 'r+b') as f:
+        f.write(b'garbage!')
+    assert load_pos_cache(path) is None
+    assert len(read_pos_columns(path)['time']) == 20
+
+
+@pytest.mark.parametrize('mode', ['decimate', 'mean'])
+def test_time_buckets_match_grouped_reference(tmp_path, mode):
+    path = write_pos(tmp_path / 'rover.pos', rows=600)
+    everything = read_pos_columns(path, use_cache=False)
+    buckets = TimeBuckets(7, mode)
+
+    # Petits blocs : des intervalles sont à cheval sur deux blocs
+    chunks = list(iter_pos_chunks(path, chunk_bytes=2000, use_cache=False, buckets=buckets))
+    columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+    keys = everything['time'].astype(np.int64) // 7000
+    groups = [np.flatnonzero(keys == key) for key in np.unique(keys)]
+    assert len(columns['time']) == len(groups)
+    for i, rows in enumerate(groups):
+        if mode == 'decimate':
+            for name, values in everything.items():
+                assert columns[name][i] == values[rows[0]]
+            continue
+        assert columns['time'][i] == np.datetime64(int(keys[rows[0]]) * 7000, 'ms')
+        np.testing.assert_allclose(columns['lat'][i], everything['lat'][rows].mean(), rtol=0, atol=1e-12)
+        np.testing.assert_allclose(columns['height'][i], everything['height'][rows].mean(), rtol=0, atol=1e-9)
+        sdu = np.sqrt(np.mean(everything['sdu'][rows].astype(np.float64) ** 2))
+        np.testing.assert_allclose(columns['sdu'][i], sdu, rtol=1e-6)
+        assert columns['Q'][i] == everything['Q'][rows].max()
+        assert columns['ns'][i] == everything['ns'][rows].min()
+        assert columns['ratio'][i] == everything['ratio'][rows].min()
+
+
+def test_indexed_read_matches_time_window(tmp_path):
+    path = write_pos(tmp_path / 'rover.pos', rows=3000)
+    everything = read_pos_columns(path, use_cache=False)
+    times = everything['time']
+
+    for use_cache in (True, True, False):
+        with IndexedPosFile(path, stride=4096, use_cache=use_cache) as pos:
+            assert pos.start == times[0] and pos.end == times[-1]
+            for t0, t1 in ((times[5], times[2500]), (times[1234], times[1234]), (None, times[10]),
+                           (times[2990], None), (times[-1] + 1, None)):
+                columns = pos.read(t0, t1)
+                mask = np.ones(len(times), dtype=bool)
+                if t0 is not None:
+                    mask &= times >= t0
+                if t1 is not None:
+                    mask &= times <= t1
+                for name in everything:
+                    np.testing.assert_array_equal(columns[name], everything[name][mask], err_msg=name)
+
+
+def test_load_pos_files_in_order_and_cancel(tmp_path):
+    paths = [write_pos(tmp_path / f'rover_{i}.pos', rows=10 * (i + 1), seed=i) for i in range(3)]
+    results = load_pos_files(paths, max_workers=2)
+    assert [len(columns['time']) for columns in results] == [10, 20, 30]
+
+    cancel = threading.Event()
+    cancel.set()
+    assert load_pos_files(paths[:1], cancel=cancel) is None
+    assert load_pos_files(paths, cancel=cancel) is None
@@ -0,0 +1,122 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from ppk_batch import BatchJob, ProcessingManifest, config_overrides, job_fingerprint
+from ppk_config import PPKConfig, base_position_overrides
+
+
+CONFIG_TEXT = """# rtkpost options (2024/01/01 00:00:00, v.demo5 b34h)
+
+pos1-posmode       =kinematic  # (0:single,1:dgps,2:kinematic)
+pos1-frequency     =l1+l2      # (1:l1,2:l1+l2)
+pos1-elmask        =15         # (deg)
+out-solformat      =llh
+ant1-pos1          =0
+ant2-postype       =rinexhead  # (0:llh,1:xyz,2:single)
+ant2-pos1          =0
+misc-timeinterp =on
+"""
+
+
+def test_render_is_identity():
+    assert PPKConfig.parse(CONFIG_TEXT).render() == CONFIG_TEXT
+
+
+def test_with_overrides():
+    config = PPKConfig.parse(CONFIG_TEXT)
+    modified = config.with_overrides({'pos1-elmask': ' 10 ', 'out-solformat': 'llh', 'new-key': 3.5})
+
+    assert modified.get('pos1-elmask') == '10'
+    assert modified.get('new-key') == '3.5'
+    assert 'new-key' not in config
+    assert config.render() == CONFIG_TEXT
+
+    original = CONFIG_TEXT.splitlines()
+    lines = modified.render().splitlines()
+    assert len(lines) == len(original) + 1
+    changed = [i for i, (a, b) in enumerate(zip(original, lines)) if a != b]
+    assert changed == [original.index('pos1-elmask        =15         # (deg)')]
+    assert lines[changed[0]].startswith('pos1-elmask        =10')
+    assert lines[changed[0]].endswith('# (deg)')
+    assert lines[-1] == 'new-key            =3.5'
+    assert PPKConfig.parse(modified.render()).get('pos1-elmask') == '10'
+
+
+def test_base_position_overrides():
+    config = PPKConfig.parse(CONFIG_TEXT).with_overrides(base_position_overrides(45.5, -73.5, 30.25))
+    assert config.get('ant2-postype') == 'llh'
+    assert [config.get(key) for key in ('ant2-pos1', 'ant2-pos2', 'ant2-pos3')] == ['45.5', '-73.5', '30.25']
+
+
+def test_config_overrides():
+    config = PPKConfig.parse(CONFIG_TEXT)
+    settings = {'pos1-elmask': '10', 'pos1-posmode': '', 'pos1-frequency': None, 'unknown-key': '1'}
+    assert config_overrides(config, settings) == {'pos1-elmask': '10'}
+
+
+@pytest.fixture
+def job(tmp_path):
+    for name in ('rover.obs', 'base.obs', 'nav.nav', 'rnx2rtkp', 'job.conf'):
+        (tmp_path / name).write_text(name)
+    output = tmp_path / 'out'
+    output.mkdir()
+    job = BatchJob(
+        SimpleNamespace(filepath=tmp_path / 'rover.obs'),
+        SimpleNamespace(filepath=tmp_path / 'base.obs'),
+        SimpleNamespace(filepath=tmp_path / 'nav.nav'),
+        tmp_path / 'job.conf',
+        output / 'rover.pos',
+    )
+    job.rtk_exe = tmp_path / 'rnx2rtkp'
+    return job
+
+
+def touch(path, delta):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta))
+
+
+def test_job_fingerprint(job, tmp_path):
+    fingerprint = job_fingerprint(job, job.rtk_exe)
+    assert job_fingerprint(job, job.rtk_exe) == fingerprint
+
+    job.config_file.write_text('job.conX')
+    changed_config = job_fingerprint(job, job.rtk_exe)
+    assert changed_config != fingerprint
+
+    touch(tmp_path / 'base.obs', 1_000_000_000)
+    changed_input = job_fingerprint(job, job.rtk_exe)
+    assert changed_input != changed_config
+
+    (tmp_path / 'nav.nav').write_text('nav.nav and more')
+    assert job_fingerprint(job, job.rtk_exe) != changed_input
+
+
+def test_processing_manifest(job):
+    job.fingerprint = job_fingerprint(job, job.rtk_exe)
+    job.stats = {'quality': {'1': 100.0}, 'epochs': 10}
+    job.output_pos.write_text('% solution\n')
+
+    manifest = ProcessingManifest(job.output_pos.parent)
+    assert not manifest.is_up_to_date(job)
+    manifest.record(job)
+    manifest.save()
+
+    reloaded = ProcessingManifest(job.output_pos.parent)
+    assert reloaded.is_up_to_date(job)
+    assert reloaded.cached_stats(job) == job.stats
+
+    job.fingerprint = 'other'
+    assert not reloaded.is_up_to_date(job)
+    job.fingerprint = job_fingerprint(job, job.rtk_exe)
+    job.output_pos.write_text('% solution, edited\n')
+    assert not reloaded.is_up_to_date(job)
+    job.output_pos.unlink()
+    assert not reloaded.is_up_to_date(job)
+
+
+def test_corrupt_manifest_is_ignored(job):
+    (job.output_pos.parent / ProcessingManifest.FILENAME).write_text('{not json')
+    assert ProcessingManifest(job.output_pos.parent).entries == {}
@@ -5,14 +5,228 @@ import pandas as pd
 import shutil
 import re
 import matplotlib.pyplot as plt
-from datetime import datetime
 import matplotlib.dates as mdates
 import json
+import numpy as np
+import threading
+from pos_export import (
+    CsvPosWriter, ExcelPosWriter, GeoPackagePosWriter, ParquetPosWriter, export_pos_files, table_columns
+)
+from pos_reader import PosFilter, TimeBuckets, columns_frame, load_pos_files
+from pos_stats import MIN_WEIGHT_SIGMA, summarize_pos_files, summary_row
+from geodesy import enu_to_geodetic, geodetic_to_enu
+from sum_file import read_sum_file, read_sum_files
+from dms import convert_dms_columns, dms_array_to_dd, dms_to_dd
+
+
+# Correction de hauteur (m) selon le modèle d'antenne et le type d'occupation
+ANTENNA_OFFSETS = {
+    ("EMLID INREACH RS2", "Base"): 0.136,
+    ("EMLID INREACH RS2", "Rover"): -0.136,
+    ("FOIF A30", "Base"): 0.0,
+    ("FOIF A30", "Rover"): -0.088,
+}
+
+
+class OccupationModel:
+    """Positions de la table du GNSS Data Viewer en colonnes NumPy typées
+
+    Une ligne par occupation, repérée par l'identifiant de sa ligne du
+    Treeview. Les écarts à une origine fixe sont gardés en mètres (nord,
+    est, haut) ; les sommes pondérées par 1/sigma² sont mises à jour à chaque
+    ajout ou suppression, sans relire la table.
+    """
+
+    POSITION_FIELDS = ("Latitude (DD)", "Longitude (DD)", "Elevation (m)")
+    SIGMA_FIELDS = ("Sigma UTM N (m)", "Sigma UTM E (m)", "Sigma Elev. (m)")
+    AXES = ("North", "East", "Up")
+
+    def __init__(self, capacity=256):
+        self.positions = np.empty((capacity, 3))   # latitude, longitude (°), hauteur (m)
+        self.offsets = np.empty((capacity, 3))     # nord, est, haut (m) depuis l'origine
+        self.weights = np.empty((capacity, 3))     # 1/sigma² (NaN sans écart-type)
+        self.items = []                            # identifiant Treeview de chaque ligne
+        self.index = {}                            # identifiant -> ligne
+        self.clear()
+
+    def clear(self):
+        self.items.clear()
+        self.index.clear()
+        self.origin = None
+        self.weight_sums = np.zeros(3)
+        self.weighted_sums = np.zeros(3)
+        self.weighted_squares = np.zeros(3)
+        self.sums = np.zeros(3)
+        self.squares = np.zeros(3)
+        self.missing = np.zeros(3, dtype=np.int64)   # lignes sans écart-type, par axe
+
+    def __len__(self):
+        return len(self.items)
+
+    @staticmethod
+    def parse_fields(rows, fields):
+        """Valeurs (lignes, 3) des champs demandés ; NaN si vide ou illisible"""
+        values = np.full((len(rows), len(fields)), np.nan)
+        for i, row in enumerate(rows):
+            for j, field in enumerate(fields):
+                try:
+                    values[i, j] = float(row.get(field))
+                except (TypeError, ValueError):
+                    pass
+        return values
+
+    def add_rows(self, items, rows):
+        """Ajoute des lignes de table (dictionnaires champ -> valeur) ; rend le nombre retenu
+
+        Les lignes sans latitude, longitude ou hauteur numériques sont ignorées.
+        """
+        positions = self.parse_fields(rows, self.POSITION_FIELDS)
+        sigmas = self.parse_fields(rows, self.SIGMA_FIELDS)
+        valid = np.isfinite(positions).all(axis=1)
+        self.extend([item for item, keep in zip(items, valid) if keep], positions[valid], sigmas[valid])
+        return int(valid.sum())
+
+    def extend(self, items, positions, sigmas):
+        count = len(items)
+        if not count:
+            return
+        size = len(self.items)
+        if size + count > len(self.positions):
+            capacity = max(2 * len(self.positions), size + count)
+            for name in ('positions', 'offsets', 'weights'):
+                array = np.empty((capacity, 3))
+                array[:size] = getattr(self, name)[:size]
+                setattr(self, name, array)
+        if self.origin is None:
+            self.origin = positions[0].copy()
+
+        offsets = self.local_offsets(positions)
+        weights = 1.0 / np.maximum(np.abs(sigmas), MIN_WEIGHT_SIGMA) ** 2
+        rows = slice(size, size + count)
+        self.positions[rows] = positions
+        self.offsets[rows] = offsets
+        self.weights[rows] = weights
+        for i, item in enumerate(items):
+            self.index[item] = size + i
+        self.items.extend(items)
+        self.accumulate(offsets, weights, 1)
+
+    def remove(self, item):
+        """Retire la ligne d'un identifiant (la dernière ligne prend sa place)"""
+        row = self.index.pop(item, None)
+        if row is None:
+            return
+        self.accumulate(self.offsets[row:row + 1], self.weights[row:row + 1], -1)
+        last = len(self.items) - 1
+        if row != last:
+            moved = self.items[last]
+            self.items[row] = moved
+            self.index[moved] = row
+            for array in (self.positions, self.offsets, self.weights):
+                array[row] = array[last]
+        self.items.pop()
+        if not self.items:
+            # Table vide : repartir de sommes exactement nulles et d'une nouvelle origine
+            self.clear()
+
+    def local_offsets(self, positions):
+        """Écarts nord, est, haut (m) à l'origine, dans son repère local"""
+        east, north, up = geodetic_to_enu(positions[:, 0], positions[:, 1], positions[:, 2], self.origin)
+        return np.column_stack((north, east, up))
+
+    def accumulate(self, offsets, weights, sign):
+        weighted = np.isfinite(weights)
+        weights = np.where(weighted, weights, 0.0)
+        self.weight_sums += sign * weights.sum(axis=0)
+        self.weighted_sums += sign * (weights * offsets).sum(axis=0)
+        self.weighted_squares += sign * (weights * offsets * offsets).sum(axis=0)
+        self.sums += sign * offsets.sum(axis=0)
+        self.squares += sign * (offsets * offsets).sum(axis=0)
+        self.missing += sign * (~weighted).sum(axis=0)
+
+    def statistics(self):
+        """Moyenne, précision, écart-type et étendue (m) par axe ; None si la table est vide
+
+        Un axe est pondéré par 1/sigma² si toutes les lignes ont un écart-type,
+        sinon toutes les lignes y ont le même poids.
+        """
+        count = len(self.items)
+        if not count:
+            return None
+        weighted = self.missing == 0
+        weight_sums = np.where(weighted, self.weight_sums, count)
+        mean = np.where(weighted, self.weighted_sums, self.sums) / weight_sums
+        squares = np.where(weighted, self.weighted_squares, self.squares) / weight_sums
+        std = np.sqrt(np.maximum(squares - mean ** 2, 0.0))
+        # Précision formelle de la moyenne : 1/sqrt(somme des poids), ou std/sqrt(n) sans pondération
+        precision = np.where(weighted, 1.0 / np.sqrt(weight_sums), std / np.sqrt(count))
+        offsets = self.offsets[:count]
+        spread = offsets.max(axis=0) - offsets.min(axis=0)
+        north, east, up = mean
+        position = np.array([float(value) for value in enu_to_geodetic(east, north, up, self.origin)])
+        return {
+            'count': count,
+            'position': position.tolist(),
+            'weighted': weighted.tolist(),
+            'precision': precision.tolist(),
+            'std': std.tolist(),
+            'spread': spread.tolist(),
+        }
+
+
+def sum_rows(results, form, fields):
+    """Lignes de la table (dans l'ordre de fields) et erreurs pour des résultats de read_sum_files
+
+    Le modèle d'antenne, l'occupation, le point de référence, le datum et la
+    solution viennent du formulaire (form) ; la correction ANTENNA_OFFSETS du
+    modèle et de l'occupation est appliquée à toutes les hauteurs.
+    """
+    records = []
+    errors = []
+    for path, record in results:
+        if isinstance(record, Exception):
+            errors.append(f"{os.path.basename(path)}: {record}")
+        elif not record.has_position():
+            errors.append(f"{os.path.basename(path)}: no POS LAT/LON/HGT lines")
+        else:
+            records.append(record)
+    if not records:
+        return [], errors
+
+    # Ordre chronologique des sessions
+    records.sort(key=lambda record: (record.start is None, record.start or 0))
+    offset = ANTENNA_OFFSETS.get((form["GNSS Model"], form["Description of Occupation"]), 0.0)
+
+    # Coordonnées et hauteurs corrigées de tout le lot en une fois
+    latitudes = np.array([record.latitude for record in records])
+    longitudes = np.array([record.longitude for record in records])
+    heights = np.array([record.height for record in records]) + offset
+    columns = {
+        "Latitude (DD)": np.char.mod('%.9f', latitudes),
+        "Longitude (DD)": np.char.mod('%.9f', longitudes),
+        "Elevation (m)": np.char.mod('%.3f', heights),
+    }
+
+    rows = []
+    for i, record in enumerate(records):
+        values = record.viewer_fields()
+        row = []
+        for field in fields:
+            if field in columns:
+                row.append(str(columns[field][i]))
+            elif field in ("GNSS Model", "Description of Occupation", "Reference Point", "Datum", "Solution"):
+                row.append(form[field])
+            else:
+                row.append(values.get(field) or "")
+        rows.append(row)
+    return rows, errors
 
 
 class GNSSViewer:
     def __init__(self, window):
         self.window = window
+        # Positions de la table en colonnes typées (statistiques sans relire le Treeview)
+        self.model = OccupationModel()
         self.setup_ui()
 
         # Ajouter une variable pour tracker si l'élévation a été modifiée manuellement
@@ -83,55 +297,16 @@ class GNSSViewer:
         self.stats_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
     def calculate_mean(self):
-        """Calcule les statistiques des coordonnées"""
+        """Affiche les statistiques des coordonnées de la table"""
         if not self.tree.get_children():
             messagebox.showwarning("Warning", "No data in table.")
             return
 
         try:
-            # Récupération des indices des colonnes
-            lat_index = self.fields.index("Latitude (DD)")
-            lon_index = self.fields.index("Longitude (DD)")
-            alt_index = self.fields.index("Elevation (m)")
-
-            # Listes pour stocker les valeurs
-            lats = []
-            lons = []
-            alts = []
-
-            # Collecter toutes les valeurs
-            for item in self.tree.get_children():
-                values = self.tree.item(item)['values']
-                lat = float(values[lat_index])
-                lon = float(values[lon_index])
-                alt = float(values[alt_index])
-                
-                lats.append(lat)
-                lons.append(lon)
-                alts.append(alt)
-
-            # Calculer les statistiques
-            count = len(lats)
-            stats = {
-                'Latitude': {
-                    'Mean': sum(lats) / count,
-                    'Min': min(lats),
-                    'Max': max(lats),
-                    'Range': max(lats) - min(lats)
-                },
-                'Longitude': {
-                    'Mean': sum(lons) / count,
-                    'Min': min(lons),
-                    'Max': max(lons),
-                    'Range': max(lons) - min(lons)
-                },
-                'Elevation': {
-                    'Mean': sum(alts) / count,
-                    'Min': min(alts),
-                    'Max': max(alts),
-                    'Range': max(alts) - min(alts)
-                }
-            }
+            stats = self.model.statistics()
+            if stats is None:
+                messagebox.showwarning("Warning", "No valid coordinates in table.")
+                return
 
             # Créer une nouvelle fenêtre pour les résultats
             result_window = tk.Toplevel()
@@ -145,24 +320,11 @@ class GNSSViewer:
             result_window.focus_force()
 
             # Zone de texte pour les résultats
-            text = tk.Text(result_window, wrap=tk.WORD, height=20, width=60)
+            text = tk.Text(result_window, wrap=tk.WORD, height=20, width=60, font="TkFixedFont")
             text.pack(padx=10, pady=10, expand=True, fill=tk.BOTH)
 
-            # Créer les tags pour le texte en gras
-            text.tag_configure("bold", font=("TkDefaultFont", 9, "bold"))
-
             # Formater et afficher les résultats
-            result = f"Statistics from {count} points:\n\n"
-            text.insert(tk.END, result)
-            
-            for coord in ['Latitude', 'Longitude', 'Elevation']:
-                text.insert(tk.END, f"{coord}:\n")
-                text.insert(tk.END, "  Mean: ", "bold")
-                text.insert(tk.END, f"{stats[coord]['Mean']:.9f}°\n" if coord != 'Elevation' else f"{stats[coord]['Mean']:.4f} m\n")
-                text.insert(tk.END, f"  Min:  {stats[coord]['Min']:.9f}°\n" if coord != 'Elevation' else f"  Min:  {stats[coord]['Min']:.4f} m\n")
-                text.insert(tk.END, f"  Max:  {stats[coord]['Max']:.9f}°\n" if coord != 'Elevation' else f"  Max:  {stats[coord]['Max']:.4f} m\n")
-                text.insert(tk.END, f"  Range:{stats[coord]['Range']:.9f}°\n" if coord != 'Elevation' else f"  Range:{stats[coord]['Range']:.4f} m\n")
-                text.insert(tk.END, "\n")
+            text.insert(tk.END, self.format_statistics(stats))
 
             text.configure(state='normal')
 
@@ -196,6 +358,54 @@ class GNSSViewer:
         except Exception as e:
             messagebox.showerror("Error", f"Error calculating statistics: {str(e)}")
 
+    def format_statistics(self, stats):
+        """Texte des statistiques : moyenne pondérée, puis précision, écart-type et étendue en mètres"""
+        latitude, longitude, height = stats['position']
+        rows = self.tree.get_children()
+        lines = [f"Statistics from {stats['count']} points" + (
+            f" ({len(rows) - stats['count']} rows without coordinates)" if len(rows) > stats['count'] else ""
+        ) + ":", ""]
+        lines.append("Weighted mean (1/sigma²):" if all(stats['weighted']) else "Mean:")
+        lines.append(f"  Latitude:  {latitude:.9f}°")
+        lines.append(f"  Longitude: {longitude:.9f}°")
+        lines.append(f"  Elevation: {height:.4f} m")
+        lines.append("")
+        lines.append(f"{'':8}{'Precision':>11}{'Std':>9}{'Spread':>9}")
+        for i, axis in enumerate(self.model.AXES):
+            flag = "" if stats['weighted'][i] else " *"
+            lines.append(
+                f"{axis:8}{stats['precision'][i]:>9.4f} m{stats['std'][i]:>7.4f} m{stats['spread'][i]:>7.4f} m{flag}"
+            )
+        if not all(stats['weighted']):
+            lines.append("* unweighted (missing sigma)")
+        return "\n".join(lines) + "\n"
+
+    def update_stats_panel(self):
+        """Met à jour le panneau de statistiques (sommes tenues à jour par le modèle)"""
+        stats = self.model.statistics()
+        self.stats_text.configure(state='normal')
+        self.stats_text.delete("1.0", tk.END)
+        if stats is not None:
+            latitude, longitude, height = stats['position']
+            lines = [f"{stats['count']} points", f"Lat  {latitude:.9f}", f"Lon  {longitude:.9f}", f"Elev {height:.4f} m", ""]
+            lines.append("Std N/E/U (m):")
+            lines.append(" ".join(f"{value:.4f}" for value in stats['std']))
+            lines.append("Spread N/E/U (m):")
+            lines.append(" ".join(f"{value:.4f}" for value in stats['spread']))
+            self.stats_text.insert(tk.END, "\n".join(lines))
+        self.stats_text.configure(state='disabled')
+
+    def insert_rows(self, rows):
+        """Ajoute des lignes (listes de valeurs dans l'ordre de self.fields) à la table et au modèle"""
+        items = [self.tree.insert("", "end", values=values) for values in rows]
+        self.model.add_rows(items, [dict(zip(self.fields, values)) for values in rows])
+        self.update_stats_panel()
+
+    def clear_table(self):
+        self.tree.delete(*self.tree.get_children())
+        self.model.clear()
+        self.update_stats_panel()
+
     def save_statistics(self, content):
         """Sauvegarde les statistiques dans un fichier texte"""
         file_path = filedialog.asksaveasfilename(
@@ -277,6 +487,13 @@ class GNSSViewer:
         button_frame.pack(fill=tk.X, padx=10, pady=5)
 
         ttk.Button(button_frame, text="Import .sum File", command=self.load_file).pack(side=tk.LEFT, padx=5)
+        # Boutons d'import par lot, désactivés pendant la lecture en arrière-plan
+        self.import_buttons = [
+            ttk.Button(button_frame, text="Import .sum Files...", command=self.import_sum_files),
+            ttk.Button(button_frame, text="Import .sum Folder", command=lambda: self.import_sum_files(folder=True)),
+        ]
+        for button in self.import_buttons:
+            button.pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Add to Table", command=self.add_to_treeview).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Delete Entry", command=self.delete_entry).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Clear Fields", command=self.clear_fields).pack(side=tk.LEFT, padx=5)
@@ -324,19 +541,8 @@ class GNSSViewer:
             current_model = self.gnss_model_var.get()
             current_occupation = self.field_entries["Description of Occupation"].get()
             
-            # Calculer le nouvel offset
-            if current_model == "EMLID INREACH RS2":
-                if current_occupation == "Base":
-                    offset = 0.136
-                else:
-                    offset = -0.136
-            elif current_model == "FOIF A30":
-                if current_occupation == "Base":
-                    offset = 0.0
-                else:
-                    offset = -0.088
-            else:  # "Select a antenna model"
-                offset = 0.0
+            # Calculer le nouvel offset ("Select a antenna model" : aucun)
+            offset = ANTENNA_OFFSETS.get((current_model, current_occupation), 0.0)
                 
             # Toujours partir de l'élévation originale pour le calcul
             adjusted_elevation = self.original_elevation + offset
@@ -350,20 +556,18 @@ class GNSSViewer:
 
     def on_reference_point_change(self, event):
         """Gère le changement de point de référence"""
-        ref_point = self.field_entries["Reference Point"].get()
         gnss_model = self.field_entries["GNSS Model"].get()
+        occupation = self.field_entries["Description of Occupation"].get()
         
         try:
             current_elevation = float(self.field_entries["Elevation (m)"].get())
-            if gnss_model == "EMLID INREACH RS2":
-                offset = 0.136  # Offset total ARP à APC
+            # Même correction que l'import par lot (aucune pour un modèle absent de la table)
+            offset = ANTENNA_OFFSETS.get((gnss_model, occupation), 0.0)
+            if offset:
                 adjusted_elevation = current_elevation + offset
                     
                 self.field_entries["Elevation (m)"].delete(0, tk.END)
                 self.field_entries["Elevation (m)"].insert(0, f"{adjusted_elevation:.6f}")
-            elif gnss_model == "N/A":
-                # Ne rien faire si le modèle est N/A
-                pass
         except ValueError:
             pass
 
@@ -381,7 +585,11 @@ class GNSSViewer:
         self.window.attributes('-topmost', True)
         
         if file_path:
-            parsed_data = self.parse_sum_file(file_path)
+            try:
+                parsed_data = read_sum_file(file_path).viewer_fields()
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Error parsing file: {e}")
+                parsed_data = None
             if parsed_data:
                 # Stocker l'élévation originale du fichier .sum
                 if parsed_data["Elevation (m)"]:
@@ -398,14 +606,70 @@ class GNSSViewer:
                         entry.delete(0, tk.END)
                         entry.insert(0, parsed_data[field])
 
-                # Appliquer l'offset SEULEMENT si EMLID INREACH RS2 est sélectionné
+                # Correction du modèle et de l'occupation, comme pour l'import par lot
                 current_model = self.field_entries["GNSS Model"].get()
-                if current_model == "EMLID INREACH RS2":
-                    offset = 0.136
+                occupation = self.field_entries["Description of Occupation"].get()
+                offset = ANTENNA_OFFSETS.get((current_model, occupation), 0.0)
+                if offset and self.original_elevation is not None:
                     adjusted_elevation = self.original_elevation + offset
                     self.field_entries["Elevation (m)"].delete(0, tk.END)
                     self.field_entries["Elevation (m)"].insert(0, f"{adjusted_elevation:.6f}")
 
+    def import_sum_files(self, folder=False):
+        """Ajoute directement à la table une ligne par fichier .sum (sélection multiple ou dossier)
+
+        Le modèle d'antenne, l'occupation, le point de référence, le datum et la
+        solution sont ceux du formulaire ; la correction de hauteur du modèle
+        est appliquée à toutes les lignes. Les fichiers sont lus dans un thread
+        de travail ; seule l'insertion des lignes se fait dans l'interface.
+        """
+        self.window.attributes('-topmost', False)
+        if folder:
+            directory = filedialog.askdirectory(parent=self.window)
+            selection = []
+        else:
+            directory = None
+            selection = list(filedialog.askopenfilenames(filetypes=[("SUM Files", "*.sum")], parent=self.window))
+        self.window.attributes('-topmost', True)
+        if not directory and not selection:
+            return
+
+        # Valeurs Tk lues ici, dans le thread de l'interface
+        form = {field: self.field_entries[field].get() for field in self.fields}
+        fields = list(self.fields)
+        for button in self.import_buttons:
+            button.configure(state='disabled')
+
+        def worker():
+            try:
+                paths = sorted(
+                    os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith('.sum')
+                ) if directory else selection
+                rows, errors = sum_rows(read_sum_files(paths), form, fields)
+                self.window.after(0, self.finish_sum_import, len(paths), rows, errors, None)
+            except Exception as e:
+                self.window.after(0, self.finish_sum_import, 0, [], [], e)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_sum_import(self, total, rows, errors, error):
+        """Insère les lignes lues par import_sum_files (thread de l'interface)"""
+        for button in self.import_buttons:
+            button.configure(state='normal')
+        if error is not None:
+            messagebox.showerror("Import", f"Error reading .sum files: {error}", parent=self.window)
+            return
+        if rows:
+            self.insert_rows(rows)
+            self.tree.update_idletasks()
+
+        message = f"Imported {len(rows)} of {total} .sum files"
+        if errors:
+            shown = "\n".join(errors[:15]) + ("\n..." if len(errors) > 15 else "")
+            messagebox.showwarning("Import", f"{message}.\n\nSkipped:\n{shown}", parent=self.window)
+        else:
+            messagebox.showinfo("Import", message, parent=self.window)
+
     def add_to_treeview(self):
         """Ajoute les données du formulaire à la table"""
         # Vérifier si les coordonnées sont en format DMS
@@ -446,7 +710,7 @@ class GNSSViewer:
                     except ValueError:
                         pass
                 values.append(value)
-            self.tree.insert("", "end", values=values)
+            self.insert_rows([values])
             
         except ValueError:
             error_window = messagebox.showerror(
@@ -464,6 +728,8 @@ class GNSSViewer:
             return
         for item in selected_items:
             self.tree.delete(item)
+            self.model.remove(item)
+        self.update_stats_panel()
 
     def clear_fields(self):
         """Efface tous les champs du formulaire"""
@@ -515,65 +781,6 @@ class GNSSViewer:
         except Exception as e:
             messagebox.showerror("Error", f"Invalid DMS format: {str(e)}")
 
-    def parse_sum_file(self, file_path):
-        """Parse un fichier .sum et extrait les données"""
-        parsed_data = {
-            "Date (UTC)": None, "File": None, "GNSS Model": None,
-            "Description of Occupation": None, "Time Start (UTC)": None,
-            "Time End (UTC)": None, "Duration": None, "Interval": None,
-            "Latitude (DD)": None, "Longitude (DD)": None, "UTM N (m)": None,
-            "UTM E (m)": None, "Elevation (m)": None, "Reference Point": "APC",
-            "Sigma UTM N (m)": None, "Sigma UTM E (m)": None,
-            "Sigma Elev. (m)": None, "Datum": "ITRF20", "Solution": "PPP",
-        }
-
-        try:
-            with open(file_path, "r") as file:
-                content = file.readlines()
-
-            for line in content:
-                if line.startswith("MKR"):
-                    parsed_data["Date (UTC)"] = line.split("MKR")[1].strip()
-                elif line.startswith("RNX"):
-                    parsed_data["File"] = line.split("RNX")[1].strip()
-                elif line.startswith("BEG"):
-                    date_time = line.split("BEG")[1].strip()
-                    parsed_data["Date (UTC)"] = date_time.split()[0]
-                    parsed_data["Time Start (UTC)"] = date_time
-                elif line.startswith("END"):
-                    parsed_data["Time End (UTC)"] = line.split("END")[1].strip()
-                elif line.startswith("INT"):
-                    parsed_data["Interval"] = line.split("INT")[1].strip()
-                elif "POS LAT" in line:
-                    parts = line.split()
-                    parsed_data["Latitude (DD)"] = f"{parts[7]}° {parts[8]}' {parts[9]}\""
-                    parsed_data["Sigma UTM N (m)"] = parts[11]
-                elif "POS LON" in line:
-                    parts = line.split()
-                    parsed_data["Longitude (DD)"] = f"{parts[7]}° {parts[8]}' {parts[9]}\""
-                    parsed_data["Sigma UTM E (m)"] = parts[11]
-                elif "POS HGT" in line:
-                    parts = line.split()
-                    parsed_data["Elevation (m)"] = parts[5]
-                    parsed_data["Sigma Elev. (m)"] = parts[7]
-                elif "PRJ TYPE ZONE    EASTING     NORTHING" in line:
-                    utm_data_line = content[content.index(line) + 1].strip()
-                    utm_data_parts = utm_data_line.split()
-                    parsed_data["UTM E (m)"] = utm_data_parts[3]
-                    parsed_data["UTM N (m)"] = utm_data_parts[4]
-
-            if parsed_data["Time Start (UTC)"] and parsed_data["Time End (UTC)"]:
-                fmt = "%Y-%m-%d %H:%M:%S.%f"
-                start_time = datetime.strptime(parsed_data["Time Start (UTC)"], fmt)
-                end_time = datetime.strptime(parsed_data["Time End (UTC)"], fmt)
-                duration_seconds = int((end_time - start_time).total_seconds())
-                parsed_data["Duration"] = f"{duration_seconds // 3600:02}:{(duration_seconds % 3600) // 60:02}:{duration_seconds % 60:02}"
-
-            return parsed_data
-        except Exception as e:
-            messagebox.showerror("Error", f"Error parsing file: {e}")
-            return None
-
     def create_menu(self):
         """Crée le menu de l'application"""
         menubar = tk.Menu(self.window)
@@ -600,8 +807,7 @@ class GNSSViewer:
             # Effacer tous les champs
             self.clear_fields()
             # Effacer la table
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            self.clear_table()
             # Réinitialiser l'élévation originale
             if hasattr(self, 'original_elevation'):
                 delattr(self, 'original_elevation')
@@ -630,9 +836,8 @@ class GNSSViewer:
                             self.field_entries[field].insert(0, value)
                     
                     # Charger les données dans la table
-                    self.tree.delete(*self.tree.get_children())
-                    for row in data['table_data']:
-                        self.tree.insert("", tk.END, values=row)
+                    self.clear_table()
+                    self.insert_rows(data['table_data'])
                     
                 messagebox.showinfo("Success", "Project loaded successfully!", parent=self.window)
             except Exception as e:
@@ -692,7 +897,215 @@ class GNSSViewer:
             pass
 
 
+class VirtualTable:
+    """Treeview virtuel : seules les lignes visibles existent dans Tk
+
+    Les données restent dans un modèle (rows, sort) ; le défilement ne fait que
+    réécrire les valeurs d'un petit nombre d'éléments Tk.
+    """
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns, column_widths):
+        self.columns = list(columns)
+        self.model = None
+        self.offset = 0          # première ligne affichée (position dans l'ordre courant)
+        self.visible = 15        # nombre de lignes affichables
+        self.items = []          # éléments Tk réutilisés
+        self.selected = None     # position de la ligne sélectionnée
+        self.sort_column = None
+        self.sort_descending = False
+
+        self.tree = ttk.Treeview(parent, columns=self.columns, show='headings', height=self.visible,
+                                 selectmode='browse')
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=column_widths[col], anchor=tk.CENTER)
+
+        self.vsb = ttk.Scrollbar(parent, orient="vertical", command=self.on_scrollbar)
+        hsb = ttk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.move_selection(-self.visible))
+        self.tree.bind('<Next>', lambda e: self.move_selection(self.visible))
+        self.tree.bind('<Home>', lambda e: self.move_selection(-self.row_count()))
+        self.tree.bind('<End>', lambda e: self.move_selection(self.row_count()))
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+
+    def row_count(self):
+        return self.model.row_count() if self.model else 0
+
+    def set_model(self, model):
+        self.model = model
+        self.offset = 0
+        self.selected = None
+        self.sort_column = None
+        self.sort_descending = False
+        # Nouveau modèle non trié : plus de flèche dans les en-têtes
+        for col in self.columns:
+            self.tree.heading(col, text=col)
+        self.refresh()
+
+    def clear(self):
+        self.set_model(None)
+
+    def on_resize(self, event):
+        visible = max(1, (event.height - self.ROW_HEIGHT) // self.ROW_HEIGHT)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * self.row_count()))
+        elif action == 'scroll':
+            step = self.visible if unit == 'pages' else 1
+            self.scroll(int(value) * step)
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.row_count() - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def show_row(self, position):
+        """Fait défiler jusqu'à la ligne et la sélectionne"""
+        position = max(0, min(position, self.row_count() - 1))
+        if position < self.offset or position >= self.offset + self.visible:
+            self.scroll_to(position - self.visible // 2)
+        self.selected = position
+        self.refresh()
+
+    def move_selection(self, rows):
+        if self.row_count():
+            current = self.selected if self.selected is not None else self.offset
+            self.show_row(current + rows)
+        return 'break'
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            self.selected = self.offset + self.items.index(selection[0])
+
+    def sort_by(self, column):
+        if not self.model:
+            return
+        self.sort_descending = not self.sort_descending if column == self.sort_column else False
+        self.sort_column = column
+        self.model.sort(column, self.sort_descending)
+        for col in self.columns:
+            arrow = (' ▼' if self.sort_descending else ' ▲') if col == column else ''
+            self.tree.heading(col, text=col + arrow)
+        self.selected = None
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self):
+        """Réécrit les éléments visibles (création/suppression si la hauteur a changé)"""
+        total = self.row_count()
+        rows = self.model.rows(self.offset, min(total, self.offset + self.visible)) if total else []
+        while len(self.items) < len(rows):
+            self.items.append(self.tree.insert('', tk.END))
+        while len(self.items) > len(rows):
+            self.tree.delete(self.items.pop())
+        for item, values in zip(self.items, rows):
+            self.tree.item(item, values=values)
+
+        if self.selected is not None and self.offset <= self.selected < self.offset + len(rows):
+            self.tree.selection_set(self.items[self.selected - self.offset])
+        else:
+            self.tree.selection_set(())
+
+        if total:
+            self.vsb.set(self.offset / total, (self.offset + len(rows)) / total)
+        else:
+            self.vsb.set(0, 1)
+
+
+class PosTableModel:
+    """Données du convertisseur POS en colonnes NumPy (toutes les époques de tous les fichiers)"""
+
+    # Format d'affichage des colonnes du tableau (positions en mètres : 4 décimales)
+    FORMATS = {
+        'Latitude': '{:.9f}', 'Longitude': '{:.9f}', 'Height': '{:.4f}', 'Q': '{:d}', 'Ns': '{:d}',
+        'Sdn': '{:.4f}', 'Sde': '{:.4f}', 'Sdu': '{:.4f}', 'Sdne': '{:.4f}', 'Sdeu': '{:.4f}',
+        'Sdun': '{:.4f}', 'Age': '{:.2f}', 'Ratio': '{:.1f}',
+    }
+
+    def __init__(self, pos_data):
+        # pos_data : [(nom du fichier, colonnes typées)]
+        self.filenames = [filename for filename, _ in pos_data]
+        tables = [table_columns(columns) for _, columns in pos_data]
+        self.columns = {
+            name: np.concatenate([np.asarray(table[name]) for table in tables]) for name in tables[0]
+        }
+        self.file_index = np.concatenate([
+            np.full(len(columns['time']), i, dtype=np.int32) for i, (_, columns) in enumerate(pos_data)
+        ])
+        self.geographic = [columns_frame(columns) == 'llh' for _, columns in pos_data]
+        self.order = np.arange(len(self.file_index))
+
+    def row_count(self):
+        return len(self.order)
+
+    def rows(self, start, stop):
+        index = self.order[start:stop]
+        stamps = np.datetime_as_string(self.columns['time'][index], unit='ms')
+        values = {
+            col: [fmt.format(value) for value in self.columns[col][index].tolist()]
+            for col, fmt in self.FORMATS.items()
+        }
+        rows = []
+        for i, row in enumerate(index.tolist()):
+            file_index = self.file_index[row]
+            row_values = [values[col][i] for col in self.FORMATS]
+            if not self.geographic[file_index]:
+                # Coordonnées ECEF ou ENU en mètres
+                row_values[0] = f"{self.columns['Latitude'][row]:.4f}"
+                row_values[1] = f"{self.columns['Longitude'][row]:.4f}"
+            rows.append(
+                (self.filenames[file_index], stamps[i][:10].replace('-', '/'), stamps[i][11:]) + tuple(row_values)
+            )
+        return rows
+
+    def sort(self, column, descending=False):
+        if column in ('Date', 'Time'):
+            keys = self.columns['time']
+        elif column == 'Filename':
+            # Rang alphabétique de chaque fichier
+            ranks = np.argsort(np.argsort(self.filenames, kind='stable'))
+            keys = ranks[self.file_index]
+        else:
+            keys = self.columns[column]
+        order = np.argsort(keys, kind='stable')
+        self.order = order[::-1] if descending else order
+
+    def find_time(self, target):
+        """Position (ordre courant) de l'époque la plus proche de target (datetime64)"""
+        times = self.columns['time'][self.order]
+        return int(np.argmin(np.abs(times - target)))
+
+
 class PosToExcelConverter:
+    EXPORT_FORMATS = ('Excel (.xlsx)', 'CSV (.csv)', 'Parquet (folder)', 'GeoPackage (.gpkg)')
+    # Option affichée -> mode de TimeBuckets
+    RESAMPLE_OPTIONS = ('All epochs', 'Decimate', 'Mean per interval')
+    RESAMPLE_MODES = {'Decimate': 'decimate', 'Mean per interval': 'mean'}
+
     def __init__(self, window):
         self.window = window
         self.window.title("POS to Excel Converter")
@@ -719,12 +1132,85 @@ class PosToExcelConverter:
         self.preview_button = ttk.Button(button_frame, text="Preview Data", command=self.preview_data)
         self.preview_button.pack(side=tk.LEFT, padx=5)
         
-        self.save_button = ttk.Button(button_frame, text="Save to Excel", command=self.save_to_excel, state='disabled')
+        self.save_button = ttk.Button(button_frame, text="Export", command=self.export_data, state='disabled')
         self.save_button.pack(side=tk.LEFT, padx=5)
         
         self.clear_button = ttk.Button(button_frame, text="Clear", command=self.clear_data)
         self.clear_button.pack(side=tk.LEFT, padx=5)
 
+        # Une ligne par fichier : position moyenne pondérée par 1/sigma², % fix, durée
+        self.summary_button = ttk.Button(button_frame, text="Per-file Summary", command=self.summarize_files)
+        self.summary_button.pack(side=tk.LEFT, padx=5)
+
+        # Annule le chargement en cours (les fichiers non encore lus sont abandonnés)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_loading, state='disabled')
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        # Aller à l'époque la plus proche (YYYY/MM/DD HH:MM:SS ou HH:MM:SS)
+        ttk.Label(button_frame, text="Go to time:").pack(side=tk.LEFT, padx=(15, 5))
+        self.goto_time = tk.StringVar()
+        goto_entry = ttk.Entry(button_frame, textvariable=self.goto_time, width=20)
+        goto_entry.pack(side=tk.LEFT)
+        goto_entry.bind('<Return>', lambda e: self.go_to_time())
+        ttk.Button(button_frame, text="Go", command=self.go_to_time).pack(side=tk.LEFT, padx=5)
+
+        # Format d'export ; Excel/GeoPackage : une feuille/couche par fichier .pos
+        # (sinon feuilles POS, POS (2)... à 1 048 576 lignes, couche unique 'pos')
+        ttk.Label(input_frame, text="Export format:").grid(row=3, column=0, padx=5, sticky=tk.W)
+        self.export_format = tk.StringVar(value=self.EXPORT_FORMATS[0])
+        ttk.Combobox(
+            input_frame, textvariable=self.export_format, values=self.EXPORT_FORMATS, state='readonly', width=20
+        ).grid(row=3, column=1, padx=5, sticky=tk.W)
+        self.sheet_per_file = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="One sheet/layer per .pos file", variable=self.sheet_per_file).grid(
+            row=3, column=2, padx=5, sticky=tk.W
+        )
+        # Colonnes UTM Zone/Easting/Northing calculées pour chaque époque (Excel, CSV, Parquet)
+        self.add_utm = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="Add UTM columns", variable=self.add_utm).grid(
+            row=3, column=3, padx=5, sticky=tk.W
+        )
+        # Réduction au chargement : une époque (la première, ou la moyenne) par intervalle
+        ttk.Label(input_frame, text="Resample:").grid(row=4, column=0, padx=5, sticky=tk.W)
+        resample_frame = ttk.Frame(input_frame)
+        resample_frame.grid(row=4, column=1, columnspan=2, padx=5, sticky=tk.W)
+        self.resample_mode = tk.StringVar(value=self.RESAMPLE_OPTIONS[0])
+        ttk.Combobox(
+            resample_frame, textvariable=self.resample_mode, values=self.RESAMPLE_OPTIONS, state='readonly', width=20
+        ).pack(side=tk.LEFT)
+        ttk.Label(resample_frame, text="every").pack(side=tk.LEFT, padx=5)
+        self.resample_seconds = tk.StringVar(value="1")
+        ttk.Entry(resample_frame, textvariable=self.resample_seconds, width=8).pack(side=tk.LEFT)
+        ttk.Label(resample_frame, text="s").pack(side=tk.LEFT, padx=5)
+
+        # Filtres appliqués à la lecture (champs vides : pas de filtre)
+        filter_frame = ttk.Frame(input_frame)
+        filter_frame.grid(row=5, column=0, columnspan=3, padx=5, pady=(5, 0), sticky=tk.W)
+        self.filter_vars = {}
+        for position, (key, label, width) in enumerate((
+            ('quality', "Q (e.g. 1,2):", 6), ('start', "Start:", 20), ('end', "End:", 20),
+            ('bbox', "Lat/Lon box (S,W,N,E):", 28), ('max_sdu', "Max sdu (m):", 6),
+        )):
+            row, column = divmod(position, 3)
+            ttk.Label(filter_frame, text=label).grid(row=row, column=column * 2, padx=(0, 5), sticky=tk.W)
+            self.filter_vars[key] = tk.StringVar()
+            ttk.Entry(filter_frame, textvariable=self.filter_vars[key], width=width).grid(
+                row=row, column=column * 2 + 1, padx=(0, 10), pady=2, sticky=tk.W
+            )
+
+        self.progress_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(input_frame, orient='horizontal', mode='determinate', variable=self.progress_var).grid(
+            row=6, column=0, columnspan=2, padx=5, pady=5, sticky=tk.EW
+        )
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(input_frame, textvariable=self.status_var).grid(row=6, column=2, padx=5, sticky=tk.W)
+
+        self.pos_data = []
+        self.pos_sources = []
+        self.pos_buckets = None
+        self.pos_filters = None
+        self.load_cancel = None
+
         # Treeview Frame
         tree_frame = ttk.LabelFrame(self.window, text="POS Data Preview", padding=10)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -732,32 +1218,19 @@ class PosToExcelConverter:
         # Create Treeview with scrollbars
         self.columns = [
             'Filename', 'Date', 'Time', 'Latitude', 'Longitude', 'Height',
-            'Q', 'Ns', 'Sdn', 'Sde', 'Sdu', 'Sdne', 'Sdnu', 'Sdeu', 'Age', 'Ratio'
+            'Q', 'Ns', 'Sdn', 'Sde', 'Sdu', 'Sdne', 'Sdeu', 'Sdun', 'Age', 'Ratio'
         ]
         
-        self.tree = ttk.Treeview(tree_frame, columns=self.columns, show='headings', height=15)
-        
         # Configure columns
         column_widths = {
             'Filename': 150, 'Date': 100, 'Time': 100, 'Latitude': 120,
             'Longitude': 120, 'Height': 100, 'Q': 50, 'Ns': 50,
             'Sdn': 80, 'Sde': 80, 'Sdu': 80, 'Sdne': 80,
-            'Sdnu': 80, 'Sdeu': 80, 'Age': 80, 'Ratio': 80
+            'Sdeu': 80, 'Sdun': 80, 'Age': 80, 'Ratio': 80
         }
 
-        for col in self.columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=column_widths[col], anchor=tk.CENTER)
-
-        # Add scrollbars
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        # Grid layout
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
+        # Tableau virtuel : seules les lignes visibles sont créées (tri par clic sur l'en-tête)
+        self.table = VirtualTable(tree_frame, self.columns, column_widths)
 
         # Configure grid weights
         tree_frame.grid_rowconfigure(0, weight=1)
@@ -776,98 +1249,334 @@ class PosToExcelConverter:
         if file:
             self.output_file.set(file)
 
-    def preview_data(self):
+    def read_load_options(self):
+        """(fichiers, chemins, réduction, filtres) du dossier d'entrée, None en cas d'erreur"""
         input_dir = self.input_dir.get()
         
         if not input_dir:
             messagebox.showerror("Error", "Please select input directory")
+            return None
+
+        buckets = None
+        if self.resample_mode.get() in self.RESAMPLE_MODES:
+            try:
+                buckets = TimeBuckets(float(self.resample_seconds.get()), self.RESAMPLE_MODES[self.resample_mode.get()])
+            except ValueError:
+                messagebox.showerror("Error", "Invalid resample interval (seconds)")
+                return None
+
+        try:
+            filters = self.read_filters()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid filter: {str(e)}")
+            return None
+
+        try:
+            files = sorted(file for file in os.listdir(input_dir) if file.endswith(".pos"))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error reading files: {str(e)}")
+            return None
+        return files, [os.path.join(input_dir, file) for file in files], buckets, filters
+
+    def preview_data(self):
+        options = self.read_load_options()
+        if options is None:
             return
+        files, paths, buckets, filters = options
 
         # Clear existing items
         self.clear_data()
 
-        all_data = []
+        # Lecture en parallèle (un processus par fichier) hors du thread Tk
+        cancel = threading.Event()
+        self.load_cancel = cancel
+        self.set_buttons_state('disabled')
+        self.cancel_button.configure(state='normal')
+        self.progress_var.set(0)
+        self.status_var.set(f"0/{len(files)} files")
+
+        def worker():
+            try:
+                results = load_pos_files(
+                    paths, cancel=cancel, buckets=buckets, filters=filters,
+                    on_file=lambda done, total: self.window.after(0, self.update_load_progress, done, total)
+                )
+                self.window.after(0, self.finish_loading, files, paths, (buckets, filters), results, cancel, None)
+            except Exception as e:
+                self.window.after(0, self.finish_loading, files, paths, (buckets, filters), None, cancel, e)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def summarize_files(self):
+        options = self.read_load_options()
+        if options is None:
+            return
+        files, paths, buckets, filters = options
+        if not files:
+            messagebox.showwarning("Warning", "No POS files found")
+            return
+
+        # Un résumé par fichier, calculé en parallèle sans garder les époques
+        cancel = threading.Event()
+        self.load_cancel = cancel
+        self.set_buttons_state('disabled')
+        self.cancel_button.configure(state='normal')
+        self.progress_var.set(0)
+        self.status_var.set(f"0/{len(files)} files")
+
+        def worker():
+            try:
+                results = summarize_pos_files(
+                    paths, cancel=cancel, buckets=buckets, filters=filters,
+                    on_file=lambda done, total: self.window.after(0, self.update_load_progress, done, total)
+                )
+                self.window.after(0, self.finish_summary, files, results, cancel, None)
+            except Exception as e:
+                self.window.after(0, self.finish_summary, files, None, cancel, e)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_summary(self, files, results, cancel, error):
+        if cancel is not self.load_cancel:
+            return
+        self.load_cancel = None
+        self.cancel_button.configure(state='disabled')
+        self.set_buttons_state('normal')
+        if not self.pos_data:
+            self.save_button.configure(state='disabled')
+        if error:
+            self.status_var.set("")
+            messagebox.showerror("Error", f"Error reading files: {str(error)}")
+            return
+        if results is None:
+            self.progress_var.set(0)
+            self.status_var.set("Summary cancelled")
+            return
+
+        rows = [summary_row(file, summary) for file, summary in zip(files, results) if summary]
+        if not rows:
+            self.status_var.set("")
+            messagebox.showwarning("Warning", "No data found in POS files")
+            return
+        self.status_var.set(f"{len(rows)} files summarized")
+        self.show_summary(pd.DataFrame(rows))
+
+    def show_summary(self, summary):
+        """Fenêtre des résumés par fichier (une ligne par .pos) avec export Excel/CSV"""
+        result_window = tk.Toplevel(self.window)
+        result_window.title("Per-file Weighted Summary")
+        result_window.geometry("900x300")
+
+        frame = ttk.Frame(result_window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        columns = list(summary.columns)
+        tree = ttk.Treeview(frame, columns=columns, show='headings')
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=150 if col == 'Filename' else 110, anchor=tk.CENTER)
+        for row in summary.itertuples(index=False):
+            tree.insert('', tk.END, values=list(row))
+        hsb = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
+        vsb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(xscrollcommand=hsb.set, yscrollcommand=vsb.set)
+        tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+
+        ttk.Button(result_window, text="Export", command=lambda: self.export_summary(summary)).pack(pady=5)
+
+    def export_summary(self, summary):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv")]
+        )
+        if not file_path:
+            return
         try:
-            for file in os.listdir(input_dir):
-                if file.endswith(".pos"):
-                    with open(os.path.join(input_dir, file), 'r') as f:
-                        for line in f:
-                            if not line.startswith('%'):
-                                values = line.strip().split()
-                                if len(values) >= 15:
-                                    data = {
-                                        'Filename': file,
-                                        'Date': values[0],
-                                        'Time': values[1],
-                                        'Latitude': values[2],
-                                        'Longitude': values[3],
-                                        'Height': values[4],
-                                        'Q': values[5],
-                                        'Ns': values[6],
-                                        'Sdn': values[7],
-                                        'Sde': values[8],
-                                        'Sdu': values[9],
-                                        'Sdne': values[10],
-                                        'Sdnu': values[11],
-                                        'Sdeu': values[12],
-                                        'Age': values[13],
-                                        'Ratio': values[14]
-                                    }
-                                    all_data.append(data)
-                                    self.tree.insert("", tk.END, values=tuple(data.values()))
-
-            if all_data:
-                self.save_button.configure(state='normal')
-                self.data_to_save = all_data
-                messagebox.showinfo("Preview", f"Found {len(all_data)} records")
+            if file_path.lower().endswith('.csv'):
+                summary.to_csv(file_path, index=False)
             else:
-                messagebox.showwarning("Warning", "No data found in POS files")
-
+                summary.to_excel(file_path, index=False)
+            messagebox.showinfo("Success", f"Saved {len(summary)} file summaries!")
         except Exception as e:
-            messagebox.showerror("Error", f"Error reading files: {str(e)}")
+            messagebox.showerror("Error", f"Error saving summary: {str(e)}")
+
+    def read_filters(self):
+        """PosFilter des champs de filtre (None si tous sont vides)"""
+        values = {key: var.get().strip() for key, var in self.filter_vars.items()}
+        times = {}
+        for key in ('start', 'end'):
+            if values[key]:
+                try:
+                    times[key] = np.datetime64(values[key].replace('/', '-').replace(' ', 'T'), 'ms')
+                except ValueError:
+                    raise ValueError(f"{key} time must be YYYY/MM/DD HH:MM:SS")
+        filters = PosFilter(
+            quality=[int(q) for q in values['quality'].replace(' ', '').split(',') if q] or None,
+            start=times.get('start'),
+            end=times.get('end'),
+            bbox=[float(v) for v in values['bbox'].split(',')] if values['bbox'] else None,
+            max_sdu=float(values['max_sdu']) if values['max_sdu'] else None,
+        )
+        return filters or None
+
+    def cancel_loading(self):
+        if self.load_cancel:
+            self.load_cancel.set()
+            self.status_var.set("Cancelling...")
+
+    def update_load_progress(self, done, total):
+        self.progress_var.set(done * 100.0 / total if total else 0)
+        self.status_var.set(f"{done}/{total} files")
+
+    def finish_loading(self, files, paths, options, results, cancel, error):
+        if cancel is not self.load_cancel:
+            # Chargement remplacé par un autre entre-temps
+            return
+        self.load_cancel = None
+        self.cancel_button.configure(state='disabled')
+        self.set_buttons_state('normal')
+        self.save_button.configure(state='disabled')
+        if error:
+            self.status_var.set("")
+            messagebox.showerror("Error", f"Error reading files: {str(error)}")
+            return
+        if results is None:
+            self.progress_var.set(0)
+            self.status_var.set("Loading cancelled")
+            return
+
+        pos_data = []
+        pos_sources = []
+        for file, path, columns in zip(files, paths, results):
+            if len(columns['time']):
+                pos_data.append((file, columns))
+                pos_sources.append((file, path))
+
+        if pos_data:
+            self.pos_data = pos_data
+            self.pos_sources = pos_sources
+            # L'export relit les fichiers avec les mêmes filtres et la même réduction que l'aperçu
+            self.pos_buckets, self.pos_filters = options
+            self.table.set_model(PosTableModel(pos_data))
+            self.save_button.configure(state='normal')
+            self.status_var.set(f"{self.table.row_count()} rows")
+            messagebox.showinfo("Preview", f"Found {self.table.row_count()} records")
+        else:
+            self.status_var.set("")
+            messagebox.showwarning("Warning", "No data found in POS files")
+
+    def go_to_time(self):
+        model = self.table.model
+        text = self.goto_time.get().strip()
+        if not model or not text:
+            return
+        try:
+            if len(text) <= 12:
+                # Heure seule : date de la première époque affichée
+                first = np.datetime_as_string(model.columns['time'][model.order[0]], unit='D')
+                text = f"{first} {text}"
+            target = np.datetime64(text.replace('/', '-').replace(' ', 'T'), 'ms')
+        except ValueError:
+            messagebox.showerror("Error", "Invalid time. Use YYYY/MM/DD HH:MM:SS or HH:MM:SS")
+            return
+        self.table.show_row(model.find_time(target))
 
     def clear_data(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.table.clear()
         self.save_button.configure(state='disabled')
-        self.data_to_save = None
+        self.pos_data = []
+        self.pos_sources = []
+        self.pos_buckets = None
+        self.pos_filters = None
 
-    def save_to_excel(self):
-        if not hasattr(self, 'data_to_save') or not self.data_to_save:
+    def export_data(self):
+        if not self.pos_data:
             messagebox.showerror("Error", "No data to save! Please preview data first.")
             return
 
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")]
-        )
+        export_format = self.export_format.get()
+        if export_format.startswith('Parquet'):
+            # Dossier du jeu de données (partitions date=.../file=...)
+            file_path = filedialog.askdirectory()
+        else:
+            extension = {'Excel': '.xlsx', 'CSV': '.csv', 'GeoPackage': '.gpkg'}[export_format.split()[0]]
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=extension,
+                filetypes=[(f"{export_format.split()[0]} files", f"*{extension}")]
+            )
         
         if file_path:
-            try:
-                # Vérifier si openpyxl est installé
+            # Vérifier si le module du format est installé
+            module = {'Excel': 'openpyxl', 'Parquet': 'pyarrow'}.get(export_format.split()[0])
+            if module:
                 try:
-                    import openpyxl
+                    __import__(module)
                 except ImportError:
                     messagebox.showerror(
                         "Error",
-                        "Le module 'openpyxl' est requis pour sauvegarder en Excel.\n\n"
+                        f"Le module '{module}' est requis pour sauvegarder en {export_format.split()[0]}.\n\n"
                         "Veuillez l'installer avec la commande:\n"
-                        "pip install openpyxl"
+                        f"pip install {module}"
                     )
                     return
 
-                df = pd.DataFrame(self.data_to_save)
-                df.to_excel(file_path, index=False, engine='openpyxl')
-                messagebox.showinfo("Success", f"Saved {len(self.data_to_save)} records to Excel!")
+            try:
+                if export_format.startswith('Excel'):
+                    writer = ExcelPosWriter(file_path, sheet_per_file=self.sheet_per_file.get(), utm=self.add_utm.get())
+                elif export_format.startswith('CSV'):
+                    writer = CsvPosWriter(file_path, utm=self.add_utm.get())
+                elif export_format.startswith('Parquet'):
+                    writer = ParquetPosWriter(file_path, utm=self.add_utm.get())
+                else:
+                    writer = GeoPackagePosWriter(file_path, layer_per_file=self.sheet_per_file.get())
             except Exception as e:
-                messagebox.showerror("Error", f"Error saving to Excel: {str(e)}")
+                messagebox.showerror("Error", f"Error saving to {export_format}: {str(e)}")
+                return
+
+            # Écriture en flux dans un thread : l'interface reste utilisable
+            total = self.table.row_count()
+            self.set_buttons_state('disabled')
+            self.progress_var.set(0)
+
+            def worker():
+                try:
+                    rows = export_pos_files(
+                        list(self.pos_sources), writer, buckets=self.pos_buckets, filters=self.pos_filters,
+                        on_progress=lambda done: self.window.after(0, self.update_export_progress, done, total)
+                    )
+                    self.window.after(0, self.finish_export, export_format, rows, None)
+                except Exception as e:
+                    self.window.after(0, self.finish_export, export_format, writer.rows, e)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+    def set_buttons_state(self, state):
+        for button in (self.preview_button, self.save_button, self.clear_button, self.summary_button):
+            button.configure(state=state)
+
+    def update_export_progress(self, done, total):
+        self.progress_var.set(done * 100.0 / total if total else 0)
+        self.status_var.set(f"{done}/{total} rows")
+
+    def finish_export(self, export_format, rows, error):
+        self.set_buttons_state('normal')
+        if error:
+            self.status_var.set("")
+            messagebox.showerror("Error", f"Error saving to {export_format}: {str(error)}")
+            return
+        self.progress_var.set(100)
+        self.status_var.set(f"{rows} rows")
+        messagebox.showinfo("Success", f"Saved {rows} records to {export_format}!")
 
 
 class DMSConverter:
     def __init__(self, window):
         self.window = window
         self.window.title("DMS Converter")
-        self.window.geometry("400x200")
+        self.window.geometry("720x520")
 
         # Create main frame
         main_frame = ttk.Frame(self.window, padding="10")
@@ -876,16 +1585,42 @@ class DMSConverter:
         # DMS Input
         ttk.Label(main_frame, text="DMS Input:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
         self.dms_input = ttk.Entry(main_frame, width=40)
-        self.dms_input.grid(row=0, column=1, padx=5, pady=5)
-        ttk.Label(main_frame, text="Format: 73° 9' 18.99435\"").grid(row=1, column=1, sticky=tk.W)
+        self.dms_input.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        ttk.Label(main_frame, text="Format: 73° 9' 18.99435\", -79 58 39.88 or 079°58'39.88\"W").grid(
+            row=1, column=1, sticky=tk.W
+        )
 
         # Convert Button
-        ttk.Button(main_frame, text="Convert", command=self.convert_dms).grid(row=2, column=1, pady=10)
+        ttk.Button(main_frame, text="Convert", command=self.convert_dms).grid(row=2, column=1, pady=10, sticky=tk.W)
 
         # Decimal Degrees Output
         ttk.Label(main_frame, text="Decimal Degrees:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.W)
         self.dd_output = ttk.Entry(main_frame, width=40, state='readonly')
-        self.dd_output.grid(row=3, column=1, padx=5, pady=5)
+        self.dd_output.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+
+        # Batch: block of values pasted from a spreadsheet (one row per line, tab or ';' separated)
+        batch_frame = ttk.LabelFrame(main_frame, text="Batch", padding="5")
+        batch_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
+        main_frame.columnconfigure(1, weight=1)
+        main_frame.rowconfigure(4, weight=1)
+
+        ttk.Label(batch_frame, text="DMS values (paste rows):").grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(batch_frame, text="Decimal Degrees:").grid(row=0, column=1, sticky=tk.W)
+        self.batch_input = tk.Text(batch_frame, width=40, height=12, wrap=tk.NONE)
+        self.batch_input.grid(row=1, column=0, padx=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.batch_output = tk.Text(batch_frame, width=40, height=12, wrap=tk.NONE, state='disabled')
+        self.batch_output.grid(row=1, column=1, padx=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+        batch_frame.columnconfigure(0, weight=1)
+        batch_frame.columnconfigure(1, weight=1)
+        batch_frame.rowconfigure(1, weight=1)
+
+        button_frame = ttk.Frame(batch_frame)
+        button_frame.grid(row=2, column=0, columnspan=2, pady=5, sticky=tk.W)
+        ttk.Button(button_frame, text="Convert Block", command=self.convert_block).pack(side=tk.LEFT, padx=5)
+        self.file_button = ttk.Button(button_frame, text="Convert File...", command=self.convert_file)
+        self.file_button.pack(side=tk.LEFT, padx=5)
+        self.batch_status = ttk.Label(batch_frame, text="")
+        self.batch_status.grid(row=3, column=0, columnspan=2, sticky=tk.W)
 
     def convert_dms(self):
         dms = self.dms_input.get()
@@ -898,6 +1633,71 @@ class DMSConverter:
         except ValueError as e:
             messagebox.showerror("Error", str(e))
 
+    def convert_block(self):
+        """Convertit toutes les cellules collées en une fois (même disposition, ERROR si illisible)"""
+        lines = self.batch_input.get("1.0", tk.END).rstrip("\n").split("\n")
+        rows = [re.split(r'[\t;]', line) if line.strip() else [] for line in lines]
+        cells = [cell.strip() for row in rows for cell in row]
+        dd = dms_array_to_dd(cells)
+        text = np.where(np.isnan(dd), "ERROR", np.char.mod("%.9f", dd)) if cells else []
+        output, position = [], 0
+        for row in rows:
+            output.append("\t".join(text[position:position + len(row)]))
+            position += len(row)
+        invalid = int(np.isnan(dd).sum())
+
+        self.batch_output.configure(state='normal')
+        self.batch_output.delete("1.0", tk.END)
+        self.batch_output.insert("1.0", "\n".join(output))
+        self.batch_output.configure(state='disabled')
+        self.batch_status.configure(text=f"{len(cells) - invalid} values converted, {invalid} invalid")
+
+    def convert_file(self):
+        """Ajoute une colonne en degrés décimaux après chaque colonne d m s d'un CSV ou Excel"""
+        source = filedialog.askopenfilename(
+            filetypes=[("Excel or CSV files", "*.xlsx *.xls *.csv"), ("All files", "*.*")]
+        )
+        if not source:
+            return
+        destination = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            initialfile=f"{os.path.splitext(os.path.basename(source))[0]}_dd.xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv")]
+        )
+        if not destination:
+            return
+
+        def worker():
+            try:
+                frame = pd.read_csv(source) if source.lower().endswith('.csv') else pd.read_excel(source)
+                result, invalid = convert_dms_columns(frame)
+                if invalid:
+                    if destination.lower().endswith('.csv'):
+                        result.to_csv(destination, index=False)
+                    else:
+                        result.to_excel(destination, index=False)
+                self.window.after(0, self.finish_file, destination, len(frame), invalid, None)
+            except Exception as e:
+                self.window.after(0, self.finish_file, destination, 0, None, e)
+
+        self.file_button.configure(state='disabled')
+        self.batch_status.configure(text=f"Converting {os.path.basename(source)}...")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_file(self, destination, rows, invalid, error):
+        self.file_button.configure(state='normal')
+        if error is not None:
+            self.batch_status.configure(text="")
+            messagebox.showerror("Error", f"Error converting file: {str(error)}")
+            return
+        if not invalid:
+            self.batch_status.configure(text="")
+            messagebox.showinfo("Info", "No DMS columns found in the file")
+            return
+        details = ", ".join(f"{column}: {count} invalid" for column, count in invalid.items())
+        self.batch_status.configure(text=f"{rows} rows, {len(invalid)} DMS columns ({details})")
+        messagebox.showinfo("Success", f"Converted {len(invalid)} DMS columns ({rows} rows) to {os.path.basename(destination)}")
+
 
 class R27Converter:
     def __init__(self, window):
@@ -958,23 +1758,3 @@ class R27Converter:
 
         except Exception as e:
             messagebox.showerror("Error", f"Error during conversion: {str(e)}")
-
-
-def dms_to_dd(dms_str):
-    # Extract the degrees, minutes, and seconds using regex
-    match = re.match(r"(-?\d+)°\s*(\d+)'?\s*(\d+(\.\d+)?)\"?", dms_str)
-    if not match:
-        raise ValueError(f"Invalid DMS format: {dms_str}")
-    
-    degrees = float(match.group(1))
-    minutes = float(match.group(2))
-    seconds = float(match.group(3))
-    
-    # Convert to decimal degrees
-    dd = abs(degrees) + (minutes / 60) + (seconds / 3600)
-    
-    # Apply the sign of the degrees
-    if degrees < 0:
-        dd = -dd
-    
-    return dd
\ No newline at end of file